@@ -4,10 +4,22 @@ Description: Data Class for Entities
 '''
 
 class Entities:
-    def __init__(self, amounts: list, dates: list, phones: list, loan_numbers: list, amount_contexts: list = None):
+    def __init__(self, amounts: list, dates: list, phones: list, loan_numbers: list, amount_contexts: list = None,
+                 amount_spans: list = None, source_text: str = None, iso_dates: list = None):
         self._amounts = amounts
-        self._amount_contexts = amount_contexts if amount_contexts is not None else [""] * len(amounts)
+        # Contexts are either given as strings, or as (start, end) spans into
+        # source_text that are only sliced out when a caller asks for them
+        if amount_spans is not None and source_text is not None:
+            self._amount_contexts = None
+            self._amount_spans = amount_spans
+            self._source_text = source_text
+        else:
+            self._amount_contexts = amount_contexts if amount_contexts is not None else [""] * len(amounts)
+            self._amount_spans = None
+            self._source_text = None
         self._dates = dates
+        # ISO 8601 form of each date (None where a match is not a real date)
+        self._iso_dates = iso_dates if iso_dates is not None else [None] * len(dates)
         self._phones = phones
         self._loan_numbers = loan_numbers
 
@@ -16,20 +28,70 @@ class Entities:
         return self._amounts
 
     def get_amount_contexts(self) -> list[str]:
-        return self._amount_contexts
+        if self._amount_contexts is not None:
+            return self._amount_contexts
+        text = self._source_text
+        return [text[start:end].strip() for start, end in self._amount_spans]
+
+    def get_amount_spans(self) -> list[tuple[int, int]]:
+        """(start, end) offsets of each amount's context, or None for string contexts."""
+        return self._amount_spans
 
     def get_dates(self) -> list:
         return self._dates
 
+    def get_iso_dates(self) -> list:
+        return self._iso_dates
+
     def get_phones(self) -> list:
         return self._phones
 
     def get_loan_numbers(self) -> list:
         return self._loan_numbers
 
+    def to_json(self) -> dict:
+        # Same keys as the attribute dump the CLI wrote before contexts were lazy
+        return {
+            "_amounts": self.get_amounts(),
+            "_amount_contexts": self.get_amount_contexts(),
+            "_dates": self.get_dates(),
+            "_iso_dates": self.get_iso_dates(),
+            "_phones": self.get_phones(),
+            "_loan_numbers": self.get_loan_numbers(),
+        }
+
+    #Pickling (worker -> parent): ship only the parts of the source text that
+    #the context spans cover, with the spans rebased onto that excerpt
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        if self._amount_spans is None:
+            return state
+        excerpt = []
+        rebased = []
+        length = 0
+        last_end = None
+        for start, end in sorted(set(self._amount_spans)):
+            if last_end is not None and start <= last_end:
+                if end > last_end:
+                    excerpt.append(self._source_text[last_end:end])
+                    length += end - last_end
+                    last_end = end
+                offset = length - (last_end - start)
+            else:
+                excerpt.append(self._source_text[start:end])
+                length += end - start
+                last_end = end
+                offset = length - (end - start)
+            rebased.append(((start, end), offset))
+        # Map each original span to its position in the excerpt
+        positions = {span: offset for span, offset in rebased}
+        state["_amount_spans"] = [(positions[(s, e)], positions[(s, e)] + e - s) for s, e in self._amount_spans]
+        state["_source_text"] = "".join(excerpt)
+        return state
+
     #Defining __str__ method
     def __str__(self) -> str:
-        return f"Entities(amounts={self._amounts}, dates={self._dates}, phones={self._phones}, loan_numbers={self._loan_numbers})"
+        return f"Entities(amounts={self.get_amounts()}, dates={self.get_dates()}, phones={self.get_phones()}, loan_numbers={self.get_loan_numbers()})"
 
     #Defining __repr__ method
     def __repr__(self) -> str:
@@ -0,0 +1,35 @@
+'''
+File Name: escalationDecision.py
+Description: Data Class for the escalation-only routing decision
+'''
+
+class escalationDecision:
+    def __init__(self, escalate: bool, trigger_code: str = None, score: int = 0):
+        self._escalate = escalate
+        # First escalation rule to reach its threshold (None when not escalating)
+        self._trigger_code = trigger_code
+        self._score = score
+
+    #Getters
+    def get_escalate(self) -> bool:
+        return self._escalate
+
+    def get_trigger_code(self) -> str:
+        return self._trigger_code
+
+    def get_score(self) -> int:
+        return self._score
+
+    def to_json(self) -> dict:
+        return {
+            "escalate": self._escalate,
+            "trigger_code": self._trigger_code,
+            "score": self._score,
+        }
+
+    #Defining __str__ method
+    def __str__(self) -> str:
+        return f"escalationDecision(escalate={self._escalate}, trigger_code={self._trigger_code}, score={self._score})"
+    #Defining __repr__ method
+    def __repr__(self) -> str:
+        return self.__str__()
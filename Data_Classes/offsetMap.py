@@ -0,0 +1,94 @@
+'''
+File Name: offsetMap.py
+Description: Data Class mapping offsets between a transcript's normalized text
+             and its raw text
+'''
+
+import re
+from array import array
+from bisect import bisect_right
+
+# Whitespace that normalization does not turn into exactly one space: runs of
+# two or more characters, and any leading run (which is dropped)
+_LEADING_RE = re.compile(r"\s+")
+_RUN_RE = re.compile(r"\s\s+")
+_TOKEN_RE = re.compile(r"\S+")
+
+
+class offsetMap:
+    """Offsets between normalized text (lowercased, whitespace runs collapsed
+    to one space) and the raw text it came from.
+
+    A single whitespace character normalizes to a single space, so raw and
+    normalized offsets only drift apart at longer whitespace runs.  The map
+    stores one breakpoint per such run: the normalized offset where the next
+    token starts and the raw - normalized shift from there on.
+    """
+
+    def __init__(self, raw_text: str, normalized_text: str):
+        norm_keys = array("l")
+        raw_keys = array("l")
+        shifts = array("l")
+        shift = 0
+        if raw_text.isascii() or len(raw_text.lower()) == len(raw_text):
+            leading = _LEADING_RE.match(raw_text)
+            if leading:
+                # A leading run vanishes entirely
+                shift = leading.end()
+                norm_keys.append(0)
+                raw_keys.append(shift)
+                shifts.append(shift)
+            for m in _RUN_RE.finditer(raw_text, shift):
+                start, end = m.span()
+                # The run keeps one separator
+                shift += end - start - 1
+                norm_keys.append(end - shift)
+                raw_keys.append(end)
+                shifts.append(shift)
+        else:
+            # lower() changed the length of some characters (e.g. "İ"): one
+            # breakpoint per token; offsets inside such a token are approximate
+            norm_pos = 0
+            for m, token in zip(_TOKEN_RE.finditer(raw_text), normalized_text.split(" ")):
+                norm_keys.append(norm_pos)
+                raw_keys.append(m.start())
+                shifts.append(m.start() - norm_pos)
+                norm_pos += len(token) + 1
+        self._norm_keys = norm_keys
+        self._raw_keys = raw_keys
+        self._shifts = shifts
+        self._norm_len = len(normalized_text)
+        self._raw_len = len(raw_text)
+
+    #Mapping
+    def to_raw(self, pos: int) -> int:
+        """Raw offset of normalized offset *pos* (also valid as an exclusive end)."""
+        i = bisect_right(self._norm_keys, pos) - 1
+        return min(pos + self._shifts[i], self._raw_len) if i >= 0 else pos
+
+    def to_normalized(self, pos: int) -> int:
+        """Normalized offset of raw offset *pos*; collapsed whitespace maps to its separator."""
+        i = bisect_right(self._raw_keys, pos) - 1
+        norm = pos - self._shifts[i] if i >= 0 else pos
+        if i + 1 < len(self._norm_keys):
+            # Inside a collapsed run: stop at the separator before the next token
+            norm = min(norm, self._norm_keys[i + 1] - 1)
+        return max(0, min(norm, self._norm_len))
+
+    def span_to_raw(self, start: int, end: int) -> tuple[int, int]:
+        return self.to_raw(start), self.to_raw(end)
+
+    def span_to_normalized(self, start: int, end: int) -> tuple[int, int]:
+        return self.to_normalized(start), self.to_normalized(end)
+
+    #Defining __len__ method: number of breakpoints
+    def __len__(self) -> int:
+        return len(self._norm_keys)
+
+    #Defining __str__ method
+    def __str__(self) -> str:
+        return f"offsetMap(breakpoints={len(self._norm_keys)})"
+
+    #Defining __repr__ method
+    def __repr__(self) -> str:
+        return self.__str__()
@@ -3,11 +3,16 @@ File Name: reasonCode.py
 Description: Data Class for Reason Code
 '''
 
+from array import array
+
 class reasonCode:
-    def __init__(self,code:str, is_escalation: bool, score: int):
+    def __init__(self,code:str, is_escalation: bool, score: int, spans: array = None):
         self._code = code
         self._is_escalation = is_escalation
         self._score = score
+        # Matched phrase offsets into the normalized text, stored flat as
+        # start, end, start, end, ... so no substrings are copied
+        self._spans = spans if spans is not None else array("l")
 
     #Getters
     def get_code(self) -> str:
@@ -18,6 +23,10 @@ class reasonCode:
     
     def get_score(self) -> int:
         return self._score
+
+    def get_spans(self) -> list[tuple[int, int]]:
+        spans = self._spans
+        return list(zip(spans[::2], spans[1::2]))
     
     #Setters
     def set_code(self, code: str):
@@ -29,6 +38,17 @@ class reasonCode:
     def set_score(self, score: int):
         self._score = score
 
+    def set_spans(self, spans: array):
+        self._spans = spans
+
+    def to_json(self) -> dict:
+        return {
+            "_code": self._code,
+            "_is_escalation": self._is_escalation,
+            "_score": self._score,
+            "_spans": [list(span) for span in self.get_spans()],
+        }
+
         
     #Defining __str__ method
     def __str__(self) -> str:
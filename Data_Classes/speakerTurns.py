@@ -0,0 +1,94 @@
+'''
+File Name: speakerTurns.py
+Description: Data Class for the speaker turns of a transcript, stored as
+             compact array columns over the raw text
+'''
+
+from array import array
+
+# Speaker roles
+AGENT = "agent"
+CUSTOMER = "customer"
+OTHER = "other"     # e.g. a "# Transcript" header line, not a party to the call
+
+
+class speakerTurns:
+    """Turn table: turn i is spoken by speaker ``speaker_ids[i]`` and its
+    utterance is ``raw_text[starts[i]:ends[i]]`` (after the "Name:" label,
+    including any unlabelled continuation lines).
+
+    Speaker names are interned: each distinct name gets one small integer id,
+    in order of first appearance.  ``roles[id]`` is that speaker's role
+    (AGENT, CUSTOMER or OTHER).
+    """
+
+    def __init__(self, speaker_names: list, speaker_ids: array, starts: array, ends: array, roles: list = None):
+        self._speaker_names = speaker_names
+        self._speaker_ids = speaker_ids
+        self._starts = starts
+        self._ends = ends
+        self._roles = roles if roles is not None else [OTHER] * len(speaker_names)
+
+    #Getters
+    def get_speaker_names(self) -> list[str]:
+        return self._speaker_names
+
+    def get_speaker_ids(self) -> array:
+        return self._speaker_ids
+
+    def get_starts(self) -> array:
+        return self._starts
+
+    def get_ends(self) -> array:
+        return self._ends
+
+    def get_roles(self) -> list[str]:
+        return self._roles
+
+    def speaker_id(self, name: str) -> int:
+        """Interned id of *name*; raises ValueError for an unknown speaker."""
+        return self._speaker_names.index(name)
+
+    def speaker(self, i: int) -> str:
+        return self._speaker_names[self._speaker_ids[i]]
+
+    def role(self, speaker_id: int) -> str:
+        return self._roles[speaker_id]
+
+    def speakers_with_role(self, role: str) -> list[int]:
+        """Ids of the speakers classified as *role*."""
+        return [sid for sid, r in enumerate(self._roles) if r == role]
+
+    def span(self, i: int) -> tuple[int, int]:
+        return self._starts[i], self._ends[i]
+
+    def text(self, raw_text: str, i: int) -> str:
+        """Utterance of turn *i*, stripped of surrounding whitespace."""
+        return raw_text[self._starts[i]:self._ends[i]].strip()
+
+    def turns_of(self, speaker_id: int) -> list[int]:
+        """Indexes of the turns spoken by *speaker_id*."""
+        return [i for i, sid in enumerate(self._speaker_ids) if sid == speaker_id]
+
+    def spans_of(self, speaker_ids) -> list[tuple[int, int]]:
+        """Raw-text spans of every turn spoken by one of *speaker_ids*, in order."""
+        wanted = set(speaker_ids)
+        return [(start, end) for sid, start, end in zip(self._speaker_ids, self._starts, self._ends)
+                if sid in wanted]
+
+    def normalized_spans_of(self, speaker_ids, offset_map) -> list[tuple[int, int]]:
+        """``spans_of`` translated into normalized-text offsets through *offset_map*."""
+        to_normalized = offset_map.to_normalized
+        return [(to_normalized(start), to_normalized(end)) for start, end in self.spans_of(speaker_ids)]
+
+    #Defining __len__ method
+    def __len__(self) -> int:
+        return len(self._speaker_ids)
+
+    #Defining __str__ method
+    def __str__(self) -> str:
+        return f"speakerTurns(turns={len(self._speaker_ids)}, speakers={self._speaker_names}, roles={self._roles})"
+
+    #Defining __repr__ method
+    def __repr__(self) -> str:
+        return self.__str__()
@@ -5,12 +5,26 @@ Description: Data Class for transcript
 
 from datetime import datetime
 
+from Data_Classes.offsetMap import offsetMap as OffsetMap
+from Data_Classes.speakerTurns import speakerTurns as SpeakerTurns, CUSTOMER
+
 class transcript:
-    def __init__(self, raw_text: str,normalized_text: str, speakers: list,timestamp: str):
+    def __init__(self, raw_text: str,normalized_text: str, speakers: list,timestamp: str, token_index: dict = None,
+                 turns: SpeakerTurns = None):
         self._raw_text = raw_text
         self._normalized_text = normalized_text
         self._speakers = speakers
         self._timestamp = timestamp
+        # token -> offset of first occurrence in normalized_text, built on first use
+        self._token_index = token_index
+        # the same, over the customer's spans only, built on first use
+        self._customer_token_index = None
+        # speaker turns as offsets into raw_text (None = not built)
+        self._turns = turns
+        # normalized <-> raw offsets, built on first use (most runs never need it)
+        self._offset_map = None
+        # normalized spans of the customer's turns, built on first use
+        self._customer_spans = None
     
     #Defining Getters
     def get_raw_text(self) -> str:
@@ -21,16 +35,55 @@ class transcript:
         return self._speakers
     def get_timestamp(self) -> str:
         return self._timestamp
+    def get_token_index(self) -> dict:
+        if self._token_index is None:
+            # Imported here: the parser module imports this one
+            from engines.transcriptParser import build_token_index
+            self._token_index = build_token_index(self._normalized_text)
+        return self._token_index
+    def get_turns(self) -> SpeakerTurns:
+        return self._turns
+    def get_offset_map(self) -> OffsetMap:
+        if self._offset_map is None:
+            self._offset_map = OffsetMap(self._raw_text, self._normalized_text)
+        return self._offset_map
+    def get_customer_spans(self) -> list:
+        """Normalized-text (start, end) spans of the customer's turns, or None
+        when there are no turns or the customer never speaks."""
+        if self._customer_spans is None:
+            turns = self._turns
+            customers = turns.speakers_with_role(CUSTOMER) if turns is not None else ()
+            self._customer_spans = turns.normalized_spans_of(customers, self.get_offset_map()) if customers else ()
+        return self._customer_spans or None
+    def get_customer_token_index(self) -> dict:
+        """Token index over ``get_customer_spans()`` only, or None when there are none."""
+        if self._customer_token_index is None:
+            spans = self.get_customer_spans()
+            if spans is None:
+                return None
+            from engines.transcriptParser import build_span_token_index
+            self._customer_token_index = build_span_token_index(self._normalized_text, spans)
+        return self._customer_token_index
     
     #Defining Setters
     def set_raw_text(self, raw_text: str):
         self._raw_text = raw_text
+        self._turns = None
+        self._offset_map = None
+        self._customer_spans = None
+        self._customer_token_index = None
     def set_normalized_text(self, normalized_text: str):
         self._normalized_text = normalized_text
+        self._token_index = None
+        self._offset_map = None
+        self._customer_spans = None
+        self._customer_token_index = None
     def set_speakers(self, speakers: list):
         self._speakers = speakers
     def set_timestamp(self, timestamp: str):
         self._timestamp = timestamp
+    def set_token_index(self, token_index: dict):
+        self._token_index = token_index
 
     #Defining __str__ method
     def __str__(self) -> str:
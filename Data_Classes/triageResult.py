@@ -15,16 +15,31 @@ class triageResult:
         self._summary_bullet = summary_bullet
 
     #Getters
+    def get_intent(self) -> str:
+        return self._intent
+
+    def get_escalate(self) -> bool:
+        return self._escalate
+
+    def get_risk_level(self) -> str:
+        return self._risk_level
+
     def get_reason_codes(self) -> list[reasonCode]:
         return self._reason_codes
 
+    def get_entities(self) -> Entities:
+        return self._entities
+
+    def get_summary_bullet(self) -> list[str]:
+        return self._summary_bullet
+
     def to_json(self) -> dict:
         return {
             "intent": self._intent,
             "escalate": self._escalate,
             "risk_level": self._risk_level,
-            "reason_codes": [rc.__dict__ for rc in self._reason_codes],
-            "entities": self._entities,
+            "reason_codes": [rc.to_json() for rc in self._reason_codes],
+            "entities": self._entities.to_json(),
             "summary_bullet": self._summary_bullet
         }
     
@@ -25,8 +25,9 @@ import glob
 # Make sure repo root is on the path when run directly
 sys.path.insert(0, os.path.dirname(__file__))
 
-from engines.triageResult import _process_file, TriagePipeline
+from engines.triageResult import _process_file, _triage_escalation_only, TriagePipeline
 from engines.pipelinePool import PipelinePool
+from engines.pipelineMetrics import STAGES
 
 # ---------------------------------------------------------------------------
 # Helpers
@@ -74,6 +75,10 @@ def main():
     _, seq_ms = _time_call(lambda: [_process_file(p) for p in transcripts])
     rows.append(_row("Sequential (loop)", 1, seq_ms, n))
 
+    print("Running escalation-only …", flush=True)
+    _, esc_ms = _time_call(lambda: [_triage_escalation_only(p) for p in transcripts])
+    rows.append(_row("Escalation-only (loop)", 1, esc_ms, n))
+
     # ------------------------------------------------------------------
     # 2. Cold parallel — spin up ProcessPoolExecutor 3 times
     # ------------------------------------------------------------------
@@ -102,6 +107,13 @@ def main():
 
     pool.shutdown()
 
+    # ------------------------------------------------------------------
+    # 4. Per-stage breakdown (merged from the warm pool's workers)
+    # ------------------------------------------------------------------
+    stage_rows = [
+        f"| {stage:<35} | {pool.metrics.get_mean_ms(stage):>9.3f} |" for stage in STAGES
+    ]
+
     # ------------------------------------------------------------------
     # Print table
     # ------------------------------------------------------------------
@@ -114,6 +126,15 @@ def main():
     print(sep)
     print()
 
+    stage_sep = "+" + "-"*37 + "+" + "-"*11 + "+"
+    print(stage_sep)
+    print("| {:<35} | {:^9} |".format("Stage", "mean ms"))
+    print(stage_sep)
+    for row in stage_rows:
+        print(row)
+    print(stage_sep)
+    print()
+
 
 if __name__ == "__main__":
     main()
@@ -3,6 +3,7 @@ File Name: batchReporter.py
 Description: Engine to generate batch reports
 """
 from Data_Classes.triageResult import triageResult as TriageResult
+from engines.loanIndex import LoanIndex
 import pandas as pd
 
 class batchReporter:
@@ -79,6 +80,19 @@ class batchReporter:
         # Return only patterns that occurred with their counts
         return [f"{pattern} ({count} occurrences)" for pattern, count in patterns.items() if count > 0]
         
+    def build_loan_index(self, results: list[TriageResult], transcript_ids: list = None) -> LoanIndex:
+        #Index the batch by loan number (ids default to each result's position)
+        return LoanIndex().add_all(results, transcript_ids)
+
+    def loan_report(self, loan_index: LoanIndex, min_calls: int = 2, min_escalations: int = 2) -> dict:
+        """Repeat callers, their per-loan call history and loans escalated several times"""
+        repeat_callers = loan_index.repeat_callers(min_calls)
+        return {
+            "repeat_callers": repeat_callers,
+            "escalation_history": {loan: loan_index.history(loan) for loan in repeat_callers},
+            "multi_escalated": loan_index.multi_escalated(min_escalations),
+        }
+
     def build_report_dataframe(self, results: list[TriageResult]) -> pd.DataFrame:
         #Build a pandas DataFrame summarizing the batch of triage results
         data = []
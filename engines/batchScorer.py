@@ -0,0 +1,151 @@
+"""
+File Name: batchScorer.py
+Description: Vectorised batch rule scoring for offline corpus re-scoring.
+             Transcripts are scanned once into a sparse phrase-occurrence
+             matrix (transcripts x phrases); rule scores are then a product
+             with a phrase-to-rule weight matrix, and thresholds / escalation
+             decisions are applied to the whole batch at once.  When only
+             weights or thresholds change, the stored matrix is re-scored
+             without touching the transcripts again.
+"""
+
+from itertools import repeat
+
+import numpy as np
+
+from engines.ruleEngine import RuleSet, DEFAULT_RULESET
+from engines.transcriptParser import transcriptParser
+from engines.transcriptReader import read_transcript
+
+
+class OccurrenceMatrix:
+    """Sparse binary transcripts x phrases matrix in CSR form.
+
+    Row *i* holds the phrase ids found in transcript *i*:
+    ``indices[indptr[i]:indptr[i + 1]]``.
+    """
+
+    def __init__(self, indptr: np.ndarray, indices: np.ndarray, n_features: int):
+        self.indptr = indptr
+        self.indices = indices
+        self.n_features = n_features
+
+    @property
+    def n_rows(self) -> int:
+        return len(self.indptr) - 1
+
+    def row_ids(self) -> np.ndarray:
+        """Row number of every stored entry (the COO row array)."""
+        return np.repeat(np.arange(self.n_rows), np.diff(self.indptr))
+
+    def save(self, path: str):
+        np.savez_compressed(path, indptr=self.indptr, indices=self.indices,
+                            n_features=np.array(self.n_features))
+
+    @classmethod
+    def load(cls, path: str) -> "OccurrenceMatrix":
+        with np.load(path) as data:
+            return cls(data["indptr"], data["indices"], int(data["n_features"]))
+
+
+class BatchScorer:
+    """Score many transcripts at once against a RuleSet.
+
+    Usage::
+
+        scorer = BatchScorer()
+        matrix = scorer.index(texts)            # one scan per transcript
+        scores = scorer.scores(matrix)          # (n_transcripts, n_rules)
+        result = scorer.decide(scores)          # escalate / risk_level arrays
+
+        # Later: new weights or thresholds, same matrix, no re-scan
+        scores = scorer.scores(matrix, weights=new_weights)
+        result = scorer.decide(scores, thresholds=new_thresholds)
+    """
+
+    def __init__(self, rules: RuleSet = None):
+        self.rules = rules if rules is not None else DEFAULT_RULESET
+        self.rule_names = self.rules.get_escalation_names() + self.rules.get_normal_names()
+        self.features = self.rules.features()
+
+        column = {name: i for i, name in enumerate(self.rule_names)}
+        # Phrase-to-rule weight matrix, taken from the compiled per-phrase weights
+        self.weights = np.zeros((len(self.features), len(self.rule_names)), dtype=np.int32)
+        for f, (_, _, rule_hits) in enumerate(self.features):
+            for name, pts in rule_hits:
+                self.weights[f, column[name]] += pts
+
+        thresholds = self.rules.get_thresholds()
+        self.thresholds = np.array([thresholds[name] for name in self.rule_names], dtype=np.int32)
+        self.escalation_mask = np.zeros(len(self.rule_names), dtype=bool)
+        self.escalation_mask[:len(self.rules.get_escalation_names())] = True
+
+    # ------------------------------------------------------------------
+    # Indexing
+    # ------------------------------------------------------------------
+
+    def index(self, texts, token_indexes=None, spans=None) -> OccurrenceMatrix:
+        """Scan normalised *texts* once into an OccurrenceMatrix.
+
+        *token_indexes* optionally supplies each text's parser token index,
+        and *spans* each text's scanned regions (None for the whole text).
+        """
+        feature_hits = self.rules.feature_hits
+        if token_indexes is None:
+            token_indexes = repeat(None)
+        if spans is None:
+            spans = repeat(None)
+        indptr = [0]
+        indices = []
+        for text, tokens, text_spans in zip(texts, token_indexes, spans):
+            indices.extend(feature_hits(text, tokens, text_spans))
+            indptr.append(len(indices))
+        return OccurrenceMatrix(np.array(indptr, dtype=np.int64),
+                                np.array(indices, dtype=np.int32),
+                                len(self.features))
+
+    def index_files(self, file_paths: list, customer_only: bool = True) -> OccurrenceMatrix:
+        """Read, parse and index transcript files, scanning the same turns as the pipeline."""
+        parser = transcriptParser()
+        texts, tokens, spans = [], [], []
+        for path in file_paths:
+            transcript = parser.parse_transcript(read_transcript(path))
+            customer_spans = transcript.get_customer_spans() if customer_only else None
+            texts.append(transcript.get_normalized_text())
+            tokens.append(transcript.get_token_index() if customer_spans is None
+                          else transcript.get_customer_token_index())
+            spans.append(customer_spans)
+        return self.index(texts, tokens, spans)
+
+    # ------------------------------------------------------------------
+    # Vectorised scoring
+    # ------------------------------------------------------------------
+
+    def scores(self, matrix: OccurrenceMatrix, weights: np.ndarray = None) -> np.ndarray:
+        """Return the (n_transcripts, n_rules) score matrix: occurrences @ weights."""
+        weights = self.weights if weights is None else weights
+        rows = matrix.row_ids()
+        contributions = weights[matrix.indices]
+        out = np.empty((matrix.n_rows, weights.shape[1]), dtype=weights.dtype)
+        for r in range(weights.shape[1]):
+            out[:, r] = np.bincount(rows, weights=contributions[:, r], minlength=matrix.n_rows)
+        return out
+
+    def decide(self, scores: np.ndarray, thresholds: np.ndarray = None) -> dict:
+        """Apply thresholds and escalation logic to a whole score matrix.
+
+        Mirrors ruleEngine + escalationEngine: a call escalates when any
+        escalation rule fires, and risk is HIGH when it escalates with two or
+        more codes fired, MEDIUM with one, LOW otherwise.
+        """
+        thresholds = self.thresholds if thresholds is None else thresholds
+        fired = scores >= thresholds
+        escalate = fired[:, self.escalation_mask].any(axis=1)
+        n_fired = fired.sum(axis=1)
+        risk = np.where(escalate & (n_fired >= 2), "HIGH",
+                        np.where(escalate, "MEDIUM", "LOW"))
+        return {
+            "fired": fired,
+            "escalate": escalate,
+            "risk_level": risk,
+        }
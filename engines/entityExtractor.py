@@ -3,8 +3,10 @@ File Name: entityExtractor.py
 Description: Entity Extractor Engine
 """
 import re
+from functools import lru_cache
 from Data_Classes.entities import Entities
 from Data_Classes.transcript import transcript as Transcript
+from engines.transcriptParser import normalize_text
 
 # ---------------------------------------------------------------------------
 # Pre-compiled patterns — built once at import time, reused on every call
@@ -53,16 +55,274 @@ _LOAN_RES = [
     re.compile(r'\b(?:loan|account|reference|application|file)\s*(?:number|no\.?|#)\s*(?:is\s*)?(\d{4,20})\b', re.IGNORECASE),
 ]
 
+# ---------------------------------------------------------------------------
+# Fused scan — every entity pattern above starts either at a non-word char in
+# "$(+" or at the start of a word, and only a few leading tokens are possible.
+# One pass of _ANCHOR_RE finds those candidate starts; each candidate is then
+# handed only to the patterns that can begin with that token, via an anchored
+# match().  Per pattern, a candidate inside that pattern's previous match is
+# skipped, so each family yields exactly what its own finditer would.
+# ---------------------------------------------------------------------------
+_MONTHS = "jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec"
+
+_ANCHOR_RE = re.compile(rf"""
+    (?<!\w)
+    (?:
+        (?P<digit>\d)
+      | (?P<currency>(?:us|ca|c)?\$|usd|cad)
+      | (?P<phone>[(+])
+      | (?P<month>{_MONTHS})
+      | (?P<loan>loan)
+      | (?P<context>mortgage|principal|borrow|purchase|home|price)
+      | (?P<reference>account|reference|application|file)
+      | (?P<ln>ln-)
+    )
+""", re.IGNORECASE | re.VERBOSE)
+
+# Slots in the scan output, one per pattern, in the order each family
+# concatenates its patterns' hits today
+_MONEY, _BARE, _DATE_0 = 0, 1, 2
+_PHONE = _DATE_0 + len(_DATE_RES)
+_LOAN_0 = _PHONE + 1
+_SCAN_PATTERNS = (_MONEY_RE, _BARE_RE, *_DATE_RES, _PHONE_RE, *_LOAN_RES)
+
+# "LN-" loan numbers are case-sensitive, but the scan runs on lowercased
+# text: candidates are found case-insensitively there, then confirmed against
+# the raw text through the transcript's offset map
+_LN_FOLDED_RE = re.compile(_LOAN_RES[0].pattern, re.IGNORECASE)
+_FOLDED_PATTERNS = (*_SCAN_PATTERNS[:_LOAN_0], _LN_FOLDED_RE, *_LOAN_RES[1:])
+_SCAN_MATCHERS = tuple(r.match for r in _FOLDED_PATTERNS)
+
+# Anchor group -> slots of the patterns that can start there
+_DISPATCH = {
+    "digit":     (_MONEY, _DATE_0, _DATE_0 + 1, _DATE_0 + 3, _DATE_0 + 4, _PHONE),
+    "currency":  (_MONEY,),
+    "phone":     (_PHONE,),
+    "month":     (_DATE_0 + 2, _DATE_0 + 5),
+    "loan":      (_BARE, _LOAN_0 + 1),
+    "context":   (_BARE,),
+    "reference": (_LOAN_0 + 1,),
+    "ln":        (_LOAN_0,),
+}
+
+
+# ---------------------------------------------------------------------------
+# Digit windows — every entity pattern needs at least one digit, and no
+# pattern can match across a character outside _SPAN_CHARS (e.g. "?", "!",
+# "'", ";").  So matches only ever lie inside a run of span characters that
+# contains a digit; everything else is never scanned.  The window edges are
+# non-word characters, so lookbehinds and \b behave as on the full text.
+# ---------------------------------------------------------------------------
+_SPAN_CHARS = r"\w\s$,./\-()+:#"
+_BREAK_RE   = re.compile(rf"[^{_SPAN_CHARS}]")
+_DIGIT_RE   = re.compile(r"\d")
+
+
+def _digit_windows(text: str) -> list[tuple[int, int]]:
+    """Return (start, end) of each span-character run of *text* holding a digit."""
+    digit = _DIGIT_RE.search(text)
+    if digit is None:
+        return []
+    n = len(text)
+    # Reversed copy, so the break before a digit is a forward search
+    reversed_text = text[::-1]
+    windows = []
+    while digit is not None:
+        before = _BREAK_RE.search(reversed_text, n - digit.start())
+        after = _BREAK_RE.search(text, digit.end())
+        start = n - before.start() if before else 0
+        end = after.start() if after else n
+        windows.append((start, end))
+        digit = _DIGIT_RE.search(text, end)
+    return windows
+
+
+def _finditer_windows(pattern: re.Pattern, text: str, windows: list) -> list:
+    """``pattern.finditer(text)`` restricted to *windows*; same matches, same order."""
+    return [m for start, end in windows for m in pattern.finditer(text, start, end)]
+
+
+def _scan(text: str) -> list[list]:
+    """Return the matches of every entity pattern from one pass over *text*.
+
+    Slot *i* holds pattern *i*'s matches in ``finditer`` order.  Only the
+    digit windows are scanned.
+    """
+    matchers = _SCAN_MATCHERS
+    last_end = [0] * len(matchers)
+    hits = [[] for _ in matchers]
+    for window_start, window_end in _digit_windows(text):
+        for anchor in _ANCHOR_RE.finditer(text, window_start, window_end):
+            start = anchor.start()
+            for slot in _DISPATCH[anchor.lastgroup]:
+                if start >= last_end[slot]:
+                    m = matchers[slot](text, start)
+                    if m is not None:
+                        last_end[slot] = m.end()
+                        hits[slot].append(m)
+    return hits
+
+
+def _confirmed_in_raw(pattern: re.Pattern, transcript: Transcript, matches: list) -> list[tuple]:
+    """Return (match, raw_start, raw_end) for each normalised-text match whose
+    raw-text span fully matches *pattern*."""
+    if not matches:
+        return []
+    offset_map = transcript.get_offset_map()
+    raw = transcript.get_raw_text()
+    confirmed = []
+    for m in matches:
+        start, end = offset_map.span_to_raw(m.start(), m.end())
+        if pattern.fullmatch(raw, start, end):
+            confirmed.append((m, start, end))
+    return confirmed
+
+
+def _redact(text: str, spans: list) -> str:
+    """Replace each (start, end, tag) span of *text* with its tag; overlapping
+    spans merge into one, tagged by the earliest."""
+    pieces = []
+    last = 0
+    for start, end, tag in sorted(spans):
+        if start < last:
+            # Overlaps the span just written; extend it
+            if end > last:
+                last = end
+            continue
+        pieces.append(text[last:start])
+        pieces.append(tag)
+        last = end
+    pieces.append(text[last:])
+    return "".join(pieces)
+
+
+def _then_end(chunks):
+    """Yield every chunk, then None to mark the end of the stream."""
+    yield from chunks
+    yield None
+
+
+def _normalize_stream(chunks):
+    """Yield (normalized, cased) pieces for a stream of raw text chunks.
+
+    The normalized pieces concatenate to ``normalize_text`` of the whole
+    stream.  *cased* is the same piece before case and punctuation folding,
+    character-aligned with it, so a match's original spelling is the same
+    slice of it.  Where ``lower()`` changes a piece's length (e.g. "İ") the
+    folded piece stands in for it.
+    """
+    started = False
+    space = False
+    for chunk in chunks:
+        tokens = chunk.split()
+        if not tokens:
+            # Whitespace only: at most one separator before the next token
+            space = space or (started and bool(chunk))
+            continue
+        cased = " ".join(tokens)
+        normalized = normalize_text(cased)
+        if len(normalized) != len(cased):
+            cased = normalized
+        if started and (space or chunk[0].isspace()):
+            cased = " " + cased
+            normalized = " " + normalized
+        started = True
+        space = chunk[-1].isspace()
+        yield normalized, cased
+
+
+def _unique(items) -> list:
+    """Drop repeats, keeping first-seen order."""
+    seen = set()
+    uniq = []
+    for item in items:
+        if item not in seen:
+            seen.add(item)
+            uniq.append(item)
+    return uniq
+
+
 # Magnitude / currency tokens for to_number
 _BN_RE     = re.compile(r"\b(billion|bn)\b")
 _MIL_RE    = re.compile(r"\bmillion\b")
 _THOU_RE   = re.compile(r"\bthousand\b")
 _KMB_RE    = re.compile(r"\b(k|m|b)\b")
 
+# ---------------------------------------------------------------------------
+# ISO date normalisation.  The date patterns accept any letters after a month
+# abbreviation ("mar" also starts "margin"), so the month word is looked up in
+# a fixed table and anything that is not a real month or day is rejected.
+# ---------------------------------------------------------------------------
+_MONTH_NAMES = ("january", "february", "march", "april", "may", "june", "july",
+                "august", "september", "october", "november", "december")
+_MONTH_NUMBERS = {name: i for i, name in enumerate(_MONTH_NAMES, 1)}
+_MONTH_NUMBERS.update({name[:3]: i for i, name in enumerate(_MONTH_NAMES, 1)})
+_MONTH_NUMBERS["sept"] = 9
+_DAYS_IN_MONTH = (31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+_DATE_PART_RE = re.compile(r"\d+|[a-z]+")
+
+# Distinct raw date strings remembered across the process
+DATE_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def normalize_date(raw: str):
+    """Return *raw* (as matched by a date pattern) in ISO 8601 form, or None.
+
+    Numeric dates are read as M/D/Y unless they lead with a four-digit year;
+    two-digit years pivot like ``%y`` (69-99 -> 19xx, 00-68 -> 20xx).  Dates
+    without a year come back as ``--MM-DD``.
+    """
+    parts = _DATE_PART_RE.findall(raw.lower())
+    if parts[1].isdigit():
+        if parts[0].isdigit():
+            if len(parts) != 3:
+                return None
+            year, month, day = parts if len(parts[0]) == 4 else (parts[2], parts[0], parts[1])
+        else:
+            # "jan 5, 2023" / "jan 5"
+            month, day, year = parts[0], parts[1], parts[2] if len(parts) > 2 else None
+            month = _MONTH_NUMBERS.get(month)
+    else:
+        # "5 jan 2023" / "5 jan"
+        day, month, year = parts[0], parts[1], parts[2] if len(parts) > 2 else None
+        month = _MONTH_NUMBERS.get(month)
+    if month is None:
+        return None
+    month, day = int(month), int(day)
+    if year is not None:
+        if len(year) == 3:
+            return None
+        year = int(year) + (0 if len(year) == 4 else 1900 if int(year) >= 69 else 2000)
+    if not (1 <= month <= 12 and 1 <= day <= _DAYS_IN_MONTH[month - 1]):
+        return None
+    if year is None:
+        return f"--{month:02d}-{day:02d}"
+    if month == 2 and day == 29 and not (year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)):
+        return None
+    return f"{year:04d}-{month:02d}-{day:02d}"
+
+
+# Distinct raw amount strings remembered per extractor; surface forms like
+# "$1,200" or "5k" recur across a corpus far more often than they vary
+AMOUNT_CACHE_SIZE = 4096
+
+# Characters of surrounding text kept on each side of an amount as its context
+_CONTEXT_CHARS = 40
+
+# Placeholders written over each family by entityExtractor.extract_and_redact
+REDACTION_TAGS = {"amount": "[AMOUNT]", "phone": "[PHONE]", "loan_number": "[LOAN_NUMBER]"}
+
+# Default characters held back at the end of each chunk by iter_entities, so
+# a match crossing a chunk boundary is only reported once it is complete.
+# Must cover the longest entity plus its trailing context.
+STREAM_OVERLAP = 256
+
 
 class entityExtractor:
-    def __init__(self):
-        pass
+    def __init__(self, amount_cache_size: int = AMOUNT_CACHE_SIZE):
+        # Per-instance LRU over _to_number, so each warm worker keeps its own
+        self._cached_to_number = lru_cache(maxsize=amount_cache_size)(self._to_number)
 
     # ------------------------------------------------------------------
     # Internal helpers
@@ -107,71 +367,382 @@ class entityExtractor:
             return int(round(val))
         return val
 
-    def _extract_amounts_with_context(self, text: str) -> list[tuple]:
-        raw_hits = []
-        raw_contexts = []
-        for m in _MONEY_RE.finditer(text):
-            raw_hits.append(m.group(1))
-            raw_contexts.append(text[max(0, m.start() - 40):m.end() + 40].strip())
-        for m in _BARE_RE.finditer(text):
-            raw_hits.append(m.group(1))
-            raw_contexts.append(text[max(0, m.start() - 40):m.end() + 40].strip())
+    def _amounts_from_matches(self, text: str, matches) -> list[tuple]:
+        """Normalise money matches into unique (amount, (start, end)) pairs.
 
+        The span is the amount's context window in *text*; callers slice it
+        out only when they need the snippet.
+        """
         seen = set()
         uniq = []
-        for h, ctx in zip(raw_hits, raw_contexts):
-            v = self._to_number(h)
+        n = len(text)
+        for m in matches:
+            v = self._cached_to_number(m.group(1))
             if v is not None and v not in seen:
                 seen.add(v)
-                uniq.append((v, ctx))
+                uniq.append((v, (max(0, m.start() - _CONTEXT_CHARS), min(n, m.end() + _CONTEXT_CHARS))))
         return uniq
 
+    def _extract_amounts_with_context(self, text: str) -> list[tuple]:
+        return self._amounts_in(text, _digit_windows(text))
+
+    # Per-family scans over precomputed digit windows, shared by the public
+    # extract_* methods and LazyEntities
+
+    def _amounts_in(self, text: str, windows: list) -> list[tuple]:
+        return self._amounts_from_matches(
+            text, _finditer_windows(_MONEY_RE, text, windows) + _finditer_windows(_BARE_RE, text, windows))
+
+    @staticmethod
+    def _dates_in(text: str, windows: list) -> list:
+        dates = []
+        for pattern in _DATE_RES:
+            dates.extend(m.group(0) for m in _finditer_windows(pattern, text, windows))
+        return dates
+
+    @staticmethod
+    def _phones_in(text: str, windows: list) -> list:
+        return [m.group(0) for m in _finditer_windows(_PHONE_RE, text, windows)]
+
+    @staticmethod
+    def _loan_numbers_in(text: str, windows: list) -> list:
+        hits = []
+        for pat in _LOAN_RES:
+            for m in _finditer_windows(pat, text, windows):
+                hits.append(m.group(1) if m.lastindex else m.group(0))
+        return _unique(hits)
+
+    @staticmethod
+    def _transcript_loan_numbers(raw_text: str, ln_confirmed: list, other_matches) -> list:
+        """Loan numbers from normalised-text matches, with "LN-" ones as confirmed in the raw text."""
+        hits = [raw_text[start:end] for _, start, end in ln_confirmed]
+        hits.extend(m.group(1) if m.lastindex else m.group(0) for m in other_matches)
+        return _unique(hits)
+
+    def _extract(self, transcript: Transcript) -> tuple:
+        """Scan once; return the Entities, the per-slot hits and the confirmed "LN-" matches."""
+        text = transcript.get_normalized_text()
+        hits = _scan(text)
+        ln_confirmed = _confirmed_in_raw(_LOAN_RES[0], transcript, hits[_LOAN_0])
+        pairs = self._amounts_from_matches(text, hits[_MONEY] + hits[_BARE])
+        dates = [m.group(0) for slot in hits[_DATE_0:_PHONE] for m in slot]
+        entities = Entities(
+            amounts=[v for v, _ in pairs],
+            amount_spans=[span for _, span in pairs],
+            source_text=text,
+            dates=dates,
+            iso_dates=[normalize_date(d) for d in dates],
+            phones=[m.group(0) for m in hits[_PHONE]],
+            loan_numbers=self._transcript_loan_numbers(
+                transcript.get_raw_text(), ln_confirmed, (m for slot in hits[_LOAN_0 + 1:] for m in slot)),
+        )
+        return entities, hits, ln_confirmed
+
     # ------------------------------------------------------------------
     # Public API
     # ------------------------------------------------------------------
 
+    def amount_cache_info(self) -> dict:
+        """Return hit / miss statistics for the amount normalisation cache."""
+        info = self._cached_to_number.cache_info()
+        return {"hits": info.hits, "misses": info.misses,
+                "maxsize": info.maxsize, "currsize": info.currsize}
+
+    def clear_amount_cache(self):
+        self._cached_to_number.cache_clear()
+
     def extract_amounts(self, text: str) -> list:
         """Return flat list of numeric amounts (backward-compatible)."""
         return [v for v, _ in self._extract_amounts_with_context(text)]
 
     def extract_amounts_with_context(self, text: str) -> list[tuple]:
         """Return list of (amount, context_snippet) pairs."""
-        return self._extract_amounts_with_context(text)
+        return [(v, text[start:end].strip()) for v, (start, end) in self._extract_amounts_with_context(text)]
 
     def extract_dates(self, text: str) -> list:
-        dates = []
-        for pattern in _DATE_RES:
-            dates.extend(m.group(0) for m in pattern.finditer(text))
-        return dates
+        return self._dates_in(text, _digit_windows(text))
+
+    def extract_dates_iso(self, text: str) -> list[tuple]:
+        """Return list of (raw_date, iso_date) pairs; iso_date is None if unparseable."""
+        return [(d, normalize_date(d)) for d in self.extract_dates(text)]
 
     def extract_phones(self, text: str) -> list:
-        return [m.group(0) for m in _PHONE_RE.finditer(text)]
+        return self._phones_in(text, _digit_windows(text))
 
     def extract_loan_numbers(self, text: str) -> list:
-        hits = []
-        for pat in _LOAN_RES:
-            for m in pat.finditer(text):
-                hits.append(m.group(1) if m.lastindex else m.group(0))
-
-        seen = set()
-        uniq = []
-        for h in hits:
-            if h not in seen:
-                seen.add(h)
-                uniq.append(h)
-        return uniq
+        return self._loan_numbers_in(text, _digit_windows(text))
 
     # Backwards-compatible alias (old misspelling)
     def extract_loan_numbesrs(self, text: str) -> list:
         return self.extract_loan_numbers(text)
 
     def extract_all_entities(self, transcript: Transcript) -> Entities:
-        text = transcript.get_normalized_text()
-        pairs = self._extract_amounts_with_context(text)
+        """Extract every entity family from a single scan of the normalised text."""
+        return self._extract(transcript)[0]
+
+    def extract_and_redact(self, transcript: Transcript, normalized: bool = False) -> tuple:
+        """Return (entities, redacted_text) from the single extraction scan.
+
+        Every amount, phone number and loan number occurrence (not only the
+        de-duplicated values) is replaced by its tag from REDACTION_TAGS.
+        The raw text is redacted by default, via the transcript's offset map;
+        ``normalized=True`` redacts the normalised text instead.
+        """
+        entities, hits, ln_confirmed = self._extract(transcript)
+        amount, phone, loan = REDACTION_TAGS["amount"], REDACTION_TAGS["phone"], REDACTION_TAGS["loan_number"]
+        spans = [(*m.span(1), amount) for slot in hits[_MONEY:_DATE_0] for m in slot]
+        spans += [(*m.span(), phone) for m in hits[_PHONE]]
+        spans += [(*m.span(1 if m.lastindex else 0), loan) for slot in hits[_LOAN_0 + 1:] for m in slot]
+        if normalized:
+            spans += [(*m.span(), loan) for m, _, _ in ln_confirmed]
+            return entities, _redact(transcript.get_normalized_text(), spans)
+        if spans:
+            to_raw = transcript.get_offset_map().to_raw
+            spans = [(to_raw(start), to_raw(end), tag) for start, end, tag in spans]
+        spans += [(start, end, loan) for _, start, end in ln_confirmed]
+        return entities, _redact(transcript.get_raw_text(), spans)
+
+    def redact(self, transcript: Transcript, normalized: bool = False) -> str:
+        """Return the transcript text with amounts, phones and loan numbers replaced by tags."""
+        return self.extract_and_redact(transcript, normalized)[1]
+
+    def _stream_matches(self, chunks, overlap: int):
+        """Yield (slot, start, value, context) for every entity match in a stream of chunks.
+
+        *slot* is the pattern's index in the scan and *start* the match's
+        offset in the normalised stream, so sorting by (slot, start) gives
+        the order ``extract_all_entities`` reports in.  Every occurrence is
+        yielded; repeats are not dropped here.  Unparseable amounts are
+        skipped, and "LN-" candidates are only yielded when the original
+        spelling confirms them.
+        """
+        if overlap <= 2 * _CONTEXT_CHARS:
+            raise ValueError(f"overlap must be greater than {2 * _CONTEXT_CHARS} characters")
+
+        n_slots = len(_FOLDED_PATTERNS)
+        # Absolute offset where each pattern's scan resumes; matches before it
+        # have already been reported
+        resume = [0] * n_slots
+        buffer = ""
+        cased = ""  # buffer before case / punctuation folding, same offsets
+        base = 0    # absolute offset of buffer[0]
+
+        for piece in _then_end(_normalize_stream(chunks)):
+            final = piece is None
+            if not final:
+                buffer += piece[0]
+                cased += piece[1]
+                if len(buffer) <= overlap:
+                    continue
+            # Matches starting before commit_end are complete, context included
+            commit_end = len(buffer) if final else len(buffer) - overlap
+            windows = _digit_windows(buffer)
+
+            for slot in range(n_slots):
+                pattern = _FOLDED_PATTERNS[slot]
+                pos = resume[slot] - base
+                for window_start, window_end in windows:
+                    if window_start >= commit_end:
+                        break
+                    if window_end <= pos:
+                        continue
+                    for m in pattern.finditer(buffer, max(window_start, pos), window_end):
+                        if m.start() >= commit_end:
+                            break
+                        resume[slot] = base + m.end()
+                        start = base + m.start()
+                        if slot <= _BARE:
+                            v = self._cached_to_number(m.group(1))
+                            if v is not None:
+                                context = buffer[max(0, m.start() - _CONTEXT_CHARS):m.end() + _CONTEXT_CHARS]
+                                yield slot, start, v, context.strip()
+                        elif slot < _PHONE:
+                            yield slot, start, m.group(0), normalize_date(m.group(0))
+                        elif slot == _PHONE:
+                            yield slot, start, m.group(0), None
+                        elif slot == _LOAN_0:
+                            if _LOAN_RES[0].fullmatch(cased, m.start(), m.end()):
+                                yield slot, start, cased[m.start():m.end()], None
+                        else:
+                            yield slot, start, m.group(1) if m.lastindex else m.group(0), None
+                resume[slot] = max(resume[slot], base + commit_end)
+
+            if not final:
+                # Keep the uncommitted tail plus enough leading context
+                keep_from = max(0, commit_end - _CONTEXT_CHARS)
+                buffer = buffer[keep_from:]
+                cased = cased[keep_from:]
+                base += keep_from
+
+    def iter_entities(self, chunks, overlap: int = STREAM_OVERLAP):
+        """Extract entities from an iterable of text chunks, yielding as they are found.
+
+        Yields ``(family, value, context)`` with *family* one of "amount",
+        "date", "phone" or "loan_number"; *context* is the amount's snippet,
+        the ISO form (see ``normalize_date``) for a date and None otherwise.
+        Chunks are raw text, normalised here as ``normalize_text`` would
+        normalise the whole (already-normalised chunks pass through
+        unchanged); "LN-" loan numbers are confirmed against the original
+        case, as in ``extract_all_entities``.
+
+        Entities come out in stream order: each time a chunk completes some
+        matches, they are yielded pattern by pattern.  That differs from
+        ``extract_all_entities``, which orders amounts and dates pattern by
+        pattern over the whole text, and a repeated amount keeps the context
+        of its first streamed occurrence here.  Use
+        ``extract_all_entities_streaming`` for exactly that method's output.
+
+        Only the last *overlap* characters of the text seen so far are held
+        back, so memory stays bounded however long the stream runs.  A match
+        must fit within *overlap* minus the 40-character amount context to be
+        found across a chunk boundary.
+        """
+        seen_amounts = set()
+        seen_loans = set()
+        for slot, _, value, context in self._stream_matches(chunks, overlap):
+            if slot <= _BARE:
+                if value not in seen_amounts:
+                    seen_amounts.add(value)
+                    yield "amount", value, context
+            elif slot < _PHONE:
+                yield "date", value, context
+            elif slot == _PHONE:
+                yield "phone", value, None
+            elif value not in seen_loans:
+                seen_loans.add(value)
+                yield "loan_number", value, None
+
+    def extract_all_entities_streaming(self, chunks, overlap: int = STREAM_OVERLAP) -> Entities:
+        """Collect a chunk stream into the Entities ``extract_all_entities`` returns for the whole text.
+
+        Each family is put back into that method's order (pattern by pattern,
+        then by position), and a repeated amount or loan number keeps the
+        occurrence it keeps.  Only the entities are held in memory.
+        """
+        # value -> ((slot, start), value, context) of the occurrence kept
+        amounts = {}
+        loans = {}
+        dates = []
+        phones = []
+        for slot, start, value, context in self._stream_matches(chunks, overlap):
+            if slot <= _BARE:
+                kept = amounts.get(value)
+                if kept is None or (slot, start) < kept[0]:
+                    amounts[value] = ((slot, start), value, context)
+            elif slot < _PHONE:
+                dates.append(((slot, start), value, context))
+            elif slot == _PHONE:
+                phones.append(value)
+            else:
+                kept = loans.get(value)
+                if kept is None or (slot, start) < kept[0]:
+                    loans[value] = ((slot, start), value, None)
+        amounts = sorted(amounts.values(), key=lambda item: item[0])
+        dates.sort(key=lambda item: item[0])
         return Entities(
-            amounts=[v for v, _ in pairs],
-            amount_contexts=[ctx for _, ctx in pairs],
-            dates=self.extract_dates(text),
-            phones=self.extract_phones(text),
-            loan_numbers=self.extract_loan_numbers(text),
+            amounts=[value for _, value, _ in amounts],
+            amount_contexts=[context for _, _, context in amounts],
+            dates=[value for _, value, _ in dates],
+            iso_dates=[iso for _, _, iso in dates],
+            phones=phones,
+            loan_numbers=[value for _, value, _ in sorted(loans.values(), key=lambda item: item[0])],
         )
+
+    def extract_entities_lazy(self, transcript: Transcript) -> "LazyEntities":
+        """Return entities that are only extracted, family by family, when read."""
+        return LazyEntities(transcript, self)
+
+
+class LazyEntities(Entities):
+    """Entities whose families are extracted on first access and then cached.
+
+    Holds the transcript and the extractor that will scan it.  Reading
+    only amounts (as the summary generator does) never runs the date, phone
+    or loan number patterns.  When every family is needed,
+    ``entityExtractor.extract_all_entities`` is faster, as it scans once.
+    """
+
+    def __init__(self, transcript: Transcript, extractor: entityExtractor):
+        # None marks a family that has not been extracted yet
+        self._amounts = None
+        self._amount_contexts = None
+        self._amount_spans = None
+        self._source_text = transcript.get_normalized_text()
+        self._dates = None
+        self._iso_dates = None
+        self._phones = None
+        self._loan_numbers = None
+        self._transcript = transcript
+        self._extractor = extractor
+        self._windows = None
+
+    def _digit_windows(self) -> list:
+        if self._windows is None:
+            self._windows = _digit_windows(self._source_text)
+        return self._windows
+
+    def _load_amounts(self):
+        pairs = self._extractor._amounts_in(self._source_text, self._digit_windows())
+        self._amounts = [v for v, _ in pairs]
+        self._amount_spans = [span for _, span in pairs]
+
+    #Getters
+    def get_amounts(self) -> list:
+        if self._amounts is None:
+            self._load_amounts()
+        return self._amounts
+
+    def get_amount_contexts(self) -> list[str]:
+        if self._amounts is None:
+            self._load_amounts()
+        return super().get_amount_contexts()
+
+    def get_amount_spans(self) -> list[tuple[int, int]]:
+        if self._amounts is None:
+            self._load_amounts()
+        return self._amount_spans
+
+    def get_dates(self) -> list:
+        if self._dates is None:
+            self._dates = self._extractor._dates_in(self._source_text, self._digit_windows())
+        return self._dates
+
+    def get_iso_dates(self) -> list:
+        if self._iso_dates is None:
+            self._iso_dates = [normalize_date(d) for d in self.get_dates()]
+        return self._iso_dates
+
+    def get_phones(self) -> list:
+        if self._phones is None:
+            self._phones = self._extractor._phones_in(self._source_text, self._digit_windows())
+        return self._phones
+
+    def get_loan_numbers(self) -> list:
+        if self._loan_numbers is None:
+            text, windows = self._source_text, self._digit_windows()
+            ln_confirmed = _confirmed_in_raw(_LOAN_RES[0], self._transcript,
+                                             _finditer_windows(_LN_FOLDED_RE, text, windows))
+            self._loan_numbers = self._extractor._transcript_loan_numbers(
+                self._transcript.get_raw_text(), ln_confirmed,
+                (m for pat in _LOAN_RES[1:] for m in _finditer_windows(pat, text, windows)))
+        return self._loan_numbers
+
+    def is_materialized(self) -> bool:
+        return None not in (self._amounts, self._dates, self._iso_dates, self._phones, self._loan_numbers)
+
+    def materialize(self) -> "LazyEntities":
+        """Extract every family not yet read; returns self."""
+        self.get_amounts()
+        self.get_iso_dates()
+        self.get_phones()
+        self.get_loan_numbers()
+        return self
+
+    #Pickling: extract what is still pending, then drop the extractor and transcript
+    def __getstate__(self) -> dict:
+        self.materialize()
+        state = super().__getstate__()
+        state["_transcript"] = None
+        state["_extractor"] = None
+        state["_windows"] = None
+        return state
@@ -0,0 +1,101 @@
+"""
+File Name: loanIndex.py
+Description: Batch-level index from loan number to the transcripts that
+             mention it.  Results are added one at a time as they arrive, and
+             every per-loan count is kept up to date on insert, so repeat
+             callers and escalation history are answered without a pairwise
+             comparison or a join afterwards.
+"""
+
+from Data_Classes.triageResult import triageResult as TriageResult
+
+
+class LoanIndex:
+    """Hash index: loan number -> calls (transcript id, escalate, risk level).
+
+    Usage::
+
+        index = LoanIndex()
+        for transcript_id, result in stream:     # e.g. as a batch completes
+            index.add(transcript_id, result)
+        index.repeat_callers()                   # loans seen in 2+ transcripts
+        index.multi_escalated()                  # loans with 2+ escalated calls
+        index.history("12345678")                # every call about one loan
+    """
+
+    def __init__(self):
+        # loan number -> [(transcript_id, escalate, risk_level), ...] in arrival order
+        self._calls = {}
+        # loan number -> number of escalated calls
+        self._escalations = {}
+        self._n_transcripts = 0
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+
+    def add(self, transcript_id, result: TriageResult) -> "LoanIndex":
+        """Index one result under every loan number it mentions; returns self."""
+        self._n_transcripts += 1
+        escalate = bool(result.get_escalate())
+        call = (transcript_id, escalate, result.get_risk_level())
+        for loan in result.get_entities().get_loan_numbers():
+            calls = self._calls.get(loan)
+            if calls is None:
+                self._calls[loan] = [call]
+                self._escalations[loan] = int(escalate)
+            else:
+                calls.append(call)
+                self._escalations[loan] += escalate
+        return self
+
+    def add_all(self, results: list, transcript_ids: list = None) -> "LoanIndex":
+        """Index *results*; ids default to each result's position in the batch."""
+        if transcript_ids is None:
+            transcript_ids = range(self._n_transcripts, self._n_transcripts + len(results))
+        for transcript_id, result in zip(transcript_ids, results):
+            self.add(transcript_id, result)
+        return self
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    def __contains__(self, loan: str) -> bool:
+        return loan in self._calls
+
+    def get_transcripts(self, loan: str) -> list:
+        """Ids of the transcripts mentioning *loan*, in arrival order."""
+        return [transcript_id for transcript_id, _, _ in self._calls.get(loan, ())]
+
+    def history(self, loan: str) -> list[dict]:
+        """Every call about *loan*: transcript id, escalation flag and risk level."""
+        return [{"transcript": transcript_id, "escalate": escalate, "risk_level": risk_level}
+                for transcript_id, escalate, risk_level in self._calls.get(loan, ())]
+
+    def repeat_callers(self, min_calls: int = 2) -> dict:
+        """{loan: [transcript ids]} for loans mentioned in at least *min_calls* transcripts."""
+        return {loan: [call[0] for call in calls]
+                for loan, calls in self._calls.items() if len(calls) >= min_calls}
+
+    def multi_escalated(self, min_escalations: int = 2) -> dict:
+        """{loan: [escalated transcript ids]} for loans with at least *min_escalations* escalated calls."""
+        return {loan: [call[0] for call in self._calls[loan] if call[1]]
+                for loan, count in self._escalations.items() if count >= min_escalations}
+
+    def to_json(self) -> dict:
+        return {
+            "transcripts": self._n_transcripts,
+            "loans": len(self._calls),
+            "history": {loan: self.history(loan) for loan in self._calls},
+        }
+
+    #Defining __str__ method
+    def __str__(self) -> str:
+        return f"LoanIndex(loans={len(self._calls)}, transcripts={self._n_transcripts})"
+    #Defining __repr__ method
+    def __repr__(self) -> str:
+        return self.__str__()
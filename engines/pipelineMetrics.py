@@ -0,0 +1,139 @@
+"""
+File Name: pipelineMetrics.py
+Description: Per-stage timing and per-rule hit counters for the triage pipeline.
+             Stage times go into fixed-bucket histograms so the counters stay a
+             constant size however many transcripts are processed, and worker
+             copies can be merged into the parent by adding counts.
+"""
+
+from bisect import bisect_left
+from time import perf_counter
+
+# Pipeline stages, in the order _process_file runs them
+STAGES = (
+    "parse_transcript",
+    "apply_rules",
+    "extract_all_entities",
+    "classify",
+    "evaluate_escalation",
+    "generate_bullets",
+)
+
+# Histogram bucket upper bounds in milliseconds; one extra overflow bucket
+BUCKET_BOUNDS_MS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100)
+
+
+def untimed(stage: str, fn, *args):
+    """Stand-in for ``PipelineMetrics.timed`` when metrics are switched off."""
+    return fn(*args)
+
+
+class PipelineMetrics:
+    """Stage timing histograms and rule hit counts.
+
+    Usage::
+
+        metrics = PipelineMetrics()
+        transcript = metrics.timed("parse_transcript", parser.parse_transcript, raw_text)
+        metrics.count_rules(reason_codes)
+
+        parent.merge(worker_metrics)
+        parent.to_json()
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self._transcripts = 0
+        self._stage_ms = dict.fromkeys(STAGES, 0.0)
+        self._stage_counts = dict.fromkeys(STAGES, 0)
+        self._histograms = {stage: [0] * (len(BUCKET_BOUNDS_MS) + 1) for stage in STAGES}
+        self._rule_hits = {}
+        # Free-form event counters, e.g. worker cache hits and misses
+        self._counters = {}
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+
+    def timed(self, stage: str, fn, *args):
+        """Call ``fn(*args)`` and record its wall time under *stage*."""
+        start = perf_counter()
+        result = fn(*args)
+        self.record(stage, (perf_counter() - start) * 1000)
+        return result
+
+    def record(self, stage: str, elapsed_ms: float):
+        self._stage_ms[stage] += elapsed_ms
+        self._stage_counts[stage] += 1
+        self._histograms[stage][bisect_left(BUCKET_BOUNDS_MS, elapsed_ms)] += 1
+
+    def count_rules(self, reason_codes: list):
+        """Count one transcript and one hit for every reason code it fired."""
+        self._transcripts += 1
+        hits = self._rule_hits
+        for rc in reason_codes:
+            code = rc.get_code()
+            hits[code] = hits.get(code, 0) + 1
+
+    def count(self, name: str, n: int = 1):
+        self._counters[name] = self._counters.get(name, 0) + n
+
+    def merge(self, other: "PipelineMetrics"):
+        """Add the counts of *other* (e.g. a worker's) into this object."""
+        self._transcripts += other._transcripts
+        for stage in STAGES:
+            self._stage_ms[stage] += other._stage_ms[stage]
+            self._stage_counts[stage] += other._stage_counts[stage]
+            self._histograms[stage] = [a + b for a, b in zip(self._histograms[stage], other._histograms[stage])]
+        for code, count in other._rule_hits.items():
+            self._rule_hits[code] = self._rule_hits.get(code, 0) + count
+        for name, count in other._counters.items():
+            self._counters[name] = self._counters.get(name, 0) + count
+
+    # ------------------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------------------
+
+    def get_transcripts(self) -> int:
+        return self._transcripts
+
+    def get_rule_hits(self) -> dict:
+        return dict(self._rule_hits)
+
+    def get_counters(self) -> dict:
+        return dict(self._counters)
+
+    def get_histogram(self, stage: str) -> list[int]:
+        """Bucket counts for *stage*; bucket i holds times <= BUCKET_BOUNDS_MS[i]."""
+        return list(self._histograms[stage])
+
+    def get_mean_ms(self, stage: str) -> float:
+        count = self._stage_counts[stage]
+        return self._stage_ms[stage] / count if count else 0.0
+
+    def to_json(self) -> dict:
+        return {
+            "transcripts": self._transcripts,
+            "bucket_bounds_ms": list(BUCKET_BOUNDS_MS),
+            "stages": {
+                stage: {
+                    "count": self._stage_counts[stage],
+                    "total_ms": self._stage_ms[stage],
+                    "mean_ms": self.get_mean_ms(stage),
+                    "histogram": self.get_histogram(stage),
+                }
+                for stage in STAGES
+            },
+            "rule_hits": self.get_rule_hits(),
+            "counters": self.get_counters(),
+        }
+
+    #Defining __str__ method
+    def __str__(self) -> str:
+        means = ", ".join(f"{stage}={self.get_mean_ms(stage):.3f}ms" for stage in STAGES)
+        return f"PipelineMetrics(transcripts={self._transcripts}, {means})"
+    #Defining __repr__ method
+    def __repr__(self) -> str:
+        return self.__str__()
@@ -5,10 +5,16 @@ Description: Persistent warm worker pool for the Transcript Triage Linter pipeli
              the ~80ms startup cost is paid once at pool creation, not per batch.
 """
 
+import math
 import os
 from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 
 from Data_Classes.triageResult import triageResult as TriageResult
+from engines.loanIndex import LoanIndex
+from engines.pipelineMetrics import PipelineMetrics, untimed
+from engines.transcriptPack import TranscriptPack
+from engines.transcriptReader import read_transcript
 
 # ---------------------------------------------------------------------------
 # Per-process module-level state — populated once by _init_worker()
@@ -18,41 +24,71 @@ _extractor = None
 _intent_clf = None
 _escalate = None
 _summary = None
+_rules = None
+_customer_only = True
+# Pack path -> this worker's open TranscriptPack
+_packs = {}
 
 
-def _init_worker():
+def _init_worker(rule_pack: str = None, amount_cache_size: int = None, customer_only: bool = True):
     """Initializer run once in each worker process at pool startup."""
-    global _parser, _extractor, _intent_clf, _escalate, _summary
+    global _parser, _extractor, _intent_clf, _escalate, _summary, _rules, _customer_only
     import sys
     sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
     from engines.transcriptParser import transcriptParser
-    from engines.entityExtractor import entityExtractor
+    from engines.entityExtractor import entityExtractor, AMOUNT_CACHE_SIZE
     from engines.intentClassifier import intentClassifier
     from engines.escalationEngine import escalationEngine
     from engines.summaryGenerator import summaryGenerator
+    from engines.ruleEngine import load_rule_pack
     _parser = transcriptParser()
-    _extractor = entityExtractor()
+    # Each worker owns its extractor, and with it its own amount cache
+    _extractor = entityExtractor(AMOUNT_CACHE_SIZE if amount_cache_size is None else amount_cache_size)
     _intent_clf = intentClassifier()
     _escalate = escalationEngine()
     _summary = summaryGenerator()
+    _rules = load_rule_pack(rule_pack)
+    _customer_only = customer_only
 
 
-def _process_file_warm(file_path: str) -> TriageResult:
-    """Process a single transcript file using pre-warmed module-level engines."""
-    from engines.ruleEngine import ruleEngine as RuleEngine
+def _ensure_rules(rule_pack: str, digest: str):
+    """Hot-swap this worker's rules when the parent has moved to a new pack.
 
-    try:
-        with open(file_path, 'r') as f:
-            raw_text = f.read()
-    except FileNotFoundError:
-        raise FileNotFoundError(f"Transcript file not found: {file_path}")
+    The parent compiles (and disk-caches) a pack before announcing its digest,
+    so the swap is a cache load, not a recompile.
+    """
+    global _rules
+    if digest is not None and _rules.get_digest() != digest:
+        from engines.ruleEngine import load_rule_pack
+        _rules = load_rule_pack(rule_pack)
+
+
+def _open_pack(pack_path: str, stamp: tuple) -> TranscriptPack:
+    """This worker's mapping of *pack_path*, reopened if the pack was rebuilt.
 
-    transcript   = _parser.parse_transcript(raw_text)
-    reason_codes = RuleEngine(transcript).apply_rules()
-    entity       = _extractor.extract_all_entities(transcript)
-    intents      = _intent_clf.classify(reason_codes)
-    esc_result   = _escalate.evaluate_escalation(reason_codes)
-    summary      = _summary.generate_bullets(intents, entity, reason_codes)
+    The mapping stays open between batches, so after the first chunk a
+    worker reads its transcripts without any file system calls.
+    """
+    pack = _packs.get(pack_path)
+    if pack is None or pack.get_stamp() != stamp:
+        if pack is not None:
+            pack.close()
+        pack = _packs[pack_path] = TranscriptPack(pack_path)
+    return pack
+
+
+def _process_text_warm(raw_text: str, metrics: PipelineMetrics = None) -> TriageResult:
+    """Run the pre-warmed engines over one transcript's raw text."""
+    timed = metrics.timed if metrics is not None else untimed
+
+    transcript   = timed("parse_transcript", _parser.parse_transcript, raw_text)
+    reason_codes = timed("apply_rules", _rules.apply_transcript, transcript, _customer_only)
+    entity       = timed("extract_all_entities", _extractor.extract_all_entities, transcript)
+    intents      = timed("classify", _intent_clf.classify, reason_codes)
+    esc_result   = timed("evaluate_escalation", _escalate.evaluate_escalation, reason_codes)
+    summary      = timed("generate_bullets", _summary.generate_bullets, intents, entity, reason_codes)
+    if metrics is not None:
+        metrics.count_rules(reason_codes)
 
     return TriageResult(
         intents,
@@ -64,6 +100,54 @@ def _process_file_warm(file_path: str) -> TriageResult:
     )
 
 
+def _process_file_warm(file_path: str, rule_pack: str = None, rules_digest: str = None,
+                       metrics: PipelineMetrics = None) -> TriageResult:
+    """Process a single transcript file using pre-warmed module-level engines."""
+    _ensure_rules(rule_pack, rules_digest)
+
+    try:
+        raw_text = read_transcript(file_path)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Transcript file not found: {file_path}")
+
+    return _process_text_warm(raw_text, metrics)
+
+
+def _count_amount_cache(metrics: PipelineMetrics, cache_before: dict):
+    cache_after = _extractor.amount_cache_info()
+    metrics.count("amount_cache_hits", cache_after["hits"] - cache_before["hits"])
+    metrics.count("amount_cache_misses", cache_after["misses"] - cache_before["misses"])
+
+
+def _process_chunk_warm(file_paths: list, rule_pack: str = None,
+                        rules_digest: str = None) -> tuple[list[TriageResult], PipelineMetrics]:
+    """Process a chunk of files, aggregating their metrics locally in the worker.
+
+    Only one metrics object per chunk crosses back to the parent.
+    """
+    metrics = PipelineMetrics()
+    cache_before = _extractor.amount_cache_info()
+    results = [_process_file_warm(p, rule_pack, rules_digest, metrics) for p in file_paths]
+    _count_amount_cache(metrics, cache_before)
+    return results, metrics
+
+
+def _process_pack_chunk_warm(bounds: tuple, pack_path: str, pack_stamp: tuple, rule_pack: str = None,
+                             rules_digest: str = None) -> tuple[list[TriageResult], PipelineMetrics]:
+    """Process transcripts ``bounds[0]`` .. ``bounds[1] - 1`` of a pack.
+
+    Only the pack path and the index range cross to the worker; the text is
+    sliced out of the worker's own mapping of the pack.
+    """
+    _ensure_rules(rule_pack, rules_digest)
+    pack = _open_pack(pack_path, pack_stamp)
+    metrics = PipelineMetrics()
+    cache_before = _extractor.amount_cache_info()
+    results = [_process_text_warm(pack.text(i), metrics) for i in range(*bounds)]
+    _count_amount_cache(metrics, cache_before)
+    return results, metrics
+
+
 class PipelinePool:
     """Persistent warm worker pool for transcript triage processing.
 
@@ -71,6 +155,7 @@ class PipelinePool:
 
         with PipelinePool(workers=4) as pool:
             results = pool.process_batch(file_paths)
+            results = pool.process_batch(TranscriptPack("corpus.pack"))
 
     Or manage lifecycle manually::
 
@@ -79,24 +164,80 @@ class PipelinePool:
         pool.shutdown()
     """
 
-    def __init__(self, workers: int = None):
+    # Chunks per worker per batch: enough to balance uneven transcript
+    # lengths, few enough that per-chunk metrics merging stays negligible
+    _CHUNKS_PER_WORKER = 4
+
+    def __init__(self, workers: int = None, rule_pack: str = None, metrics: PipelineMetrics = None,
+                 amount_cache_size: int = None, customer_only: bool = True):
+        from engines.ruleEngine import load_rule_pack
         self.workers = workers or os.cpu_count() or 4
+        # Worker metrics are merged into this object at the end of each batch
+        self.metrics = metrics if metrics is not None else PipelineMetrics()
+        # Compile (and disk-cache) the pack here so workers start from the cache
+        self._rule_pack = rule_pack
+        self._rules_digest = load_rule_pack(rule_pack).get_digest()
         self._executor = ProcessPoolExecutor(
             max_workers=self.workers,
             initializer=_init_worker,
+            initargs=(rule_pack, amount_cache_size, customer_only),
         )
 
     # ------------------------------------------------------------------
     # Public API
     # ------------------------------------------------------------------
 
-    def process_batch(self, file_paths: list) -> list[TriageResult]:
-        """Process a list of transcript file paths and return TriageResult objects.
+    def process_batch(self, file_paths, loan_index: LoanIndex = None) -> list[TriageResult]:
+        """Process a list of transcript file paths, or a TranscriptPack, and return TriageResult objects.
 
-        Results are returned in the same order as *file_paths*.
+        Results are returned in the same order as *file_paths* (or the pack).
+        If *loan_index* is given, each result is added to it (keyed by its
+        path, or its name within the pack) as its chunk comes back, rather
+        than after the whole batch.
+        """
+        n = len(file_paths)
+        size = max(1, math.ceil(n / (self.workers * self._CHUNKS_PER_WORKER)))
+        # executor.map preserves order and yields each chunk as soon as it
+        # and the chunks before it are done
+        if isinstance(file_paths, TranscriptPack):
+            # Chunks are index ranges; each worker maps the pack itself
+            chunks = [(i, min(i + size, n)) for i in range(0, n, size)]
+            outputs = self._executor.map(
+                _process_pack_chunk_warm, chunks,
+                repeat(file_paths.get_path()), repeat(file_paths.get_stamp()),
+                repeat(self._rule_pack), repeat(self._rules_digest),
+            )
+            chunk_ids = (file_paths.names(start, stop) for start, stop in chunks)
+        else:
+            chunks = [file_paths[i:i + size] for i in range(0, n, size)]
+            outputs = self._executor.map(
+                _process_chunk_warm, chunks,
+                repeat(self._rule_pack), repeat(self._rules_digest),
+            )
+            chunk_ids = iter(chunks)
+        results = []
+        for ids, (chunk_results, chunk_metrics) in zip(chunk_ids, outputs):
+            results.extend(chunk_results)
+            self.metrics.merge(chunk_metrics)
+            if loan_index is not None:
+                loan_index.add_all(chunk_results, ids)
+        return results
+
+    def reset_metrics(self):
+        """Clear the stage timings and rule hit counters."""
+        self.metrics.reset()
+
+    def reload_rules(self, rule_pack: str = None) -> str:
+        """Switch the live workers to *rule_pack* (or re-read the current one).
+
+        No restart needed: each worker compares the digest sent with its next
+        task and swaps its RuleSet in place.  Returns the new pack digest.
         """
-        # executor.map preserves order
-        return list(self._executor.map(_process_file_warm, file_paths))
+        from engines.ruleEngine import load_rule_pack
+        if rule_pack is not None:
+            self._rule_pack = rule_pack
+        self._rules_digest = load_rule_pack(self._rule_pack).get_digest()
+        return self._rules_digest
 
     def shutdown(self, wait: bool = True):
         """Shut down the underlying ProcessPoolExecutor."""
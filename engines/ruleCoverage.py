@@ -0,0 +1,237 @@
+"""
+File Name: ruleCoverage.py
+Description: Corpus-wide rule coverage analysis.  A corpus is scanned once
+             into an inverted index (phrase -> ids of the transcripts it
+             occurs in); per-phrase hit counts, dead phrases, redundant
+             phrases and per-rule precision against labelled escalations are
+             then answered from the posting lists without re-running the
+             pipeline.
+"""
+
+import argparse
+import glob
+import json
+import os
+from array import array
+from itertools import repeat
+
+from engines.ruleEngine import RuleSet, DEFAULT_RULESET, load_rule_pack
+from engines.transcriptParser import transcriptParser
+from engines.transcriptReader import read_transcript
+
+
+class RuleCoverage:
+    """Inverted phrase index over a corpus, built from a RuleSet's phrase tables.
+
+    Usage::
+
+        coverage = RuleCoverage()
+        coverage.index_files(paths)             # one scan per transcript
+        coverage.dead_phrases()                 # phrases that never fire
+        coverage.redundant_phrases()            # phrases always shadowed in their rule
+        coverage.rule_precision(labels)         # labels: one bool per transcript
+    """
+
+    def __init__(self, rules: RuleSet = None):
+        self.rules = rules if rules is not None else DEFAULT_RULESET
+        self.features = self.rules.features()
+        # feature id -> ascending transcript ids (appended in corpus order)
+        self._postings = [array("l") for _ in self.features]
+        self._n_docs = 0
+
+    # ------------------------------------------------------------------
+    # Indexing
+    # ------------------------------------------------------------------
+
+    def index(self, texts, token_indexes=None, spans=None) -> "RuleCoverage":
+        """Add normalised *texts* to the index; returns self.
+
+        *token_indexes* optionally supplies each text's parser token index,
+        and *spans* each text's scanned regions (None for the whole text).
+        """
+        feature_hits = self.rules.feature_hits
+        postings = self._postings
+        if token_indexes is None:
+            token_indexes = repeat(None)
+        if spans is None:
+            spans = repeat(None)
+        for text, tokens, text_spans in zip(texts, token_indexes, spans):
+            doc = self._n_docs
+            for fid in feature_hits(text, tokens, text_spans):
+                postings[fid].append(doc)
+            self._n_docs += 1
+        return self
+
+    def index_files(self, file_paths: list, customer_only: bool = True) -> "RuleCoverage":
+        """Read, parse and index transcript files, scanning the same turns as the pipeline; returns self."""
+        parser = transcriptParser()
+        for path in file_paths:
+            transcript = parser.parse_transcript(read_transcript(path))
+            spans = transcript.get_customer_spans() if customer_only else None
+            tokens = transcript.get_token_index() if spans is None else transcript.get_customer_token_index()
+            self.index([transcript.get_normalized_text()], [tokens], [spans])
+        return self
+
+    @property
+    def n_docs(self) -> int:
+        return self._n_docs
+
+    # ------------------------------------------------------------------
+    # Phrase coverage
+    # ------------------------------------------------------------------
+
+    def phrase_hits(self) -> list[tuple[str, str, int]]:
+        """Return (kind, phrase, n_transcripts) for every phrase, in feature order."""
+        return [(kind, phrase, len(docs))
+                for (kind, phrase, _), docs in zip(self.features, self._postings)]
+
+    def dead_phrases(self) -> list[tuple[str, str]]:
+        """Return (kind, phrase) for every phrase that matched no transcript."""
+        return [(kind, phrase)
+                for (kind, phrase, _), docs in zip(self.features, self._postings) if not docs]
+
+    def redundant_phrases(self) -> list[tuple[str, str, str, str]]:
+        """Return (rule, kind, phrase, covered_by) for phrases a rule can drop.
+
+        A phrase is redundant in a rule when another phrase of the same rule
+        (*covered_by*, as ``kind:phrase``) matches every transcript it matches
+        and carries at least its weight, and removing it does not stop the
+        rule reaching its threshold on any transcript.  Of two phrases with
+        identical postings and weights only the later one is reported.
+        Phrases are checked in order with the earlier reported ones already
+        removed, so dropping every reported phrase keeps both the transcripts
+        each rule matches and the transcripts it fires on.  Dead phrases are
+        reported by ``dead_phrases`` instead.
+        """
+        rule_points = {}
+        for fid, (_, _, rule_hits) in enumerate(self.features):
+            for name, pts in rule_hits:
+                points = rule_points.setdefault(name, {})
+                points[fid] = points.get(fid, 0) + pts
+
+        # Forward index, so a phrase is only compared with the phrases that
+        # share its first transcript rather than with its whole rule
+        doc_fids = [set() for _ in range(self._n_docs)]
+        for fid, docs in enumerate(self._postings):
+            for doc in docs:
+                doc_fids[doc].add(fid)
+
+        doc_sets = [frozenset(docs) for docs in self._postings]
+        thresholds = self.rules.get_thresholds()
+        # Scores with the phrases reported so far taken out
+        scores = self.rule_scores()
+        redundant = []
+        for name, points in rule_points.items():
+            threshold = thresholds[name]
+            for fid in sorted(points):
+                docs = self._postings[fid]
+                if not docs:
+                    continue
+                pts = points[fid]
+                # Weights are never negative, so dropping a phrase can only
+                # turn a firing rule off, never on
+                if any(threshold <= scores[doc][name] < threshold + pts for doc in docs):
+                    continue
+                for other in sorted(doc_fids[docs[0]] & points.keys()):
+                    if other == fid or points[other] < pts or not doc_sets[fid] <= doc_sets[other]:
+                        continue
+                    if doc_sets[fid] == doc_sets[other] and points[other] == pts and other > fid:
+                        continue
+                    for doc in docs:
+                        scores[doc][name] -= pts
+                    kind, phrase, _ = self.features[fid]
+                    other_kind, other_phrase, _ = self.features[other]
+                    redundant.append((name, kind, phrase, f"{other_kind}:{other_phrase}"))
+                    break
+        return redundant
+
+    # ------------------------------------------------------------------
+    # Rule decisions
+    # ------------------------------------------------------------------
+
+    def rule_scores(self) -> list[dict]:
+        """Return {rule_name: score} per transcript, rebuilt from the posting lists."""
+        names = self.rules.get_escalation_names() + self.rules.get_normal_names()
+        scores = [dict.fromkeys(names, 0) for _ in range(self._n_docs)]
+        for (_, _, rule_hits), docs in zip(self.features, self._postings):
+            for doc in docs:
+                doc_scores = scores[doc]
+                for name, pts in rule_hits:
+                    doc_scores[name] += pts
+        return scores
+
+    def fired(self) -> list[set]:
+        """Return the set of rules reaching their threshold, per transcript."""
+        thresholds = self.rules.get_thresholds()
+        return [{name for name, score in doc_scores.items() if score >= thresholds[name]}
+                for doc_scores in self.rule_scores()]
+
+    def rule_precision(self, labels: list) -> dict:
+        """Score each escalation rule against per-transcript escalation labels.
+
+        *labels* holds one bool per indexed transcript (True = should escalate).
+        Returns {rule_name: {"fired", "true_positives", "precision"}};
+        precision is None for a rule that never fired.
+        """
+        if len(labels) != self._n_docs:
+            raise ValueError(f"Expected {self._n_docs} labels, got {len(labels)}")
+        report = {}
+        fired = self.fired()
+        for name in self.rules.get_escalation_names():
+            hits = [bool(labels[doc]) for doc, rules in enumerate(fired) if name in rules]
+            true_positives = sum(hits)
+            report[name] = {
+                "fired": len(hits),
+                "true_positives": true_positives,
+                "precision": true_positives / len(hits) if hits else None,
+            }
+        return report
+
+    def report(self, labels: list = None) -> dict:
+        """Return every coverage answer as one JSON-serialisable dict."""
+        report = {
+            "transcripts": self._n_docs,
+            "phrases": len(self.features),
+            "phrase_hits": [
+                {"kind": kind, "phrase": phrase, "transcripts": n}
+                for kind, phrase, n in self.phrase_hits()
+            ],
+            "dead_phrases": [f"{kind}:{phrase}" for kind, phrase in self.dead_phrases()],
+            "redundant_phrases": [
+                {"rule": rule, "phrase": f"{kind}:{phrase}", "covered_by": covered_by}
+                for rule, kind, phrase, covered_by in self.redundant_phrases()
+            ],
+        }
+        if labels is not None:
+            report["rule_precision"] = self.rule_precision(labels)
+        return report
+
+
+def _load_labels(path: str, file_paths: list) -> list:
+    """Read escalation labels from an expected_results.json-style file."""
+    with open(path) as f:
+        labelled = {item["filename"]: item["escalate"] for item in json.load(f)["transcripts"]}
+    missing = [p for p in file_paths if os.path.basename(p) not in labelled]
+    if missing:
+        raise ValueError(f"No escalation label for {os.path.basename(missing[0])} in {path}")
+    return [labelled[os.path.basename(p)] for p in file_paths]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rule coverage and dead-rule analysis")
+    parser.add_argument('paths', nargs='*', default=['transcripts/*.txt'],
+                        help='Transcript files or glob patterns (default: transcripts/*.txt)')
+    parser.add_argument('--rule-pack', type=str, help='Rule pack to analyse (default pack if omitted)')
+    parser.add_argument('--labels', type=str,
+                        help='expected_results.json-style file with an "escalate" label per filename')
+    args = parser.parse_args()
+
+    file_paths = sorted({p for pattern in args.paths for p in glob.glob(pattern)})
+    rules = load_rule_pack(args.rule_pack) if args.rule_pack else DEFAULT_RULESET
+    coverage = RuleCoverage(rules).index_files(file_paths)
+    labels = _load_labels(args.labels, file_paths) if args.labels else None
+    print(json.dumps(coverage.report(labels), indent=2))
+
+
+if __name__ == "__main__":
+    main()
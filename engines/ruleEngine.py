@@ -3,157 +3,567 @@ File Name: ruleEngine.py
 Description: Rule Engine for processing transcripts
 '''
 
+import hashlib
+import json
+import os
+import pickle
 import re
+import tempfile
+from array import array
 from Data_Classes.transcript import transcript as Transcript
 from Data_Classes.reasonCode import reasonCode
+from engines.transcriptParser import build_token_index, build_span_token_index
 
 
-_THRESHOLD = 2
-
 # ---------------------------------------------------------------------------
-# Rule definitions — stored as tuples of (keywords, single_words) for fast
-# string `in` checks (Python's built-in string search is faster than regex
-# for short literal phrases against long text).
+# Rule packs — rule definitions, the threshold and the escalation / normal
+# split live in a versioned JSON pack outside the code.  The compiled matcher
+# for a pack is cached on disk keyed by the pack's content hash and a hash of
+# this module, so new worker processes load it instead of recompiling.
 # ---------------------------------------------------------------------------
-_ESCALATION_RULES = {
-    "HARDSHIP_LANGUAGE": (
-        ["lost my job", "unemployed", "can't afford", "can't pay", "financial hardship",
-         "struggling", "behind on payments", "medical bills", "reduced income", "laid off"],
-        ["unemployed", "struggling", "hardship"],
-    ),
-    "LOAN_MOD_REQUEST": (
-        ["loan modification", "modify my loan", "modify the loan", "payment plan",
-         "forbearance", "restructure", "lower my payment", "reduce my payment"],
-        ["forbearance"],
-    ),
-    "BANKRUPTCY_OR_LAWYER": (
-        ["filed bankruptcy", "filing bankruptcy", "chapter 7", "chapter 13",
-         "my lawyer", "my attorney", "retained counsel", "legal counsel"],
-        ["bankruptcy", "lawyer", "attorney"],
-    ),
-    "LEGAL_THREAT": (
-        ["sue you", "legal action", "attorney general", "consumer protection",
-         "better business bureau", "lawsuit", "take legal action", "report you"],
-        [],
-    ),
-    "DISPUTE_FEE_OR_CHARGE": (
-        ["dispute this charge", "don't owe this", "unauthorized charge", "never agreed",
-         "incorrect fee", "wrong fee", "late fee is wrong"],
-        ["dispute"],
-    ),
-    "SUPERVISOR_REQUEST": (
-        ["speak to supervisor", "talk to manager", "your supervisor", "escalate this",
-         "someone above you", "your boss", "speak to someone else"],
-        ["supervisor", "manager"],
-    ),
-    "ABUSIVE_LANGUAGE": (
-        ["you're an idiot", "you're stupid", "this is ridiculous"],
-        ["idiot", "stupid", "ridiculous", "useless"],
-    ),
-    "THIRD_PARTY_CALLER": (
-        ["calling for my husband", "calling for my wife", "my mom's account",
-         "my son's loan", "power of attorney", "calling on behalf"],
-        [],
-    ),
-}
-
-_NORMAL_RULES = {
-    "PAYMENT_INTENT": (
-        ["make a payment", "pay my mortgage", "send a payment", "payment amount",
-         "pay online", "what's my balance"],
-        ["payment", "balance"],
-    ),
-    "ESCROW_QUESTION": (
-        ["escrow account", "property taxes", "insurance", "escrow analysis",
-         "escrow shortage", "impound account", "tax escrow"],
-        ["escrow"],
-    ),
-    "NEW_LOAN_INQUIRY": (
-        ["refinance", "new loan", "apply for mortgage", "current rates",
-         "pre-approval", "home equity loan", "rate quote"],
-        ["refinance", "refinancing"],
-    ),
-}
-
-
-def _score(keywords: list, single_words: list, text: str) -> int:
-    """Score a rule against normalised text using fast string containment checks."""
-    pts = sum(2 for kw in keywords if kw in text)
-    pts += sum(1 for w in single_words if w in text)
-    return pts
+_ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+DEFAULT_RULE_PACK = os.path.join(_ROOT_DIR, "rule_packs", "default.json")
+# Overrides the per-user cache directory for compiled packs
+RULE_CACHE_ENV = "TRIAGE_RULE_CACHE_DIR"
 
+_PACK_FORMAT_VERSION = 1
 
-class ruleEngine:
-    # Keep originals accessible for any code that inspects them
-    ESCALATION_RULES = {
-        "HARDSHIP_LANGUAGE": {
-            "keywords": ["lost my job", "unemployed", "can't afford", "can't pay", "financial hardship", "struggling", "behind on payments", "medical bills", "reduced income", "laid off"],
-            "single_words": ["unemployed", "struggling", "hardship"]
-        },
-        "LOAN_MOD_REQUEST": {
-            "keywords": ["loan modification", "modify my loan", "modify the loan", "payment plan", "forbearance", "restructure", "lower my payment", "reduce my payment"],
-            "single_words": ["forbearance"]
-        },
-        "BANKRUPTCY_OR_LAWYER": {
-            "keywords": ["filed bankruptcy", "filing bankruptcy", "chapter 7", "chapter 13", "my lawyer", "my attorney", "retained counsel", "legal counsel"],
-            "single_words": ["bankruptcy", "lawyer", "attorney"]
-        },
-        "LEGAL_THREAT": {
-            "keywords": ["sue you", "legal action", "attorney general", "consumer protection", "better business bureau", "lawsuit", "take legal action", "report you"],
-            "single_words": []
-        },
-        "DISPUTE_FEE_OR_CHARGE": {
-            "keywords": ["dispute this charge", "don't owe this", "unauthorized charge", "never agreed", "incorrect fee", "wrong fee", "late fee is wrong"],
-            "single_words": ["dispute"]
-        },
-        "SUPERVISOR_REQUEST": {
-            "keywords": ["speak to supervisor", "talk to manager", "your supervisor", "escalate this", "someone above you", "your boss", "speak to someone else"],
-            "single_words": ["supervisor", "manager"]
-        },
-        "ABUSIVE_LANGUAGE": {
-            "keywords": ["you're an idiot", "you're stupid", "this is ridiculous"],
-            "single_words": ["idiot", "stupid", "ridiculous", "useless"]
-        },
-        "THIRD_PARTY_CALLER": {
-            "keywords": ["calling for my husband", "calling for my wife", "my mom's account", "my son's loan", "power of attorney", "calling on behalf"],
-            "single_words": []
-        }
+
+def _code_digest() -> str | None:
+    """Hash of this module's source, or None when it cannot be read.
+
+    The compiler and the pickled RuleSet / _PhraseMatcher layout both live
+    here, so any edit to this file invalidates every cached pack.
+    """
+    try:
+        with open(__file__, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()[:16]
+    except OSError:
+        return None
+
+
+_CODE_DIGEST = _code_digest()
+
+
+def default_cache_dir() -> str:
+    """``$TRIAGE_RULE_CACHE_DIR``, else ``transcript-triage/rules`` under the user cache directory."""
+    configured = os.environ.get(RULE_CACHE_ENV)
+    if configured:
+        return configured
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "transcript-triage", "rules")
+
+
+def _read_pack(path: str) -> tuple[dict, str]:
+    """Read and validate a rule pack, returning (pack, sha256 hex digest)."""
+    with open(path, "rb") as f:
+        data = f.read()
+    digest = hashlib.sha256(data).hexdigest()
+    try:
+        pack = json.loads(data)
+    except ValueError as e:
+        raise ValueError(f"Rule pack is not valid JSON: {path}: {e}")
+    if pack.get("format_version") != _PACK_FORMAT_VERSION:
+        raise ValueError(f"Unsupported rule pack format_version in {path}: {pack.get('format_version')!r}")
+    for section in ("escalation_rules", "normal_rules"):
+        if not isinstance(pack.get(section), dict):
+            raise ValueError(f"Rule pack {path} is missing the '{section}' section")
+    return pack, digest
+
+
+# Points a phrase contributes when the pack gives it no explicit weight
+_KEYWORD_WEIGHT = 2
+_SINGLE_WORD_WEIGHT = 1
+
+
+def _phrase_entry(entry, where: str):
+    """Return a pack phrase entry as-is, or ``(phrase, weight)`` for the object form."""
+    if isinstance(entry, str):
+        return entry
+    # Weights are non-negative so a rule's score only grows during a scan,
+    # which is what lets the escalation-only mode stop early
+    if isinstance(entry, dict) and isinstance(entry.get("phrase"), str) \
+            and isinstance(entry.get("weight"), int) and entry["weight"] >= 0:
+        return (entry["phrase"], entry["weight"])
+    raise ValueError(f"Invalid phrase entry in {where}: {entry!r}")
+
+
+def _rule_groups(section: dict) -> dict:
+    """Convert a pack section into {name: (keywords, single_words)} tuples.
+
+    Phrases are plain strings (default weight) or ``(phrase, weight)`` pairs.
+    """
+    return {
+        name: (
+            [_phrase_entry(e, f"{name}.keywords") for e in rule.get("keywords", [])],
+            [_phrase_entry(e, f"{name}.single_words") for e in rule.get("single_words", [])],
+        )
+        for name, rule in section.items()
     }
 
-    NORMAL_RULES = {
-        "PAYMENT_INTENT": {
-            "keywords": ["make a payment", "pay my mortgage", "send a payment", "payment amount", "pay online", "what's my balance"],
-            "single_words": ["payment", "balance"]
-        },
-        "ESCROW_QUESTION": {
-            "keywords": ["escrow account", "property taxes", "insurance", "escrow analysis", "escrow shortage", "impound account", "tax escrow"],
-            "single_words": ["escrow"]
-        },
-        "NEW_LOAN_INQUIRY": {
-            "keywords": ["refinance", "new loan", "apply for mortgage", "current rates", "pre-approval", "home equity loan", "rate quote"],
-            "single_words": ["refinance", "refinancing"]
+
+def _rule_thresholds(*sections: dict) -> dict:
+    """Collect the per-rule threshold overrides from pack sections."""
+    thresholds = {}
+    for section in sections:
+        for name, rule in section.items():
+            if "threshold" in rule:
+                if not isinstance(rule["threshold"], int):
+                    raise ValueError(f"Invalid threshold for rule {name}: {rule['threshold']!r}")
+                thresholds[name] = rule["threshold"]
+    return thresholds
+
+
+def _weighted(entries, default: int):
+    """Yield (phrase, weight) for rule entries given as strings or pairs."""
+    for entry in entries:
+        if isinstance(entry, str):
+            yield entry, default
+        else:
+            yield entry
+
+
+_DEFAULT_PACK, _ = _read_pack(DEFAULT_RULE_PACK)
+
+_THRESHOLD = _DEFAULT_PACK.get("threshold", 2)
+_ESCALATION_RULES = _rule_groups(_DEFAULT_PACK["escalation_rules"])
+_NORMAL_RULES = _rule_groups(_DEFAULT_PACK["normal_rules"])
+_RULE_THRESHOLDS = _rule_thresholds(_DEFAULT_PACK["escalation_rules"], _DEFAULT_PACK["normal_rules"])
+
+
+def _token_span(tokens: dict, word: str):
+    """(start, end) of the first occurrence of *word* or its plural in a token index, or None."""
+    start = tokens.get(word)
+    plural = tokens.get(word + "s")
+    if plural is not None and (start is None or plural < start):
+        return plural, plural + len(word) + 1
+    return (start, start + len(word)) if start is not None else None
+
+
+def _trie_pattern(phrases) -> str:
+    """Build a regex whose branches form a prefix trie over *phrases*.
+
+    Children of a trie node start with distinct characters and optional tails
+    are greedy, so a match at any position is the longest phrase starting there.
+    """
+    root = {}
+    for phrase in phrases:
+        node = root
+        for ch in phrase:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def emit(node: dict) -> str:
+        branches = [re.escape(ch) + emit(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return emit(root)
+
+
+class _PhraseMatcher:
+    """Multi-pattern matcher that scores every rule in one pass over the text.
+
+    All keyword phrases are compiled once into a single trie-shaped regex, so
+    the scan walks the text left to right instead of once per phrase.  Only the
+    longest phrase is reported at each position; the shorter phrases hidden
+    inside it (e.g. "legal action" inside "take legal action") are recovered
+    from a precomputed containment table, the same role Aho-Corasick output
+    links play.
+
+    Single words are whole-token matches looked up in the transcript's token
+    index, so "manager" no longer fires on "management".  A word's plural
+    ("idiots", "lawyers") counts as the word itself.
+
+    Rules and phrases are numbered at compile time.  Each phrase (feature) id
+    maps to a flat posting tuple of (rule_id, points) pairs, so scoring is an
+    add into a list of per-rule scores with no per-hit dict lookups.
+    """
+
+    def __init__(self, rule_groups: dict):
+        self._rule_names = tuple(rule_groups)
+        keyword_hits = {}
+        word_hits = {}
+        for rule_id, (keywords, single_words) in enumerate(rule_groups.values()):
+            for kw, pts in _weighted(keywords, _KEYWORD_WEIGHT):
+                keyword_hits.setdefault(kw, []).append((rule_id, pts))
+            for w, pts in _weighted(single_words, _SINGLE_WORD_WEIGHT):
+                word_hits.setdefault(w, []).append((rule_id, pts))
+
+        # Feature ids: keywords in sorted order, then single words
+        phrases = sorted(keyword_hits)
+        self._keyword_count = len(phrases)
+        self._feature_ids = {p: i for i, p in enumerate(phrases)}
+        self._words = tuple((w, len(phrases) + i) for i, w in enumerate(word_hits))
+        self._phrases = tuple(phrases) + tuple(word_hits)
+        self._postings = tuple(tuple(keyword_hits[p]) for p in phrases) + \
+            tuple(tuple(hits) for hits in word_hits.values())
+        ids = self._feature_ids
+        # phrase -> ((contained_feature_id, offset_in_phrase, length), ...)
+        self._implied = {
+            p: tuple((ids[q], p.find(q), len(q)) for q in phrases if q in p) for p in phrases
         }
-    }
+        self._pattern = _trie_pattern(phrases) if phrases else None
+        self._search = re.compile(self._pattern).search if phrases else None
 
-    def __init__(self, transcript: Transcript):
-        self._transcript = transcript
-        self._normalized_text = transcript.get_normalized_text().lower()
+    # The compiled regex is rebuilt from its source on unpickle; everything
+    # else (trie pattern, containment and posting tables) is cached as-is.
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_search"]
+        return state
 
-    def apply_rules(self) -> list[reasonCode]:
-        text = self._normalized_text
-        reason_codes = []
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._search = re.compile(self._pattern).search if self._pattern else None
+
+    def _scan(self, text: str, spans: list = None) -> dict:
+        """Return {feature_id: (start, end)} for every keyword phrase present in *text*.
+
+        With *spans*, only those (start, end) regions of *text* are searched;
+        the regex is bounded by pos/endpos, so no substring is copied.
+        """
+        found = {}
+        search = self._search
+        if search is None:
+            return found
+        implied = self._implied
+        for span_start, span_end in spans if spans is not None else ((0, len(text)),):
+            m = search(text, span_start, span_end)
+            while m is not None:
+                start = m.start()
+                for q, off, length in implied[m.group()]:
+                    if q not in found:
+                        found[q] = (start + off, start + off + length)
+                m = search(text, start + 1, span_end)
+        return found
+
+    @staticmethod
+    def _token_index(text: str, tokens: dict, spans: list) -> dict:
+        """*tokens* if given, else the token index over *spans* (or all of *text*)."""
+        if tokens is not None:
+            return tokens
+        return build_token_index(text) if spans is None else build_span_token_index(text, spans)
+
+    def _hits(self, text: str, tokens: dict, spans: list = None) -> dict:
+        """Return {feature_id: (start, end)} for every keyword and single word in *text*.
+
+        *tokens* must index the same region that is scanned: all of *text*,
+        or only *spans* (see ``build_span_token_index``).
+        """
+        found = self._scan(text, spans)
+        tokens = self._token_index(text, tokens, spans)
+        for word, fid in self._words:
+            span = _token_span(tokens, word)
+            if span is not None:
+                found[fid] = span
+        return found
+
+    def rule_names(self) -> tuple:
+        """Rule names in rule-id order."""
+        return self._rule_names
+
+    def features(self) -> list[tuple[str, str, tuple]]:
+        """Return (kind, phrase, ((rule_name, points), ...)) for every matchable phrase.
+
+        Keywords come first in sorted order, then single words; a feature's
+        position in this list is its id in ``feature_hits``.
+        """
+        names = self._rule_names
+        return [
+            ("keyword" if fid < self._keyword_count else "single_word", phrase,
+             tuple((names[r], pts) for r, pts in self._postings[fid]))
+            for fid, phrase in enumerate(self._phrases)
+        ]
+
+    def feature_hits(self, text: str, tokens: dict = None, spans: list = None) -> list[int]:
+        """Return the ids (see ``features``) of every phrase present in *text*."""
+        return list(self._hits(text, tokens, spans))
 
-        scores = {name: _score(kws, words, text) for name, (kws, words) in _ESCALATION_RULES.items()}
-        scores.update({name: _score(kws, words, text) for name, (kws, words) in _NORMAL_RULES.items()})
+    def accumulate(self, text: str, tokens: dict = None, spans: list = None) -> tuple[list, list]:
+        """Return ([score, ...], [spans or None, ...]) indexed by rule id, from one scan.
 
-        any_escalation = any(scores[name] >= _THRESHOLD for name in _ESCALATION_RULES)
+        *tokens* is the token index from ``build_token_index``; it is built
+        here when the caller does not already have one.  Spans are flat
+        ``array('l')`` start/end pairs into *text*, one pair per matched phrase,
+        taken from the scan itself rather than a second search.  *spans*
+        limits the scan to those regions of *text*.
+        """
+        scores = [0] * len(self._rule_names)
+        matched = [None] * len(self._rule_names)
+        postings = self._postings
+        for fid, (start, end) in self._hits(text, tokens, spans).items():
+            for rule_id, pts in postings[fid]:
+                scores[rule_id] += pts
+                rule_spans = matched[rule_id]
+                if rule_spans is None:
+                    rule_spans = matched[rule_id] = array("l")
+                rule_spans.append(start)
+                rule_spans.append(end)
+        return scores, matched
 
-        for name in _ESCALATION_RULES:
-            if scores[name] >= _THRESHOLD:
-                reason_codes.append(reasonCode(name, any_escalation, scores[name]))
+    def scores(self, text: str, tokens: dict = None, spans: list = None) -> dict:
+        """Return {rule_name: score} for *text*."""
+        return dict(zip(self._rule_names, self.accumulate(text, tokens, spans)[0]))
 
-        for name in _NORMAL_RULES:
-            if scores[name] >= _THRESHOLD:
-                reason_codes.append(reasonCode(name, any_escalation, scores[name]))
+    def first_reaching(self, text: str, thresholds: tuple, tokens: dict = None, spans: list = None):
+        """Return (rule_id, score) for the first rule to reach its threshold, or None.
 
-        return reason_codes
+        Single words are checked first since they are plain dict lookups;
+        the keyword scan then stops at the match that crosses a threshold
+        instead of walking the rest of the text.
+        """
+        scores = [0] * len(self._rule_names)
+        for rule_id, limit in enumerate(thresholds):
+            if limit <= 0:
+                return rule_id, 0
+        postings = self._postings
+        tokens = self._token_index(text, tokens, spans)
+        present_words = (fid for word, fid in self._words if word in tokens or word + "s" in tokens)
+        for fid in present_words:
+            for rule_id, pts in postings[fid]:
+                scores[rule_id] += pts
+                if scores[rule_id] >= thresholds[rule_id]:
+                    return rule_id, scores[rule_id]
+
+        seen = set()
+        search = self._search
+        if search is None:
+            return None
+        implied = self._implied
+        for span_start, span_end in spans if spans is not None else ((0, len(text)),):
+            m = search(text, span_start, span_end)
+            while m is not None:
+                for fid, _, _ in implied[m.group()]:
+                    if fid not in seen:
+                        seen.add(fid)
+                        for rule_id, pts in postings[fid]:
+                            scores[rule_id] += pts
+                            if scores[rule_id] >= thresholds[rule_id]:
+                                return rule_id, scores[rule_id]
+                m = search(text, m.start() + 1, span_end)
+        return None
+
+
+class RuleSet:
+    """Immutable, compiled rule tables.
+
+    Build once per process and apply to many normalised transcripts::
+
+        rules = load_rule_pack("rule_packs/default.json")
+        codes = rules.apply(transcript.get_normalized_text())
+        batch = rules.apply_many(texts)
+    """
+
+    __slots__ = ("_escalation_names", "_normal_names", "_threshold", "_thresholds",
+                 "_escalation_count", "_matcher", "_escalation_matcher",
+                 "_name", "_version", "_digest")
+
+    def __init__(self, escalation_rules: dict = None, normal_rules: dict = None,
+                 threshold: int = _THRESHOLD, name: str = None, version: str = None,
+                 digest: str = None, thresholds: dict = None):
+        if thresholds is None:
+            thresholds = _RULE_THRESHOLDS if escalation_rules is None and normal_rules is None else {}
+        escalation_rules = _ESCALATION_RULES if escalation_rules is None else escalation_rules
+        normal_rules = _NORMAL_RULES if normal_rules is None else normal_rules
+        matcher = _PhraseMatcher({**escalation_rules, **normal_rules})
+        object.__setattr__(self, "_escalation_names", tuple(escalation_rules))
+        object.__setattr__(self, "_normal_names", tuple(normal_rules))
+        object.__setattr__(self, "_threshold", threshold)
+        # Decision table: one threshold per rule id; escalation ids come first
+        object.__setattr__(self, "_thresholds",
+                           tuple(thresholds.get(n, threshold) for n in matcher.rule_names()))
+        object.__setattr__(self, "_escalation_count", len(escalation_rules))
+        object.__setattr__(self, "_matcher", matcher)
+        # Escalation rules only, for the early-exit routing path: a smaller trie
+        # and no work spent on normal rules that cannot change the decision
+        object.__setattr__(self, "_escalation_matcher", _PhraseMatcher(escalation_rules))
+        object.__setattr__(self, "_name", name)
+        object.__setattr__(self, "_version", version)
+        object.__setattr__(self, "_digest", digest)
+
+    @classmethod
+    def from_pack(cls, pack: dict, digest: str = None) -> "RuleSet":
+        """Compile a parsed rule pack dict."""
+        return cls(
+            _rule_groups(pack["escalation_rules"]),
+            _rule_groups(pack["normal_rules"]),
+            pack.get("threshold", 2),
+            name=pack.get("name"),
+            version=pack.get("version"),
+            digest=digest,
+            thresholds=_rule_thresholds(pack["escalation_rules"], pack["normal_rules"]),
+        )
+
+    def __setattr__(self, name, value):
+        raise AttributeError("RuleSet is immutable")
+
+    def __getstate__(self):
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+    def __setstate__(self, state):
+        for slot, value in state.items():
+            object.__setattr__(self, slot, value)
+
+    #Getters
+    def get_name(self) -> str:
+        return self._name
+
+    def get_version(self) -> str:
+        return self._version
+
+    def get_digest(self) -> str:
+        return self._digest
+
+    def get_escalation_names(self) -> tuple:
+        return self._escalation_names
+
+    def get_normal_names(self) -> tuple:
+        return self._normal_names
+
+    def get_threshold(self) -> int:
+        return self._threshold
+
+    def get_thresholds(self) -> dict:
+        """Return the effective {rule_name: threshold}, per-rule overrides included."""
+        return dict(zip(self._matcher.rule_names(), self._thresholds))
+
+    def features(self) -> list[tuple[str, str, tuple]]:
+        """Return (kind, phrase, ((rule_name, points), ...)) for every phrase."""
+        return self._matcher.features()
+
+    def feature_hits(self, text: str, tokens: dict = None, spans: list = None) -> list[int]:
+        """Return the ids of the phrases (see ``features``) present in *text*."""
+        return self._matcher.feature_hits(text, tokens, spans)
+
+    def scores(self, text: str, tokens: dict = None, spans: list = None) -> dict:
+        """Return the raw {rule_name: score} map for *text*."""
+        return self._matcher.scores(text, tokens, spans)
+
+    def apply(self, text: str, tokens: dict = None, spans: list = None) -> list[reasonCode]:
+        """Return the reason codes that reach their threshold for normalised *text*.
+
+        Pass the transcript's token index as *tokens* to avoid re-tokenising.
+        *spans* restricts the scan to those (start, end) regions of *text*;
+        *tokens* must then cover only those regions, or be left to be built.
+        """
+        scores, matched = self._matcher.accumulate(text, tokens, spans)
+        fired = [i for i, (score, limit) in enumerate(zip(scores, self._thresholds)) if score >= limit]
+        # Escalation rules hold the lowest ids, so the first fired id decides
+        any_escalation = bool(fired) and fired[0] < self._escalation_count
+        names = self._matcher.rule_names()
+        return [reasonCode(names[i], any_escalation, scores[i], matched[i]) for i in fired]
+
+    def apply_transcript(self, transcript: Transcript, customer_only: bool = True) -> list[reasonCode]:
+        """Apply the rules to a parsed transcript.
+
+        By default only the customer's turns are scanned, so agent script
+        ("would you like to make a payment") does not score.  Transcripts
+        with no labelled customer speech are scanned in full.
+        """
+        spans = transcript.get_customer_spans() if customer_only else None
+        if spans is None:
+            return self.apply(transcript.get_normalized_text(), transcript.get_token_index())
+        return self.apply(transcript.get_normalized_text(), transcript.get_customer_token_index(), spans)
+
+    def first_escalation(self, text: str, tokens: dict = None, spans: list = None) -> reasonCode | None:
+        """Return the first escalation rule to reach its threshold in *text*, or None.
+
+        Stops scanning at that point, so the returned score is the score when
+        the threshold was crossed, not the rule's full score.  The decision
+        (escalate or not) always matches ``apply``.
+        """
+        hit = self._escalation_matcher.first_reaching(
+            text, self._thresholds[:self._escalation_count], tokens, spans)
+        if hit is None:
+            return None
+        rule_id, score = hit
+        return reasonCode(self._escalation_names[rule_id], True, score)
+
+    def apply_many(self, texts) -> list[list[reasonCode]]:
+        """Apply the rules to each normalised text in *texts*, preserving order."""
+        apply = self.apply
+        return [apply(text) for text in texts]
+
+
+# digest -> RuleSet, so reloading an unchanged pack in-process is free
+_LOADED: dict[str, RuleSet] = {}
+
+
+def _cache_path(cache_dir: str, digest: str) -> str:
+    return os.path.join(cache_dir, f"{digest}.{_CODE_DIGEST}.pickle")
+
+
+def _read_cache(cache_dir: str, digest: str):
+    if _CODE_DIGEST is None:
+        return None
+    try:
+        with open(_cache_path(cache_dir, digest), "rb") as f:
+            ruleset = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+        return None
+    return ruleset if isinstance(ruleset, RuleSet) and ruleset.get_digest() == digest else None
+
+
+def _write_cache(cache_dir: str, ruleset: RuleSet):
+    """Write the compiled pack atomically.
+
+    An unwritable cache directory is skipped silently; it only costs a
+    recompile in the next process.
+    """
+    if _CODE_DIGEST is None:
+        return
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+    except OSError:
+        return
+    try:
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(ruleset, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, _cache_path(cache_dir, ruleset.get_digest()))
+    except OSError:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+
+
+def load_rule_pack(path: str = None, cache_dir: str = None) -> RuleSet:
+    """Load a rule pack, reusing the compiled artifact cached for its content hash.
+
+    *cache_dir* defaults to ``default_cache_dir()``.
+    """
+    path = path or DEFAULT_RULE_PACK
+    cache_dir = cache_dir or default_cache_dir()
+    with open(path, "rb") as f:
+        digest = hashlib.sha256(f.read()).hexdigest()
+
+    ruleset = _LOADED.get(digest) or _read_cache(cache_dir, digest)
+    if ruleset is None:
+        pack, digest = _read_pack(path)
+        ruleset = RuleSet.from_pack(pack, digest)
+        _write_cache(cache_dir, ruleset)
+    _LOADED[digest] = ruleset
+    return ruleset
+
+
+# Compiled once per process at import time; shared by ruleEngine and the
+# pipeline workers.
+DEFAULT_RULESET = load_rule_pack(DEFAULT_RULE_PACK)
+
+
+class ruleEngine:
+    # Default pack sections, kept accessible for any code that inspects them
+    ESCALATION_RULES = _DEFAULT_PACK["escalation_rules"]
+    NORMAL_RULES = _DEFAULT_PACK["normal_rules"]
+
+    def __init__(self, transcript: Transcript, rules: RuleSet = None, customer_only: bool = True):
+        self._transcript = transcript
+        self._rules = rules if rules is not None else DEFAULT_RULESET
+        self._customer_only = customer_only
+
+    def apply_rules(self) -> list[reasonCode]:
+        return self._rules.apply_transcript(self._transcript, self._customer_only)
@@ -0,0 +1,202 @@
+"""
+File Name: transcriptPack.py
+Description: Packed transcript corpus.  A directory of transcript files is
+             concatenated into one data file, with a binary index beside it
+             holding each transcript's byte offset, name and modification
+             time.  Opening a pack is two reads and one mmap; every transcript
+             after that is a slice of the mapping, decoded in place, with no
+             per-transcript open/read/close or directory scan.
+"""
+
+import argparse
+import fnmatch
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from engines.transcriptReader import decode_transcript
+
+# Index file: "<pack path>.idx"
+INDEX_SUFFIX = ".idx"
+
+# Index layout (little-endian):
+#   header   magic, format version, transcript count n, name blob length
+#   offsets  n + 1 x uint64   transcript i is data[offsets[i]:offsets[i + 1]]
+#   name_ends    n x uint64   name i is names[name_ends[i - 1]:name_ends[i]]
+#   mtimes       n x int64    source file st_mtime_ns
+#   names    UTF-8 blob of the concatenated names
+_MAGIC = b"TTPK"
+_FORMAT_VERSION = 1
+_HEADER = struct.Struct("<4sIQQ")
+
+
+def _to_little_endian(column: array) -> array:
+    if sys.byteorder == "big":
+        column = array(column.typecode, column)
+        column.byteswap()
+    return column
+
+
+class TranscriptPack:
+    """Read-only view of a packed corpus, memory-mapped.
+
+    Usage::
+
+        build_pack("transcripts", "corpus.pack")    # once, or after the corpus changes
+        with TranscriptPack("corpus.pack") as pack:
+            len(pack)                               # number of transcripts
+            pack.name(0), pack.text(0)              # "call_001.txt", its decoded text
+            pipeline.process_batch(pack)            # the pool reads its own slices
+    """
+
+    def __init__(self, pack_path: str):
+        self._path = os.path.abspath(pack_path)
+        with open(self._path + INDEX_SUFFIX, "rb", buffering=0) as f:
+            index = f.readall()
+        if len(index) < _HEADER.size:
+            raise ValueError(f"Not a transcript pack index: {self._path + INDEX_SUFFIX}")
+        magic, version, n, names_len = _HEADER.unpack_from(index)
+        if magic != _MAGIC:
+            raise ValueError(f"Not a transcript pack index: {self._path + INDEX_SUFFIX}")
+        if version != _FORMAT_VERSION:
+            raise ValueError(f"Unsupported transcript pack version {version} (expected {_FORMAT_VERSION})")
+
+        view = memoryview(index)
+        pos = _HEADER.size
+        self._offsets = array("Q")
+        self._name_ends = array("Q")
+        self._mtimes = array("q")
+        for column, count in ((self._offsets, n + 1), (self._name_ends, n), (self._mtimes, n)):
+            end = pos + count * column.itemsize
+            column.frombytes(view[pos:end])
+            if sys.byteorder == "big":
+                column.byteswap()
+            pos = end
+        self._names = bytes(view[pos:pos + names_len])
+        self._name_ids = None
+
+        with open(self._path, "rb", buffering=0) as f:
+            st = os.fstat(f.fileno())
+            if st.st_size != self._offsets[-1]:
+                raise ValueError(f"Transcript pack data does not match its index: {self._path}")
+            # Identifies this build of the pack; workers reopen when it changes
+            self._stamp = (st.st_ino, st.st_mtime_ns, st.st_size)
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if st.st_size else None
+        self._view = memoryview(self._mmap) if self._mmap is not None else memoryview(b"")
+
+    #Getters
+    def get_path(self) -> str:
+        return self._path
+
+    def get_stamp(self) -> tuple:
+        return self._stamp
+
+    def name(self, i: int) -> str:
+        start = self._name_ends[i - 1] if i > 0 else 0
+        return self._names[start:self._name_ends[i]].decode("utf-8")
+
+    def names(self, start: int = 0, stop: int = None) -> list[str]:
+        """Names of transcripts *start* .. *stop* - 1 (all of them by default)."""
+        return [self.name(i) for i in range(start, len(self) if stop is None else stop)]
+
+    def size(self, i: int) -> int:
+        """Size of transcript *i* in bytes."""
+        return self._offsets[i + 1] - self._offsets[i]
+
+    def mtime_ns(self, i: int) -> int:
+        """Modification time of transcript *i*'s source file when it was packed."""
+        return self._mtimes[i]
+
+    def text(self, i: int) -> str:
+        """Decoded text of transcript *i*, as ``read_transcript`` would return it."""
+        return decode_transcript(self._view[self._offsets[i]:self._offsets[i + 1]])
+
+    def index_of(self, name: str) -> int:
+        """Position of the transcript called *name*; raises KeyError if absent."""
+        if self._name_ids is None:
+            self._name_ids = {n: i for i, n in enumerate(self.names())}
+        return self._name_ids[name]
+
+    def close(self):
+        self._view.release()
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    #Defining __len__ method
+    def __len__(self) -> int:
+        return len(self._mtimes)
+
+    #Context-manager support
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+
+    #Defining __str__ method
+    def __str__(self) -> str:
+        return f"TranscriptPack(path={self._path!r}, transcripts={len(self)}, bytes={self._offsets[-1]})"
+
+    #Defining __repr__ method
+    def __repr__(self) -> str:
+        return self.__str__()
+
+
+def build_pack(source_dir: str, pack_path: str, pattern: str = "*.txt") -> int:
+    """Pack every file in *source_dir* matching *pattern* into *pack_path*.
+
+    Transcripts are stored byte for byte, in name order, under their file
+    names.  Both files are written beside their targets and renamed into
+    place, so a pack that is open elsewhere keeps its old mapping and a
+    reader never sees a half-written one.  Returns the number packed.
+    """
+    entries = sorted((entry for entry in os.scandir(source_dir)
+                      if entry.is_file() and fnmatch.fnmatch(entry.name, pattern)),
+                     key=lambda entry: entry.name)
+    offsets = array("Q", [0])
+    name_ends = array("Q")
+    mtimes = array("q")
+    names = bytearray()
+
+    tmp_data = pack_path + ".tmp"
+    tmp_index = pack_path + INDEX_SUFFIX + ".tmp"
+    with open(tmp_data, "wb") as out:
+        for entry in entries:
+            with open(entry.path, "rb", buffering=0) as f:
+                data = f.readall()
+            out.write(data)
+            offsets.append(offsets[-1] + len(data))
+            names += entry.name.encode("utf-8")
+            name_ends.append(len(names))
+            mtimes.append(entry.stat().st_mtime_ns)
+    with open(tmp_index, "wb") as out:
+        out.write(_HEADER.pack(_MAGIC, _FORMAT_VERSION, len(entries), len(names)))
+        for column in (offsets, name_ends, mtimes):
+            out.write(_to_little_endian(column).tobytes())
+        out.write(names)
+    # A reader opening between the two renames is stopped by the size check
+    # unless old and new data happen to be the same length
+    os.replace(tmp_data, pack_path)
+    os.replace(tmp_index, pack_path + INDEX_SUFFIX)
+    return len(entries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pack a transcript directory into one data file plus an index")
+    parser.add_argument('source_dir', nargs='?', default='transcripts',
+                        help='Directory of transcript files (default: transcripts)')
+    parser.add_argument('pack_path', nargs='?', default='transcripts.pack',
+                        help='Pack to write; the index goes to <pack_path>.idx (default: transcripts.pack)')
+    parser.add_argument('--pattern', type=str, default='*.txt', help='File name pattern (default: *.txt)')
+    args = parser.parse_args()
+
+    count = build_pack(args.source_dir, args.pack_path, args.pattern)
+    print(f"Packed {count} transcripts into {args.pack_path} (index: {args.pack_path + INDEX_SUFFIX})")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,31 +2,191 @@
 File Name: transcriptParser.py
 Description: Parser for transcript data
 """
-from Data_Classes.transcript import transcript
+import re
+import string
+from array import array
+from bisect import bisect_right
 from datetime import datetime
+from itertools import accumulate, count
+from operator import add
+
+from Data_Classes.transcript import transcript
+from Data_Classes.speakerTurns import speakerTurns as SpeakerTurns, AGENT, CUSTOMER, OTHER
+
+# ASCII punctuation and whitespace map to a single space.  The replacement is
+# the same width, so offsets into the tokenised copy are offsets into the text.
+_TOKEN_TABLE = bytes.maketrans(
+    (string.punctuation + string.whitespace).encode(),
+    b" " * len(string.punctuation + string.whitespace),
+)
+
+# Typographic punctuation from ASR and word-processor exports, folded to the
+# ASCII character the rule packs and entity patterns are written with.  Every
+# fold is one character for one character, so normalized offsets still line up
+# with the raw text (see offsetMap).
+#
+# Kept as (character, replacement) pairs and applied with str.replace on
+# purpose, not as a str.translate table: translate walks a non-ASCII string
+# one dict lookup per character (~4x the cost of the whole normalization on
+# the corpus), while each replace is a C-speed scan and only runs for
+# characters that are present.
+_FOLD_PAIRS = (
+    # apostrophes and single quotes
+    ("\u2018", "'"), ("\u2019", "'"), ("\u201a", "'"), ("\u201b", "'"), ("\u2032", "'"), ("\u02bc", "'"),
+    ("\u00b4", "'"),
+    # double quotes
+    ("\u201c", '"'), ("\u201d", '"'), ("\u201e", '"'), ("\u201f", '"'), ("\u2033", '"'),
+    # hyphens, dashes and minus signs
+    ("\u2010", "-"), ("\u2011", "-"), ("\u2012", "-"), ("\u2013", "-"), ("\u2014", "-"), ("\u2015", "-"),
+    ("\u2212", "-"), ("\ufe58", "-"), ("\ufe63", "-"), ("\uff0d", "-"),
+)
+
+
+def normalize_text(raw_text: str) -> str:
+    """Return the canonical text every engine reads.
+
+    Case is folded, typographic apostrophes, quotes and dashes are folded to
+    ASCII, and whitespace runs are collapsed to single spaces (leading and
+    trailing whitespace dropped).  ASCII input has nothing to fold beyond
+    case and skips the punctuation pass.
+    """
+    text = raw_text.lower()
+    if not text.isascii():
+        for char, folded in _FOLD_PAIRS:
+            if char in text:
+                text = text.replace(char, folded)
+    return " ".join(text.split())
+
+
+# Speaker labels that name a role outright; anything else is decided by
+# how the speaker talks
+_AGENT_LABEL_RE = re.compile(
+    r"\b(?:agent|rep|representative|supervisor|manager|specialist|advisor|operator|csr|servicer)\b", re.I)
+_CUSTOMER_LABEL_RE = re.compile(
+    r"\b(?:caller|customer|borrower|client|homeowner|spouse|husband|wife|background)\b", re.I)
+# Agents talk about the customer's loan ("your payment", "let me check"),
+# customers about their own ("my payment", "we can't")
+_SECOND_PERSON_RE = re.compile(r"\byour?\b|\blet me\b", re.I)
+_FIRST_PERSON_RE = re.compile(r"\b(?:my|me|we|our)\b", re.I)
+
+
+def build_token_index(normalized_text: str) -> dict[str, int]:
+    """Map every word token in *normalized_text* to the offset of its first occurrence.
+
+    Tokens are maximal runs between punctuation/whitespace, so membership
+    tests have real word-boundary semantics without running a regex.
+    """
+    # bytes.translate is a flat table lookup — far cheaper than str.translate
+    tokens = normalized_text.encode().translate(_TOKEN_TABLE).decode().split(" ")
+    # offset of token i = lengths of the tokens before it + one separator each
+    offsets = list(map(add, accumulate(map(len, tokens), initial=0), count()))
+    offsets.pop()
+    # Built back to front so the first occurrence of each token wins
+    index = dict(zip(reversed(tokens), reversed(offsets)))
+    index.pop("", None)
+    return index
+
+
+def build_span_token_index(normalized_text: str, spans) -> dict[str, int]:
+    """``build_token_index`` over only the (start, end) *spans* of *normalized_text*.
+
+    Offsets still point into the whole text.  The spans are tokenised as one
+    space-joined string, so a token never runs across two spans.
+    """
+    pieces = [normalized_text[start:end] for start, end in spans]
+    index = build_token_index(" ".join(pieces))
+    # Piece i starts at joined_starts[i] in the joined string and at spans[i][0] in the text
+    joined_starts = list(accumulate((len(piece) + 1 for piece in pieces), initial=0))
+    joined_starts.pop()
+    shifts = [start - joined for (start, _), joined in zip(spans, joined_starts)]
+    for token, offset in index.items():
+        index[token] = offset + shifts[bisect_right(joined_starts, offset) - 1]
+    return index
+
+
+def _label_role(label: str) -> str | None:
+    """Role named by a speaker label, or None when the label is just a name."""
+    if label.startswith("#"):
+        return OTHER
+    if _AGENT_LABEL_RE.search(label):
+        return AGENT
+    if _CUSTOMER_LABEL_RE.search(label):
+        return CUSTOMER
+    return None
+
+
+def speaker_role(label: str, speech: str = "") -> str:
+    """Classify one speaker as AGENT, CUSTOMER or OTHER.
+
+    The label decides when it names a role ("Agent", "Supervisor (Tom)",
+    "Caller", "Husband (background)"); "# ..." header lines are OTHER.
+    A bare name ("Kevin", "Raymond") is an agent if its *speech* leans on
+    the second person more than the first, and a customer otherwise.
+    """
+    role = _label_role(label)
+    if role is not None:
+        return role
+    if len(_SECOND_PERSON_RE.findall(speech)) > len(_FIRST_PERSON_RE.findall(speech)):
+        return AGENT
+    return CUSTOMER
+
+
+def build_speaker_turns(raw_text: str) -> SpeakerTurns:
+    """Split *raw_text* into speaker turns in one pass over its lines.
+
+    A turn starts after a "Name:" label (a line's text up to its first
+    colon) and runs to the next labelled line, so unlabelled lines continue
+    the previous turn.  Lines whose label is blank (": hello") are
+    continuations too; text before the first label belongs to no turn.
+    Each speaker is classified with ``speaker_role``.
+    """
+    names = []
+    ids = {}
+    speaker_ids = array("I")
+    starts = array("l")
+    ends = array("l")
+    pos = 0
+    for line in raw_text.splitlines(keepends=True):
+        colon = line.find(':')
+        if colon >= 0:
+            name = line[:colon].strip()
+            if name:
+                sid = ids.get(name)
+                if sid is None:
+                    sid = ids[name] = len(names)
+                    names.append(name)
+                if starts:
+                    ends.append(pos)
+                speaker_ids.append(sid)
+                starts.append(pos + colon + 1)
+        pos += len(line)
+    if starts:
+        ends.append(len(raw_text))
+    roles = [_label_role(name) for name in names]
+    for sid, role in enumerate(roles):
+        if role is None:
+            # Only bare names need their speech gathered
+            speech = " ".join(raw_text[start:end] for i, start, end in zip(speaker_ids, starts, ends) if i == sid)
+            roles[sid] = speaker_role(names[sid], speech)
+    return SpeakerTurns(names, speaker_ids, starts, ends, roles)
+
+
 class transcriptParser:
     def __init__(self):
         pass
 
     def _normalize_text(self, raw_text: str) -> str:
-        # Example normalization: lowercasing and removing extra spaces
-        normalized = ' '.join(raw_text.lower().split())
-        return normalized
+        return normalize_text(raw_text)
     
         
     def _getSpeakers(self, raw_text: str) -> list:
-        # Example speaker extraction: assuming speakers are denoted by "Speaker 1:", "Speaker 2:", etc.
-        speakers = set()
-        lines = raw_text.splitlines()
-        for line in lines:
-            if ':' in line:
-                speaker = line.split(':', 1)[0].strip()
-                if speaker:
-                    speakers.add(speaker)
-        return list(speakers)
-    
+        # Speakers are labelled "Name:" at the start of a line, e.g. "Speaker 1:"
+        return build_speaker_turns(raw_text).get_speaker_names()
+
     def parse_transcript(self, raw_text: str) -> transcript:
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         normalized_text = self._normalize_text(raw_text)
-        speakers = self._getSpeakers(raw_text)
-        return transcript(raw_text, normalized_text, speakers, timestamp)
+        turns = build_speaker_turns(raw_text)
+        # Token indexes are built on first use: customer-only scoring only
+        # needs one over the customer's spans
+        return transcript(raw_text, normalized_text, turns.get_speaker_names(), timestamp, turns=turns)
@@ -0,0 +1,40 @@
+"""
+File Name: transcriptReader.py
+Description: Transcript file ingestion.  A file is read as bytes in one call,
+             or memory-mapped when it is large, and decoded once straight from
+             that buffer rather than streamed through a buffered text reader.
+"""
+
+import mmap
+import os
+
+# Files at least this large are memory-mapped instead of read into a bytes
+# copy first; below it the mmap/munmap calls cost more than the copy saves
+MMAP_THRESHOLD = 256 * 1024
+
+
+def decode_transcript(data) -> str:
+    """Decode a UTF-8 transcript buffer (bytes, mmap or memoryview) to text.
+
+    One pass validates and decodes: CPython's UTF-8 decoder copies ASCII runs
+    a machine word at a time, so a pure-ASCII transcript costs little more
+    than a memcpy.  "\\r\\n" and lone "\\r" become "\\n", as in text-mode
+    ``open()``, so offsets match files read the old way.
+    """
+    text = str(data, "utf-8")
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
+
+
+def read_transcript(file_path: str) -> str:
+    """Return the text of the transcript at *file_path*.
+
+    Raises FileNotFoundError for a missing file and UnicodeDecodeError for
+    one that is not valid UTF-8.
+    """
+    with open(file_path, "rb", buffering=0) as f:
+        if os.fstat(f.fileno()).st_size >= MMAP_THRESHOLD:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                return decode_transcript(buffer)
+        return decode_transcript(f.readall())
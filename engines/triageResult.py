@@ -7,55 +7,115 @@ import math
 import os
 
 from Data_Classes.triageResult import triageResult as TriageResult
-from engines.transcriptParser import transcriptParser
-from engines.ruleEngine import ruleEngine as RuleEngine
-from engines.entityExtractor import entityExtractor as EntityExtractor
+from Data_Classes.escalationDecision import escalationDecision as EscalationDecision
+from Data_Classes.offsetMap import offsetMap as OffsetMap
+from Data_Classes.speakerTurns import CUSTOMER
+from engines.transcriptParser import transcriptParser, build_token_index, build_span_token_index, build_speaker_turns
+from engines.transcriptReader import read_transcript
+from engines.transcriptPack import TranscriptPack
+from engines.ruleEngine import RuleSet, DEFAULT_RULESET, load_rule_pack
+from engines.entityExtractor import entityExtractor as EntityExtractor, AMOUNT_CACHE_SIZE
 from engines.intentClassifier import intentClassifier as IntentClassifier
 from engines.escalationEngine import escalationEngine as EscalationEngine
 from engines.summaryGenerator import summaryGenerator as SummaryGenerator
 from engines.pipelinePool import PipelinePool
+from engines.loanIndex import LoanIndex
+from engines.pipelineMetrics import PipelineMetrics, untimed
 
 # ---------------------------------------------------------------------------
 # Module-level worker — must be at top level so ProcessPoolExecutor can pickle
 # it (used by the sequential fallback path only).
 # ---------------------------------------------------------------------------
-def _process_file(file_path: str) -> TriageResult:
+def _process_file(file_path: str, rules: RuleSet = None, metrics: PipelineMetrics = None,
+                  entity_extractor: EntityExtractor = None, lazy_entities: bool = False,
+                  customer_only: bool = True) -> TriageResult:
+    try:
+        raw_text = read_transcript(file_path)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Transcript file not found: {file_path}")
+
+    return _process_text(raw_text, rules, metrics, entity_extractor, lazy_entities, customer_only)
+
+
+def _process_text(raw_text: str, rules: RuleSet = None, metrics: PipelineMetrics = None,
+                  entity_extractor: EntityExtractor = None, lazy_entities: bool = False,
+                  customer_only: bool = True) -> TriageResult:
+    rules            = rules if rules is not None else DEFAULT_RULESET
+    timed            = metrics.timed if metrics is not None else untimed
     parser           = transcriptParser()
-    entity_extractor = EntityExtractor()
+    # Reusing the caller's extractor keeps its amount cache warm across files
+    entity_extractor = entity_extractor if entity_extractor is not None else EntityExtractor()
+    extract_entities = entity_extractor.extract_entities_lazy if lazy_entities else entity_extractor.extract_all_entities
     intent_clf       = IntentClassifier()
     escalate_eng     = EscalationEngine()
     summary_gen      = SummaryGenerator()
 
+    transcript   = timed("parse_transcript", parser.parse_transcript, raw_text)
+    reason_codes = timed("apply_rules", rules.apply_transcript, transcript, customer_only)
+    entity       = timed("extract_all_entities", extract_entities, transcript)
+    intents      = timed("classify", intent_clf.classify, reason_codes)
+    esc_result   = timed("evaluate_escalation", escalate_eng.evaluate_escalation, reason_codes)
+    summary      = timed("generate_bullets", summary_gen.generate_bullets, intents, entity, reason_codes)
+    if metrics is not None:
+        metrics.count_rules(reason_codes)
+
+    return TriageResult(intents, esc_result["escalation_needed"],
+                        esc_result["risk_level"], reason_codes, entity, summary)
+
+
+def _triage_escalation_only(file_path: str, rules: RuleSet = None, customer_only: bool = True) -> EscalationDecision:
+    """Decide only whether *file_path* escalates.
+
+    Skips entity extraction, intent classification and summary bullets, and
+    stops the rule scan at the first escalation rule that reaches its
+    threshold.  Speaker turns are still split when only customer turns are
+    scanned, so the decision matches ``_process_file``.
+    """
+    rules = rules if rules is not None else DEFAULT_RULESET
+
     try:
-        with open(file_path, 'r') as f:
-            raw_text = f.read()
+        raw_text = read_transcript(file_path)
     except FileNotFoundError:
         raise FileNotFoundError(f"Transcript file not found: {file_path}")
 
-    transcript   = parser.parse_transcript(raw_text)
-    reason_codes = RuleEngine(transcript).apply_rules()
-    entity       = entity_extractor.extract_all_entities(transcript)
-    intents      = intent_clf.classify(reason_codes)
-    esc_result   = escalate_eng.evaluate_escalation(reason_codes)
-    summary      = summary_gen.generate_bullets(intents, entity, reason_codes)
-
-    return TriageResult(intents, esc_result["escalation_needed"],
-                        esc_result["risk_level"], reason_codes, entity, summary)
+    normalized = transcriptParser()._normalize_text(raw_text)
+    spans      = None
+    if customer_only:
+        turns = build_speaker_turns(raw_text)
+        customers = turns.speakers_with_role(CUSTOMER)
+        if customers:
+            spans = turns.normalized_spans_of(customers, OffsetMap(raw_text, normalized))
+    tokens     = build_token_index(normalized) if spans is None else build_span_token_index(normalized, spans)
+    trigger    = rules.first_escalation(normalized, tokens, spans)
+    if trigger is None:
+        return EscalationDecision(False)
+    return EscalationDecision(True, trigger.get_code(), trigger.get_score())
 
 
 class TriagePipeline:
     # Batches smaller than this run sequentially (parallel startup cost not worth it)
     _PARALLEL_THRESHOLD = 8
 
-    def __init__(self, workers: int = None):
+    def __init__(self, workers: int = None, rule_pack: str = None, amount_cache_size: int = AMOUNT_CACHE_SIZE,
+                 lazy_entities: bool = False, customer_only: bool = True):
         self.parser           = transcriptParser()
-        self.entity_extractor = EntityExtractor()
+        self.entity_extractor = EntityExtractor(amount_cache_size)
+        self._amount_cache_size = amount_cache_size
+        # Sequential path only: pool results are pickled back, which extracts
+        # every family anyway, so workers keep the single fused scan
+        self._lazy_entities   = lazy_entities
+        # Score only the customer's turns (agent script is not evidence)
+        self._customer_only   = customer_only
         self.intent           = IntentClassifier()
         self.escalate         = EscalationEngine()
         self.summary          = SummaryGenerator()
+        self._rule_pack       = rule_pack
+        self.rules            = load_rule_pack(rule_pack) if rule_pack else DEFAULT_RULESET
         # Warm pool is created lazily on first parallel batch and kept alive
         self._pool: PipelinePool | None = None
         self._workers = workers
+        # Stage timings and rule hits from both paths; the pool merges into it
+        self.metrics          = PipelineMetrics()
 
     # ------------------------------------------------------------------
     # Internal helpers
@@ -81,7 +141,9 @@ class TriagePipeline:
         if self._pool is None or optimal > self._pool.workers:
             if self._pool is not None:
                 self._pool.shutdown(wait=False)
-            self._pool = PipelinePool(workers=optimal)
+            self._pool = PipelinePool(workers=optimal, rule_pack=self._rule_pack, metrics=self.metrics,
+                                      amount_cache_size=self._amount_cache_size,
+                                      customer_only=self._customer_only)
         return self._pool
 
     # ------------------------------------------------------------------
@@ -90,17 +152,55 @@ class TriagePipeline:
 
     def process_single(self, file_path: str) -> TriageResult:
         """Process a single transcript file and return a TriageResult."""
-        return _process_file(file_path)
+        return _process_file(file_path, self.rules, self.metrics, self.entity_extractor, self._lazy_entities,
+                             self._customer_only)
 
-    def process_batch(self, file_paths: list) -> list[TriageResult]:
-        """Process multiple transcripts.
+    def triage_escalation_only(self, file_path: str) -> EscalationDecision:
+        """Return only the escalate / don't-escalate decision for one transcript.
+
+        Much cheaper than ``process_single`` — for real-time routing where the
+        full result is not needed.
+        """
+        return _triage_escalation_only(file_path, self.rules, self._customer_only)
+
+    def process_batch(self, file_paths, loan_index: LoanIndex = None) -> list[TriageResult]:
+        """Process multiple transcripts: a list of file paths, or a TranscriptPack.
 
         Small batches run sequentially. Larger batches use the persistent warm
-        pool automatically — no manual pool management needed.
+        pool automatically — no manual pool management needed.  A pack is
+        read from its memory mapping, by the workers themselves on the pool
+        path.  If *loan_index* is given, results are added to it (keyed by
+        path, or by name within the pack) as they complete.
         """
         if len(file_paths) < self._PARALLEL_THRESHOLD:
-            return [_process_file(p) for p in file_paths]
-        return self._get_pool(len(file_paths)).process_batch(file_paths)
+            if isinstance(file_paths, TranscriptPack):
+                pack = file_paths
+                items = ((pack.name(i), pack.text(i)) for i in range(len(pack)))
+                process = _process_text
+            else:
+                items = ((p, p) for p in file_paths)
+                process = _process_file
+            results = []
+            for transcript_id, source in items:
+                result = process(source, self.rules, self.metrics, self.entity_extractor, self._lazy_entities,
+                                 self._customer_only)
+                if loan_index is not None:
+                    loan_index.add(transcript_id, result)
+                results.append(result)
+            return results
+        return self._get_pool(len(file_paths)).process_batch(file_paths, loan_index)
+
+    def reload_rules(self, rule_pack: str = None):
+        """Switch to *rule_pack* (or re-read the current one) without restarting the pool."""
+        if rule_pack is not None:
+            self._rule_pack = rule_pack
+        self.rules = load_rule_pack(self._rule_pack)
+        if self._pool is not None:
+            self._pool.reload_rules(self._rule_pack)
+
+    def reset_metrics(self):
+        """Clear the stage timings and rule hit counters."""
+        self.metrics.reset()
 
     def shutdown(self):
         """Release the warm pool if one was created."""
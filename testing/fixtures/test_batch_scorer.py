@@ -0,0 +1,104 @@
+"""
+Unit tests for batchScorer.
+"""
+
+import os
+
+import numpy as np
+import pytest
+from engines.batchScorer import BatchScorer, OccurrenceMatrix
+from engines.escalationEngine import escalationEngine
+from engines.ruleEngine import RuleSet, DEFAULT_RULESET
+
+
+TEXTS = [
+    "",
+    "i lost my job and need a payment plan",
+    "i want to make a payment and check my escrow account",
+    "i will take legal action, get me your supervisor",
+    "the management team reviewed the imbalance",
+    "calling for my husband about his payment and balance",
+]
+
+
+@pytest.fixture(scope="module")
+def scorer():
+    return BatchScorer()
+
+
+@pytest.fixture(scope="module")
+def matrix(scorer):
+    return scorer.index(TEXTS)
+
+
+# === Indexing ===
+
+
+class TestIndex:
+    """Tests for building the phrase-occurrence matrix."""
+
+    def test_one_row_per_text(self, matrix):
+        assert matrix.n_rows == len(TEXTS)
+
+    def test_empty_text_has_no_entries(self, matrix):
+        assert matrix.indptr[1] - matrix.indptr[0] == 0
+
+    def test_empty_batch(self, scorer):
+        empty = scorer.index([])
+        assert scorer.scores(empty).shape == (0, len(scorer.rule_names))
+
+    def test_save_load_roundtrip(self, matrix, tmp_path):
+        path = os.path.join(tmp_path, "matrix.npz")
+        matrix.save(path)
+        loaded = OccurrenceMatrix.load(path)
+        assert np.array_equal(loaded.indptr, matrix.indptr)
+        assert np.array_equal(loaded.indices, matrix.indices)
+        assert loaded.n_features == matrix.n_features
+
+
+# === Scoring ===
+
+
+class TestScores:
+    """Tests that vectorised scores match per-transcript RuleSet scoring."""
+
+    def test_scores_match_ruleset(self, scorer, matrix):
+        scores = scorer.scores(matrix)
+        for i, text in enumerate(TEXTS):
+            expected = DEFAULT_RULESET.scores(text)
+            assert dict(zip(scorer.rule_names, scores[i].tolist())) == expected
+
+    def test_custom_weights_rescore_without_rescan(self, scorer, matrix):
+        doubled = scorer.scores(matrix, weights=scorer.weights * 2)
+        assert np.array_equal(doubled, scorer.scores(matrix) * 2)
+
+
+# === Decisions ===
+
+
+class TestDecide:
+    """Tests for vectorised threshold and escalation decisions."""
+
+    def test_decisions_match_pipeline(self, scorer, matrix):
+        decisions = scorer.decide(scorer.scores(matrix))
+        engine = escalationEngine()
+        for i, text in enumerate(TEXTS):
+            expected = engine.evaluate_escalation(DEFAULT_RULESET.apply(text))
+            assert bool(decisions["escalate"][i]) == expected["escalation_needed"]
+            assert decisions["risk_level"][i] == expected["risk_level"]
+
+    def test_raised_thresholds_suppress_escalation(self, scorer, matrix):
+        decisions = scorer.decide(scorer.scores(matrix), thresholds=scorer.thresholds + 100)
+        assert not decisions["escalate"].any()
+        assert set(decisions["risk_level"].tolist()) == {"LOW"}
+
+    def test_per_rule_thresholds_and_weights(self):
+        rules = RuleSet({"ANGRY": ([("fed up", 5)], [])}, {"PAY": (["pay now"], [])},
+                        thresholds={"ANGRY": 6})
+        scorer = BatchScorer(rules)
+        texts = ["fed up", "pay now"]
+        decisions = scorer.decide(scorer.scores(scorer.index(texts)))
+        assert scorer.thresholds.tolist() == [6, 2]
+        for i, text in enumerate(texts):
+            fired = [rc.get_code() for rc in rules.apply(text)]
+            assert [n for n, f in zip(scorer.rule_names, decisions["fired"][i]) if f] == fired
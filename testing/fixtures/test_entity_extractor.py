@@ -2,9 +2,12 @@
 Unit tests for entityExtractor.
 """
 
+import pickle
+
 import pytest
+from Data_Classes.entities import Entities
 from Data_Classes.transcript import transcript as Transcript
-from engines.entityExtractor import entityExtractor
+from engines.entityExtractor import entityExtractor, normalize_date, _digit_windows
 
 
 def make_transcript(raw_text: str) -> Transcript:
@@ -212,3 +215,346 @@ class TestExtractAllEntities:
         assert "01/15/2024" in entities.get_dates()
         assert "555-123-4567" in entities.get_phones()
         assert "0001234" in entities.get_loan_numbers()
+
+
+# === Fused Scan ===
+
+
+def per_family(extractor, text):
+    """Reference output: one finditer pass per pattern, as the per-family methods do."""
+    pairs = extractor.extract_amounts_with_context(text)
+    return ([v for v, _ in pairs], [ctx for _, ctx in pairs], extractor.extract_dates(text),
+            extractor.extract_phones(text), extractor.extract_loan_numbers(text))
+
+
+class TestFusedScan:
+    """Tests that the single-scan extractor matches the per-pattern passes."""
+
+    @pytest.mark.parametrize("text", [
+        "",
+        "no numbers here at all",
+        "jan 5, 2023 and 5 jan 2023 and march 3rd",
+        "call +1 (555) 123-4567 or 1-800-555-0199 about account number 5551234567",
+        "us$1,200 or c$300 or cad 5k, usd 2 million, 40 dollars",
+        "the mortgage amount is 850 and the purchase price: 300 for loan amount 1200",
+        "$5,000 due 01/15/2024, call 555-123-4567, loan # 0001234",
+        "reference no. 12345678 and file # 998877 and loan number 12345678",
+        "a$5 is not money, but ($5) is; 2024-01-15 and 2024/1/15",
+    ])
+    def test_matches_per_family_extraction(self, extractor, text):
+        entities = extractor.extract_all_entities(make_transcript(text))
+        normalized = " ".join(text.lower().split())
+        assert (entities.get_amounts(), entities.get_amount_contexts(), entities.get_dates(),
+                entities.get_phones(), entities.get_loan_numbers()) == per_family(extractor, normalized)
+
+    def test_overlapping_patterns_still_reported(self, extractor):
+        """Families scan independently, so overlapping hits survive as before."""
+        entities = extractor.extract_all_entities(make_transcript("due jan 5, 2023"))
+        assert entities.get_dates() == ["jan 5, 2023", "jan 5"]
+
+
+# === Digit Windows ===
+
+
+class TestDigitWindows:
+    """Tests for the digit-window prefilter."""
+
+    def test_no_digits_no_windows(self):
+        assert _digit_windows("no numbers here, is there? none at all!") == []
+
+    def test_window_stops_at_break_characters(self):
+        text = "hi? your payment is $2,450.00! thanks"
+        assert [text[s:e] for s, e in _digit_windows(text)] == [" your payment is $2,450.00"]
+
+    def test_one_window_per_break_run(self):
+        text = "call 555-123-4567; i'm on jan 5, 2023"
+        assert [text[s:e] for s, e in _digit_windows(text)] == ["call 555-123-4567", "m on jan 5, 2023"]
+
+    def test_numberless_transcript_has_no_entities(self, extractor):
+        entities = extractor.extract_all_entities(make_transcript("I just want to talk to someone, please."))
+        assert (entities.get_amounts(), entities.get_dates(), entities.get_phones(),
+                entities.get_loan_numbers()) == ([], [], [], [])
+
+    @pytest.mark.parametrize("text", [
+        "it's $5! or is it (555) 123-4567? 'jan 5, 2023'",
+        "loan #: 12345678; account number is 87654321",
+        "ln-123456 and LN-123456",
+    ])
+    def test_windowed_families_match_full_text_finditer(self, extractor, text):
+        from engines.entityExtractor import _DATE_RES, _PHONE_RE
+        assert extractor.extract_dates(text) == [m.group(0) for p in _DATE_RES for m in p.finditer(text)]
+        assert extractor.extract_phones(text) == [m.group(0) for m in _PHONE_RE.finditer(text)]
+
+
+class TestAmountCache:
+    """Tests for the memoized amount normalization."""
+
+    def test_repeated_amount_hits_cache(self):
+        extractor = entityExtractor()
+        extractor.extract_amounts("you owe $1,200 today")
+        extractor.extract_amounts("yes, $1,200 is right")
+        info = extractor.amount_cache_info()
+        assert info["misses"] == 1
+        assert info["hits"] == 1
+        assert info["currsize"] == 1
+
+    def test_disabled_cache_gives_same_amounts(self):
+        text = "$1,200.50 then 5k, then 1.5 million and 300 dollars"
+        assert entityExtractor(amount_cache_size=0).extract_amounts(text) == \
+            entityExtractor().extract_amounts(text)
+
+    def test_cache_is_bounded(self):
+        extractor = entityExtractor(amount_cache_size=2)
+        extractor.extract_amounts("$1 $2 $3 $4")
+        assert extractor.amount_cache_info()["currsize"] == 2
+
+    def test_clear_amount_cache(self):
+        extractor = entityExtractor()
+        extractor.extract_amounts("$1,200")
+        extractor.clear_amount_cache()
+        assert extractor.amount_cache_info()["currsize"] == 0
+
+    def test_instances_do_not_share_cache(self):
+        first, second = entityExtractor(), entityExtractor()
+        first.extract_amounts("$1,200")
+        assert second.amount_cache_info()["currsize"] == 0
+
+
+# === Lazy Amount Contexts ===
+
+
+class TestAmountContextSpans:
+    """Tests for offset-based amount contexts."""
+
+    TEXT = ("the escrow shortage is $1,200 and the new monthly payment is $2,450.00 "
+            + "filler words " * 20 + "and the late fee was $45 last month")
+
+    def test_entities_store_spans_not_strings(self, extractor):
+        entities = extractor.extract_all_entities(make_transcript(self.TEXT))
+        assert entities._amount_contexts is None
+        assert len(entities.get_amount_spans()) == len(entities.get_amounts()) == 3
+
+    def test_contexts_match_eager_snippets(self, extractor):
+        entities = extractor.extract_all_entities(make_transcript(self.TEXT))
+        assert entities.get_amount_contexts() == [ctx for _, ctx in extractor.extract_amounts_with_context(self.TEXT)]
+
+    def test_pickle_ships_excerpt_with_same_contexts(self, extractor):
+        entities = extractor.extract_all_entities(make_transcript(self.TEXT))
+        restored = pickle.loads(pickle.dumps(entities))
+        assert restored.get_amount_contexts() == entities.get_amount_contexts()
+        # Overlapping windows share characters, and the filler is dropped
+        assert len(restored._source_text) < len(self.TEXT)
+
+    def test_to_json_materialises_contexts(self, extractor):
+        entities = extractor.extract_all_entities(make_transcript("you owe $1,200 today"))
+        assert entities.to_json()["_amount_contexts"] == ["you owe $1,200 today"]
+
+    def test_string_contexts_still_accepted(self):
+        entities = Entities([1200], [], [], [], amount_contexts=["escrow $1,200"])
+        assert entities.get_amount_spans() is None
+        assert pickle.loads(pickle.dumps(entities)).get_amount_contexts() == ["escrow $1,200"]
+
+
+# === Lazy Entities ===
+
+
+class TestLazyEntities:
+    """Tests for per-family extraction on first access."""
+
+    TEXT = "you owe $1,200 by 01/15/2024, call 555-123-4567 about loan # 0001234"
+
+    def test_nothing_extracted_until_read(self, extractor):
+        entities = extractor.extract_entities_lazy(make_transcript(self.TEXT))
+        assert not entities.is_materialized()
+        assert entities._amounts is None and entities._dates is None
+
+    def test_reading_amounts_skips_other_families(self, extractor):
+        entities = extractor.extract_entities_lazy(make_transcript(self.TEXT))
+        assert entities.get_amounts() == [1200]
+        assert entities.get_amount_contexts() == ["you owe $1,200 by 01/15/2024, call 555-123-4567 about"]
+        assert (entities._dates, entities._phones, entities._loan_numbers) == (None, None, None)
+
+    def test_materialize_matches_eager_extraction(self, extractor):
+        transcript = make_transcript(self.TEXT)
+        entities = extractor.extract_entities_lazy(transcript).materialize()
+        assert entities.is_materialized()
+        assert entities.to_json() == extractor.extract_all_entities(transcript).to_json()
+
+    def test_pickle_materializes_and_drops_extractor(self, extractor):
+        transcript = make_transcript(self.TEXT)
+        restored = pickle.loads(pickle.dumps(extractor.extract_entities_lazy(transcript)))
+        assert restored._extractor is None
+        assert restored.to_json() == extractor.extract_all_entities(transcript).to_json()
+
+
+# === Streaming Extraction ===
+
+
+def entity_fields(entities):
+    return (entities.get_amounts(), entities.get_amount_contexts(), entities.get_dates(),
+            entities.get_iso_dates(), entities.get_phones(), entities.get_loan_numbers())
+
+
+def chunked(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+class TestStreamingExtraction:
+    """Tests for chunked extraction with an overlap window."""
+
+    TEXT = ("the escrow shortage is $1,200 and my payment went up to $2,450.00 "
+            "on 01/15/2024, call me at 555-123-4567, loan # 0001234, "
+            "again that is $1,200 and loan number 0001234, "
+            "and the purchase price: 300 on jan 5, 2023")
+
+    def test_single_chunk_matches_extract_all_entities(self, extractor):
+        eager = extractor.extract_all_entities(make_transcript(self.TEXT))
+        assert extractor.extract_all_entities_streaming([self.TEXT]).to_json() == eager.to_json()
+
+    @pytest.mark.parametrize("size", [1, 7, 33, 100])
+    def test_boundaries_neither_lose_nor_repeat_matches(self, extractor, size):
+        eager = extractor.extract_all_entities(make_transcript(self.TEXT))
+        streamed = extractor.extract_all_entities_streaming(chunked(self.TEXT, size), overlap=120)
+        assert entity_fields(streamed) == entity_fields(eager)
+        assert streamed.get_loan_numbers() == ["0001234"]
+
+    # Longer than the overlap, so it is scanned over several rounds; "$1,200"
+    # recurs after the bare "price: 300" and a lowercase "ln-" must not count
+    RAW = ("Caller: my loan is LN-20250001.\n\nThe   purchase price: 300, and Jan 5, 2023.  "
+           + "Filler words here. " * 12
+           + "Agent: I see $1,200 on 02/01/2023 and ln-99998888, call (555) 123-4567.\n"
+           + "More filler. " * 12
+           + "Caller: again $1,200, LN-20250002 and loan number 12345678 by 03/04/2024.")
+
+    @pytest.mark.parametrize("size", [1, 13, 64, 500])
+    def test_multi_chunk_raw_transcript_matches_extract_all_entities(self, extractor, size):
+        from engines.transcriptParser import transcriptParser
+        eager = extractor.extract_all_entities(transcriptParser().parse_transcript(self.RAW))
+        streamed = extractor.extract_all_entities_streaming(chunked(self.RAW, size), overlap=120)
+        assert entity_fields(streamed) == entity_fields(eager)
+        assert streamed.get_loan_numbers() == ["LN-20250001", "LN-20250002", "12345678"]
+        assert streamed.get_amounts()[:2] == [1200, 300000]
+
+    def test_iter_entities_yields_in_stream_order(self, extractor):
+        found = [(f, v) for f, v, _ in extractor.iter_entities(chunked(self.RAW, 50), overlap=120)]
+        assert ("loan_number", "LN-20250001") in found
+        assert ("loan_number", "ln-99998888") not in found
+        # The bare amount completes in an earlier round than the repeated "$1,200"
+        assert found.index(("amount", 300000)) < found.index(("amount", 1200))
+
+    def test_yields_before_stream_ends(self, extractor):
+        def endless():
+            yield "you owe $1,200 today. "
+            while True:
+                yield "nothing to see here. "
+
+        family, value, context = next(extractor.iter_entities(endless()))
+        assert (family, value) == ("amount", 1200)
+        assert context.startswith("you owe $1,200 today. nothing to see here.")
+
+    def test_duplicates_across_chunks_reported_once(self, extractor):
+        chunks = ["the fee is $45. "] + ["filler text. " * 10] * 20 + ["the fee is $45."]
+        assert [v for f, v, _ in extractor.iter_entities(chunks) if f == "amount"] == [45]
+
+    def test_overlap_must_cover_context(self, extractor):
+        with pytest.raises(ValueError):
+            list(extractor.iter_entities(["$5"], overlap=80))
+
+
+# === ISO Dates ===
+
+
+class TestNormalizeDate:
+    """Tests for ISO date normalisation."""
+
+    @pytest.mark.parametrize("raw,iso", [
+        ("01/15/2024", "2024-01-15"),
+        ("1-5-23", "2023-01-05"),
+        ("12/31/99", "1999-12-31"),
+        ("jan 5, 2023", "2023-01-05"),
+        ("september 19, 2018", "2018-09-19"),
+        ("5 jan 2023", "2023-01-05"),
+        ("15 march, 2024", "2024-03-15"),
+        ("january 15", "--01-15"),
+        ("sept. 3", "--09-03"),
+        ("2/29/2024", "2024-02-29"),
+    ])
+    def test_formats(self, raw, iso):
+        assert normalize_date(raw) == iso
+
+    @pytest.mark.parametrize("raw", ["75 margin", "13/45/2020", "2/29/2023", "1/2/202", "2024-01-15-3"])
+    def test_not_a_date(self, raw):
+        assert normalize_date(raw) is None
+
+    def test_entities_carry_iso_dates(self, extractor):
+        entities = extractor.extract_all_entities(make_transcript("due jan 5, 2023 or by 02/01/2023"))
+        assert entities.get_dates() == ["02/01/2023", "jan 5, 2023", "jan 5"]
+        assert entities.get_iso_dates() == ["2023-02-01", "2023-01-05", "--01-05"]
+        assert entities.to_json()["_iso_dates"] == entities.get_iso_dates()
+
+    def test_lazy_and_streaming_agree(self, extractor):
+        text = "due jan 5, 2023 or by 02/01/2023"
+        eager = extractor.extract_all_entities(make_transcript(text)).get_iso_dates()
+        assert extractor.extract_entities_lazy(make_transcript(text)).get_iso_dates() == eager
+        assert extractor.extract_all_entities_streaming([text]).get_iso_dates() == eager
+        assert extractor.extract_dates_iso(text) == list(zip(extractor.extract_dates(text), eager))
+
+
+# === Raw-Text Confirmation ===
+
+
+class TestCaseSensitiveLoanNumbers:
+    """Tests for "LN-" loan numbers, matched on normalised text and confirmed in the raw text."""
+
+    def test_uppercase_ln_found_with_raw_case(self, extractor):
+        entities = extractor.extract_all_entities(make_transcript("Your loan is  LN-20250001, ok?"))
+        assert entities.get_loan_numbers() == ["LN-20250001"]
+
+    def test_lowercase_ln_still_rejected(self, extractor):
+        entities = extractor.extract_all_entities(make_transcript("your loan is ln-20250001"))
+        assert entities.get_loan_numbers() == []
+
+    def test_lazy_entities_agree(self, extractor):
+        transcript = make_transcript("LN-20250001 and loan number 12345678")
+        assert extractor.extract_entities_lazy(transcript).get_loan_numbers() == \
+            extractor.extract_all_entities(transcript).get_loan_numbers() == ["LN-20250001", "12345678"]
+
+
+# === Redaction ===
+
+
+def parsed(raw_text):
+    from engines.transcriptParser import transcriptParser
+    return transcriptParser().parse_transcript(raw_text)
+
+
+class TestRedaction:
+    """Tests for redaction from the extraction scan."""
+
+    RAW = ("Agent:  Your balance is $1,200.00 and\n\nthe fee is $1,200.00 again.\n"
+           "Caller: Call me at (555) 123-4567, loan number 12345678, or LN-20250001 on Jan 5, 2023.")
+
+    def test_raw_text_redacted_every_occurrence(self, extractor):
+        entities, redacted = extractor.extract_and_redact(parsed(self.RAW))
+        assert redacted == ("Agent:  Your balance is [AMOUNT] and\n\nthe fee is [AMOUNT] again.\n"
+                            "Caller: Call me at [PHONE], loan number [LOAN_NUMBER], or [LOAN_NUMBER] on Jan 5, 2023.")
+        assert entities.get_amounts() == [1200]
+
+    def test_entities_match_extract_all_entities(self, extractor):
+        transcript = parsed(self.RAW)
+        entities, _ = extractor.extract_and_redact(transcript)
+        assert entities.to_json() == extractor.extract_all_entities(transcript).to_json()
+
+    def test_normalized_text_redaction(self, extractor):
+        redacted = extractor.redact(parsed("Pay $50 to 555-123-4567"), normalized=True)
+        assert redacted == "pay [AMOUNT] to [PHONE]"
+
+    def test_bare_amount_keeps_its_keyword(self, extractor):
+        assert extractor.redact(parsed("The purchase price: 300 total")) == "The purchase price: [AMOUNT] total"
+
+    def test_overlapping_matches_redacted_once(self, extractor):
+        # The account number is also phone-shaped
+        assert extractor.redact(parsed("account number 5551234567")) == "account number [LOAN_NUMBER]"
+
+    def test_nothing_to_redact(self, extractor):
+        assert extractor.redact(parsed("  Hello   there ")) == "  Hello   there "
@@ -0,0 +1,57 @@
+"""
+Unit tests for LoanIndex.
+"""
+
+import pytest
+from Data_Classes.entities import Entities
+from Data_Classes.triageResult import triageResult as TriageResult
+from engines.loanIndex import LoanIndex
+
+
+def make_result(loan_numbers, escalate=False, risk_level="low"):
+    entities = Entities([], [], [], loan_numbers)
+    return TriageResult("payment", escalate, risk_level, [], entities, [])
+
+
+@pytest.fixture
+def index():
+    return LoanIndex().add_all([
+        make_result(["111"], escalate=True, risk_level="high"),
+        make_result(["222"]),
+        make_result(["111", "333"]),
+        make_result([]),
+        make_result(["111"], escalate=True, risk_level="medium"),
+    ], ["a.txt", "b.txt", "c.txt", "d.txt", "e.txt"])
+
+
+class TestLoanIndex:
+    """Tests for the loan number -> transcripts index."""
+
+    def test_counts(self, index):
+        assert len(index) == 3
+        assert "111" in index and "999" not in index
+        assert index.to_json()["transcripts"] == 5
+
+    def test_transcripts_in_arrival_order(self, index):
+        assert index.get_transcripts("111") == ["a.txt", "c.txt", "e.txt"]
+        assert index.get_transcripts("999") == []
+
+    def test_repeat_callers(self, index):
+        assert index.repeat_callers() == {"111": ["a.txt", "c.txt", "e.txt"]}
+        assert set(index.repeat_callers(min_calls=1)) == {"111", "222", "333"}
+
+    def test_history(self, index):
+        assert index.history("111") == [
+            {"transcript": "a.txt", "escalate": True, "risk_level": "high"},
+            {"transcript": "c.txt", "escalate": False, "risk_level": "low"},
+            {"transcript": "e.txt", "escalate": True, "risk_level": "medium"},
+        ]
+
+    def test_multi_escalated(self, index):
+        assert index.multi_escalated() == {"111": ["a.txt", "e.txt"]}
+        assert index.multi_escalated(min_escalations=3) == {}
+
+    def test_default_ids_continue_across_calls(self):
+        index = LoanIndex().add_all([make_result(["111"])])
+        index.add_all([make_result(["111"])])
+        assert index.get_transcripts("111") == [0, 1]
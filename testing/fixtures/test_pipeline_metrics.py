@@ -0,0 +1,87 @@
+"""
+Unit tests for pipelineMetrics.
+"""
+
+import pickle
+
+import pytest
+from Data_Classes.reasonCode import reasonCode
+from engines.pipelineMetrics import PipelineMetrics, STAGES, BUCKET_BOUNDS_MS, untimed
+
+
+@pytest.fixture
+def metrics():
+    return PipelineMetrics()
+
+
+# === Recording ===
+
+
+class TestRecording:
+    """Tests for stage timing and rule hit recording."""
+
+    def test_new_metrics_are_empty(self, metrics):
+        assert metrics.get_transcripts() == 0
+        assert metrics.get_rule_hits() == {}
+        assert all(sum(metrics.get_histogram(stage)) == 0 for stage in STAGES)
+
+    def test_timed_returns_result_and_records(self, metrics):
+        assert metrics.timed("classify", max, 1, 3) == 3
+        assert sum(metrics.get_histogram("classify")) == 1
+        assert metrics.to_json()["stages"]["classify"]["count"] == 1
+
+    def test_untimed_returns_result(self):
+        assert untimed("classify", max, 1, 3) == 3
+
+    @pytest.mark.parametrize("elapsed_ms,bucket", [
+        (0.0, 0),
+        (0.01, 0),
+        (0.02, 1),
+        (3.0, 8),
+        (100, len(BUCKET_BOUNDS_MS) - 1),
+        (1000, len(BUCKET_BOUNDS_MS)),
+    ])
+    def test_record_bucket(self, metrics, elapsed_ms, bucket):
+        metrics.record("apply_rules", elapsed_ms)
+        assert metrics.get_histogram("apply_rules")[bucket] == 1
+
+    def test_mean_ms(self, metrics):
+        metrics.record("apply_rules", 1.0)
+        metrics.record("apply_rules", 3.0)
+        assert metrics.get_mean_ms("apply_rules") == 2.0
+        assert metrics.get_mean_ms("classify") == 0.0
+
+    def test_count_rules(self, metrics):
+        metrics.count_rules([reasonCode("LEGAL_THREAT", True, 2), reasonCode("PAYMENT_INTENT", True, 2)])
+        metrics.count_rules([reasonCode("LEGAL_THREAT", True, 4)])
+        metrics.count_rules([])
+        assert metrics.get_transcripts() == 3
+        assert metrics.get_rule_hits() == {"LEGAL_THREAT": 2, "PAYMENT_INTENT": 1}
+
+    def test_reset(self, metrics):
+        metrics.record("classify", 1.0)
+        metrics.count_rules([reasonCode("LEGAL_THREAT", True, 2)])
+        metrics.reset()
+        assert metrics.to_json() == PipelineMetrics().to_json()
+
+
+# === Merging ===
+
+
+class TestMerge:
+    """Tests for merging worker metrics into a parent."""
+
+    def test_merge_adds_counts(self, metrics):
+        worker = PipelineMetrics()
+        worker.record("classify", 0.2)
+        worker.count_rules([reasonCode("LEGAL_THREAT", True, 2)])
+        metrics.record("classify", 0.2)
+        metrics.count_rules([reasonCode("LEGAL_THREAT", True, 2)])
+        metrics.merge(worker)
+        assert metrics.get_transcripts() == 2
+        assert metrics.get_rule_hits() == {"LEGAL_THREAT": 2}
+        assert sum(metrics.get_histogram("classify")) == 2
+
+    def test_survives_pickling(self, metrics):
+        metrics.record("generate_bullets", 0.5)
+        assert pickle.loads(pickle.dumps(metrics)).to_json() == metrics.to_json()
@@ -0,0 +1,133 @@
+"""
+Unit tests for ruleCoverage.
+"""
+
+import pytest
+from engines.ruleCoverage import RuleCoverage
+from engines.ruleEngine import RuleSet, DEFAULT_RULESET
+
+
+RULES = RuleSet(
+    {"ANGRY": (["fed up", "so fed up", "had enough"], ["mad"])},
+    {"PAY": (["pay now", "pay online"], [])},
+)
+
+TEXTS = [
+    "i am so fed up",
+    "i am fed up and mad",
+    "let me pay now",
+    "nothing to see here",
+]
+
+
+@pytest.fixture
+def coverage():
+    return RuleCoverage(RULES).index(TEXTS)
+
+
+def feature_counts(coverage):
+    return {f"{kind}:{phrase}": n for kind, phrase, n in coverage.phrase_hits()}
+
+
+# === Phrase Coverage ===
+
+
+class TestPhraseCoverage:
+    """Tests for per-phrase hit counts and dead phrases."""
+
+    def test_counts_transcripts_per_phrase(self, coverage):
+        assert feature_counts(coverage) == {
+            "keyword:fed up": 2, "keyword:had enough": 0, "keyword:pay now": 1,
+            "keyword:pay online": 0, "keyword:so fed up": 1, "single_word:mad": 1,
+        }
+
+    def test_dead_phrases(self, coverage):
+        assert coverage.dead_phrases() == [("keyword", "had enough"), ("keyword", "pay online")]
+
+    def test_index_is_incremental(self, coverage):
+        coverage.index(["had enough"])
+        assert coverage.n_docs == len(TEXTS) + 1
+        assert ("keyword", "had enough") not in coverage.dead_phrases()
+
+    def test_counts_match_feature_hits_on_default_rules(self):
+        texts = ["i lost my job and need a payment plan", "i will take legal action", ""]
+        coverage = RuleCoverage().index(texts)
+        expected = [0] * len(coverage.features)
+        for text in texts:
+            for fid in DEFAULT_RULESET.feature_hits(text):
+                expected[fid] += 1
+        assert [n for _, _, n in coverage.phrase_hits()] == expected
+
+
+# === Redundancy ===
+
+
+class TestRedundantPhrases:
+    """Tests for phrases always covered by another phrase of the same rule."""
+
+    def test_contained_phrase_reported(self, coverage):
+        redundant = coverage.redundant_phrases()
+        assert ("ANGRY", "keyword", "so fed up", "keyword:fed up") in redundant
+        assert ("ANGRY", "single_word", "mad", "keyword:fed up") in redundant
+
+    def test_phrase_firing_alone_not_reported(self, coverage):
+        phrases = {phrase for _, _, phrase, _ in coverage.redundant_phrases()}
+        assert "fed up" not in phrases
+        assert "pay now" not in phrases
+
+    def test_identical_postings_report_only_one(self):
+        rules = RuleSet({"A": (["x y", "y z"], [])}, {})
+        coverage = RuleCoverage(rules).index(["x y z"])
+        assert coverage.redundant_phrases() == [("A", "keyword", "y z", "keyword:x y")]
+
+    def test_lighter_phrase_does_not_cover(self):
+        rules = RuleSet({"A": (["x y", ("y z", 3)], [])}, {})
+        coverage = RuleCoverage(rules).index(["x y z"])
+        assert coverage.redundant_phrases() == [("A", "keyword", "x y", "keyword:y z")]
+
+    def test_phrase_needed_for_threshold_not_reported(self):
+        rules = RuleSet({"A": (["x y", "y z"], [])}, {}, threshold=4)
+        coverage = RuleCoverage(rules).index(["x y z"])
+        assert coverage.redundant_phrases() == []
+
+    def test_dropping_all_reported_keeps_decisions(self):
+        rules = RuleSet({"A": (["x y", "y z", "z w"], [])}, {}, threshold=4)
+        coverage = RuleCoverage(rules).index(["x y z w", "x y z", "nothing"])
+        redundant = coverage.redundant_phrases()
+        assert redundant == [("A", "keyword", "z w", "keyword:x y")]
+
+        dropped = {phrase for _, _, phrase, _ in redundant}
+        pruned = RuleSet({"A": ([p for p in ["x y", "y z", "z w"] if p not in dropped], [])}, {}, threshold=4)
+        texts = ["x y z w", "x y z", "nothing"]
+        assert RuleCoverage(pruned).index(texts).fired() == coverage.fired()
+
+    def test_other_rules_do_not_cover(self):
+        rules = RuleSet({"A": (["fed up"], [])}, {"B": (["fed up now"], [])})
+        coverage = RuleCoverage(rules).index(["fed up now"])
+        assert coverage.redundant_phrases() == []
+
+
+# === Precision ===
+
+
+class TestRulePrecision:
+    """Tests for per-rule precision against escalation labels."""
+
+    def test_fired_matches_ruleset(self, coverage):
+        assert coverage.fired() == [{rc.get_code() for rc in RULES.apply(t)} for t in TEXTS]
+
+    def test_precision(self, coverage):
+        report = coverage.rule_precision([True, False, False, False])
+        assert report == {"ANGRY": {"fired": 2, "true_positives": 1, "precision": 0.5}}
+
+    def test_never_fired_precision_is_none(self):
+        coverage = RuleCoverage(RULES).index(["nothing"])
+        assert coverage.rule_precision([True])["ANGRY"]["precision"] is None
+
+    def test_label_count_mismatch_raises_value_error(self, coverage):
+        with pytest.raises(ValueError):
+            coverage.rule_precision([True])
+
+    def test_report_includes_precision_only_with_labels(self, coverage):
+        assert "rule_precision" not in coverage.report()
+        assert coverage.report([True] * len(TEXTS))["rule_precision"]["ANGRY"]["precision"] == 1.0
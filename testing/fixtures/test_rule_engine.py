@@ -2,9 +2,15 @@
 Unit tests for ruleEngine.
 """
 
+import json
+import os
+import pickle
+
 import pytest
 from Data_Classes.transcript import transcript as Transcript
-from engines.ruleEngine import ruleEngine
+from engines.transcriptParser import build_token_index
+import engines.ruleEngine as rule_engine_module
+from engines.ruleEngine import ruleEngine, RuleSet, DEFAULT_RULESET, load_rule_pack, _ESCALATION_RULES, _NORMAL_RULES
 
 
 def make_transcript(raw_text: str) -> Transcript:
@@ -202,3 +208,413 @@ class TestCaseInsensitivity:
     def test_mixed_case_matches(self):
         codes = to_code_map(run_rules("I Lost My Job"))
         assert "HARDSHIP_LANGUAGE" in codes
+
+
+# === Single-Pass Matcher ===
+
+
+def naive_scores(text: str) -> dict:
+    """Reference scoring: one containment check per keyword, whole tokens for single words."""
+    rules = {**_ESCALATION_RULES, **_NORMAL_RULES}
+    tokens = build_token_index(text)
+    return {
+        name: sum(2 for kw in kws if kw in text) + sum(1 for w in words if w in tokens)
+        for name, (kws, words) in rules.items()
+    }
+
+
+class TestPhraseMatcher:
+    """Tests that the compiled matcher scores exactly like per-phrase checks."""
+
+    @pytest.mark.parametrize("text", [
+        "",
+        "i will take legal action",
+        "my attorney general said so",
+        "escrow account and escrow shortage and tax escrow",
+        "what's my balance on the payment plan",
+        "refinancing versus refinance",
+        "the reinsurance management team",
+        "you're an idiot. this is ridiculous and useless",
+    ])
+    def test_scores_match_naive_containment(self, text):
+        assert DEFAULT_RULESET.scores(text) == naive_scores(text)
+
+    def test_partially_overlapping_phrases_both_found(self):
+        """'my attorney' and 'attorney general' overlap without nesting."""
+        scores = DEFAULT_RULESET.scores("my attorney general")
+        assert scores["BANKRUPTCY_OR_LAWYER"] == 3
+        assert scores["LEGAL_THREAT"] == 2
+
+
+# === Compiled RuleSet ===
+
+
+class TestRuleSet:
+    """Tests for the reusable compiled RuleSet."""
+
+    def test_apply_matches_rule_engine(self):
+        text = "i lost my job and want to make a payment"
+        expected = [(rc.get_code(), rc.get_is_escalation(), rc.get_score()) for rc in run_rules(text)]
+        actual = [(rc.get_code(), rc.get_is_escalation(), rc.get_score()) for rc in DEFAULT_RULESET.apply(text)]
+        assert actual == expected
+
+    def test_apply_many_preserves_order(self):
+        results = DEFAULT_RULESET.apply_many(["i lost my job", "", "make a payment"])
+        assert [[rc.get_code() for rc in codes] for codes in results] == [
+            ["HARDSHIP_LANGUAGE"], [], ["PAYMENT_INTENT"]]
+
+    def test_is_immutable(self):
+        with pytest.raises(AttributeError):
+            DEFAULT_RULESET._threshold = 0
+
+    def test_custom_rules_and_threshold(self):
+        rules = RuleSet({"CUSTOM": (["hello there"], [])}, {}, threshold=2)
+        codes = to_code_map(rules.apply("well hello there"))
+        assert codes["CUSTOM"].get_score() == 2
+        assert codes["CUSTOM"].get_is_escalation() is True
+
+    def test_rule_engine_accepts_shared_ruleset(self):
+        rules = RuleSet({}, {"GREETING": (["hello"], [])})
+        codes = ruleEngine(make_transcript("Hello"), rules).apply_rules()
+        assert [rc.get_code() for rc in codes] == ["GREETING"]
+
+
+# === Match Spans ===
+
+
+class TestMatchSpans:
+    """Tests for matched phrase offsets recorded on reason codes."""
+
+    def test_spans_point_at_matched_phrases(self):
+        text = "i want to take legal action and talk to my lawyer"
+        codes = to_code_map(DEFAULT_RULESET.apply(text))
+        phrases = {text[s:e] for s, e in codes["LEGAL_THREAT"].get_spans()}
+        assert phrases == {"take legal action", "legal action"}
+
+    def test_one_span_per_matched_phrase(self):
+        text = "lost my job. lost my job."
+        codes = to_code_map(DEFAULT_RULESET.apply(text))
+        assert codes["HARDSHIP_LANGUAGE"].get_spans() == [(0, 11)]
+
+    def test_spans_in_json(self):
+        text = "pay online"
+        rc = DEFAULT_RULESET.apply(text)[0]
+        assert rc.to_json()["_spans"] == [[0, 10]]
+
+    def test_default_spans_empty(self):
+        from Data_Classes.reasonCode import reasonCode
+        assert reasonCode("X", False, 0).get_spans() == []
+
+
+# === Word Boundaries ===
+
+
+class TestSingleWordBoundaries:
+    """Tests for whole-token matching of single_words entries."""
+
+    def test_single_word_inside_longer_word_ignored(self):
+        scores = DEFAULT_RULESET.scores("the management team reviewed the imbalance")
+        assert scores["SUPERVISOR_REQUEST"] == 0
+        assert scores["PAYMENT_INTENT"] == 0
+
+    def test_single_word_next_to_punctuation_matches(self):
+        scores = DEFAULT_RULESET.scores("get me your manager, now. what about the balance?")
+        assert scores["SUPERVISOR_REQUEST"] == 1
+        assert scores["PAYMENT_INTENT"] == 1
+
+    def test_keywords_keep_substring_semantics(self):
+        """Keyword phrases are unaffected — 'insurance' still counts in 'reinsurance'."""
+        assert DEFAULT_RULESET.scores("reinsurance")["ESCROW_QUESTION"] == 2
+
+    def test_curly_apostrophes_match_ascii_phrases(self):
+        from engines.transcriptParser import transcriptParser
+        transcript = transcriptParser().parse_transcript("Caller: I don\u2019t owe this. I can\u2019t pay.")
+        codes = to_code_map(ruleEngine(transcript).apply_rules())
+        assert codes["DISPUTE_FEE_OR_CHARGE"].get_score() == 2
+        assert codes["HARDSHIP_LANGUAGE"].get_score() == 2
+
+    def test_plural_matches_single_word(self):
+        """Regression: "you idiots" must still fire ABUSIVE_LANGUAGE's "idiot"."""
+        codes = to_code_map(run_rules("Caller: you idiots are useless"))
+        assert codes["ABUSIVE_LANGUAGE"].get_score() == 2
+        assert DEFAULT_RULESET.scores("talk to your managers and lawyers")["SUPERVISOR_REQUEST"] == 1
+
+    def test_plural_span_covers_whole_token(self):
+        text = "you idiots are stupid"
+        rc = to_code_map(DEFAULT_RULESET.apply(text))["ABUSIVE_LANGUAGE"]
+        assert {text[s:e] for s, e in rc.get_spans()} == {"idiots", "stupid"}
+
+    def test_singular_and_plural_count_once(self):
+        assert DEFAULT_RULESET.scores("idiot idiots")["ABUSIVE_LANGUAGE"] == 1
+
+    def test_first_escalation_matches_plural(self):
+        trigger = DEFAULT_RULESET.first_escalation("you idiots are stupid")
+        assert trigger is not None and trigger.get_code() == "ABUSIVE_LANGUAGE"
+
+    def test_rule_engine_uses_parser_token_index(self):
+        from engines.transcriptParser import transcriptParser
+        transcript = transcriptParser().parse_transcript("Supervisor, please. Manager!")
+        codes = to_code_map(ruleEngine(transcript).apply_rules())
+        assert codes["SUPERVISOR_REQUEST"].get_score() == 2
+
+
+# === Rule Packs ===
+
+
+def write_pack(path, escalation_rules, normal_rules=None, threshold=2, version="1"):
+    pack = {
+        "format_version": 1,
+        "name": "test",
+        "version": version,
+        "threshold": threshold,
+        "escalation_rules": escalation_rules,
+        "normal_rules": normal_rules or {},
+    }
+    path.write_text(json.dumps(pack))
+    return str(path)
+
+
+class TestRulePacks:
+    """Tests for external rule packs and the compiled-pack cache."""
+
+    def test_default_pack_backs_class_tables(self):
+        assert set(ruleEngine.ESCALATION_RULES) == set(_ESCALATION_RULES)
+        assert set(ruleEngine.NORMAL_RULES) == set(_NORMAL_RULES)
+
+    def test_default_ruleset_has_digest_and_version(self):
+        assert len(DEFAULT_RULESET.get_digest()) == 64
+        assert DEFAULT_RULESET.get_version()
+
+    def test_custom_pack_applied(self, tmp_path):
+        path = write_pack(tmp_path / "pack.json",
+                          {"ANGRY": {"keywords": ["fed up"], "single_words": []}})
+        rules = load_rule_pack(path, cache_dir=str(tmp_path / "cache"))
+        codes = to_code_map(rules.apply("i am fed up"))
+        assert codes["ANGRY"].get_is_escalation() is True
+
+    def test_pack_threshold_respected(self, tmp_path):
+        path = write_pack(tmp_path / "pack.json",
+                          {"ANGRY": {"keywords": ["fed up"], "single_words": []}}, threshold=3)
+        rules = load_rule_pack(path, cache_dir=str(tmp_path / "cache"))
+        assert rules.apply("i am fed up") == []
+
+    def test_compiled_pack_cached_by_content_hash(self, tmp_path, monkeypatch):
+        cache_dir = tmp_path / "cache"
+        path = write_pack(tmp_path / "pack.json",
+                          {"ANGRY": {"keywords": ["fed up"], "single_words": []}}, version="cached")
+        rules = load_rule_pack(path, cache_dir=str(cache_dir))
+        assert any(name.startswith(rules.get_digest()) for name in os.listdir(cache_dir))
+
+        # A fresh process has no in-memory copy and must not recompile
+        monkeypatch.setattr(rule_engine_module, "_LOADED", {})
+        monkeypatch.setattr(RuleSet, "from_pack", None)
+        reloaded = load_rule_pack(path, cache_dir=str(cache_dir))
+        assert reloaded.get_digest() == rules.get_digest()
+        assert reloaded.scores("fed up")["ANGRY"] == 2
+
+    def test_compiler_change_invalidates_cache(self, tmp_path, monkeypatch):
+        cache_dir = str(tmp_path / "cache")
+        path = write_pack(tmp_path / "pack.json", {"A": {"keywords": ["x y"]}}, version="code")
+        load_rule_pack(path, cache_dir)
+
+        monkeypatch.setattr(rule_engine_module, "_LOADED", {})
+        monkeypatch.setattr(rule_engine_module, "_CODE_DIGEST", "0" * 16)
+        compiled = []
+        from_pack = RuleSet.from_pack
+        monkeypatch.setattr(RuleSet, "from_pack", lambda *a: compiled.append(a) or from_pack(*a))
+        load_rule_pack(path, cache_dir)
+        assert len(compiled) == 1
+        assert len(os.listdir(cache_dir)) == 2
+
+    def test_cache_dir_from_environment(self, tmp_path, monkeypatch):
+        monkeypatch.setenv(rule_engine_module.RULE_CACHE_ENV, str(tmp_path / "env_cache"))
+        rules = load_rule_pack(write_pack(tmp_path / "pack.json", {"A": {"keywords": ["x y"]}}, version="env"))
+        assert any(name.startswith(rules.get_digest()) for name in os.listdir(tmp_path / "env_cache"))
+
+    def test_unwritable_cache_dir_skipped(self, tmp_path):
+        blocker = tmp_path / "not_a_dir"
+        blocker.write_text("")
+        path = write_pack(tmp_path / "pack.json", {"A": {"keywords": ["x y"]}}, version="unwritable")
+        rules = load_rule_pack(path, cache_dir=str(blocker / "cache"))
+        assert rules.scores("x y")["A"] == 2
+
+    def test_changed_pack_gets_new_digest(self, tmp_path):
+        cache_dir = str(tmp_path / "cache")
+        path = tmp_path / "pack.json"
+        first = load_rule_pack(write_pack(path, {"A": {"keywords": ["x y"]}}), cache_dir)
+        second = load_rule_pack(write_pack(path, {"A": {"keywords": ["y z"]}}), cache_dir)
+        assert first.get_digest() != second.get_digest()
+        assert second.scores("y z")["A"] == 2
+
+    def test_unsupported_format_raises_value_error(self, tmp_path):
+        path = tmp_path / "pack.json"
+        path.write_text(json.dumps({"format_version": 99}))
+        with pytest.raises(ValueError):
+            load_rule_pack(str(path), cache_dir=str(tmp_path / "cache"))
+
+    def test_ruleset_pickles(self):
+        clone = pickle.loads(pickle.dumps(DEFAULT_RULESET))
+        text = "i lost my job and need a payment plan"
+        assert clone.scores(text) == DEFAULT_RULESET.scores(text)
+
+
+# === Per-Rule Thresholds and Weights ===
+
+
+class TestRuleThresholdsAndWeights:
+    """Tests for per-rule thresholds and per-phrase weights."""
+
+    def test_default_ruleset_uses_pack_threshold_everywhere(self):
+        assert set(DEFAULT_RULESET.get_thresholds().values()) == {DEFAULT_RULESET.get_threshold()}
+
+    def test_per_rule_threshold_overrides_global(self):
+        rules = RuleSet({"LOUD": (["fed up"], []), "QUIET": (["fed up"], [])}, {},
+                        threshold=2, thresholds={"LOUD": 3})
+        assert [rc.get_code() for rc in rules.apply("i am fed up")] == ["QUIET"]
+
+    def test_phrase_weight_overrides_default_points(self):
+        rules = RuleSet({"ANGRY": ([("fed up", 5)], ["mad", ("furious", 3)])}, {})
+        assert rules.scores("fed up and mad and furious")["ANGRY"] == 9
+
+    def test_escalation_flag_with_per_rule_thresholds(self):
+        rules = RuleSet({"ANGRY": (["fed up"], [])}, {"PAY": (["pay now"], [])},
+                        thresholds={"ANGRY": 4})
+        codes = to_code_map(rules.apply("i am fed up, let me pay now"))
+        assert list(codes) == ["PAY"]
+        assert codes["PAY"].get_is_escalation() is False
+
+    def test_features_report_compiled_weights(self):
+        rules = RuleSet({"ANGRY": ([("fed up", 5)], ["mad"])}, {})
+        assert rules.features() == [("keyword", "fed up", (("ANGRY", 5),)),
+                                    ("single_word", "mad", (("ANGRY", 1),))]
+
+    def test_pack_rule_threshold_and_weights(self, tmp_path):
+        path = write_pack(tmp_path / "pack.json", {
+            "ABUSIVE": {"threshold": 3, "keywords": [],
+                        "single_words": ["idiot", {"phrase": "useless", "weight": 2}]},
+            "LEGAL": {"keywords": [{"phrase": "sue you", "weight": 4}]},
+        })
+        rules = load_rule_pack(path, cache_dir=str(tmp_path / "cache"))
+        assert rules.get_thresholds() == {"ABUSIVE": 3, "LEGAL": 2}
+        assert rules.apply("useless") == []
+        codes = to_code_map(rules.apply("useless idiot, i will sue you"))
+        assert codes["ABUSIVE"].get_score() == 3
+        assert codes["LEGAL"].get_score() == 4
+
+    def test_invalid_phrase_entry_raises_value_error(self, tmp_path):
+        path = write_pack(tmp_path / "pack.json",
+                          {"A": {"keywords": [{"phrase": "x y", "weight": "high"}]}})
+        with pytest.raises(ValueError):
+            load_rule_pack(path, cache_dir=str(tmp_path / "cache"))
+
+
+# === Early-Exit Escalation ===
+
+
+class TestFirstEscalation:
+    """Tests for the early-exit escalation check."""
+
+    @pytest.mark.parametrize("text", [
+        "",
+        "i want to make a payment and check my escrow account",
+        "i lost my job and need a payment plan",
+        "get me your supervisor, you're an idiot",
+        "my attorney general said so",
+        "dispute",
+    ])
+    def test_decision_matches_apply(self, text):
+        full = DEFAULT_RULESET.apply(text)
+        expected = any(rc.get_is_escalation() for rc in full)
+        assert (DEFAULT_RULESET.first_escalation(text) is not None) == expected
+
+    def test_normal_rules_never_trigger(self):
+        assert DEFAULT_RULESET.first_escalation("make a payment on my escrow account") is None
+
+    def test_stops_at_threshold(self):
+        rules = RuleSet({"ANGRY": (["fed up", "so fed up", "had enough"], [])}, {}, threshold=2)
+        rc = rules.first_escalation("i am so fed up, i have had enough")
+        assert rc.get_code() == "ANGRY"
+        assert rc.get_score() == 2
+        assert rc.get_is_escalation() is True
+
+    def test_respects_per_rule_thresholds(self):
+        rules = RuleSet({"ANGRY": (["fed up"], ["mad"]), "LEGAL": (["sue you"], [])}, {},
+                        thresholds={"ANGRY": 3})
+        assert rules.first_escalation("fed up") is None
+        assert rules.first_escalation("fed up and mad").get_code() == "ANGRY"
+        assert rules.first_escalation("fed up, i will sue you").get_code() == "LEGAL"
+
+    def test_negative_pack_weight_rejected(self, tmp_path):
+        path = write_pack(tmp_path / "pack.json",
+                          {"A": {"keywords": [{"phrase": "x y", "weight": -1}]}})
+        with pytest.raises(ValueError):
+            load_rule_pack(path, cache_dir=str(tmp_path / "cache"))
+
+
+# === Customer-only Scanning ===
+
+
+class TestCustomerOnly:
+    """Tests for scoring only the customer's turns."""
+
+    RAW = ("Agent: Would you like to make a payment today? I can get your supervisor too.\n"
+           "Caller: I lost my job and I'm struggling.\n"
+           "Agent: I'm sorry to hear that.")
+
+    def parsed(self):
+        from engines.transcriptParser import transcriptParser
+        return transcriptParser().parse_transcript(self.RAW)
+
+    def test_agent_speech_not_scored(self):
+        codes = to_code_map(DEFAULT_RULESET.apply_transcript(self.parsed()))
+        assert set(codes) == {"HARDSHIP_LANGUAGE"}
+
+    def test_whole_transcript_on_request(self):
+        codes = to_code_map(DEFAULT_RULESET.apply_transcript(self.parsed(), customer_only=False))
+        assert {"PAYMENT_INTENT", "SUPERVISOR_REQUEST", "HARDSHIP_LANGUAGE"} <= set(codes)
+
+    def test_rule_engine_defaults_to_customer_only(self):
+        transcript = self.parsed()
+        assert set(to_code_map(ruleEngine(transcript).apply_rules())) == {"HARDSHIP_LANGUAGE"}
+        assert "PAYMENT_INTENT" in to_code_map(ruleEngine(transcript, customer_only=False).apply_rules())
+
+    def test_spans_point_into_full_text(self):
+        transcript = self.parsed()
+        text = transcript.get_normalized_text()
+        rc = to_code_map(DEFAULT_RULESET.apply_transcript(transcript))["HARDSHIP_LANGUAGE"]
+        phrases = {text[s:e] for s, e in rc.get_spans()}
+        assert phrases == {"lost my job", "struggling"}
+
+    def test_unlabelled_text_scanned_in_full(self):
+        transcript = make_transcript("i want to make a payment")
+        assert "PAYMENT_INTENT" in to_code_map(DEFAULT_RULESET.apply_transcript(transcript))
+
+    @pytest.mark.parametrize("text", [
+        "",
+        "get me your manager, now. what about the balance?",
+        "the management team reviewed the imbalance",
+        "refinancing versus refinance",
+        "you're an idiot. this is ridiculous and useless",
+        "supervisor_manager manager's",
+        "you idiots. lawyers, managers and payments; idiot idiots",
+        "the balances and the idiotss",
+    ])
+    def test_whole_text_span_matches_token_index(self, text):
+        """The span scan finds single words exactly where the token index does."""
+        by_tokens = [(rc.get_code(), rc.get_score(), rc.get_spans()) for rc in DEFAULT_RULESET.apply(text)]
+        by_span = [(rc.get_code(), rc.get_score(), rc.get_spans())
+                   for rc in DEFAULT_RULESET.apply(text, spans=[(0, len(text))])]
+        assert by_span == by_tokens
+
+    def test_phrase_outside_spans_ignored(self):
+        text = "agent: make a payment. caller: i lost my job."
+        start = text.index("i lost")
+        scores = DEFAULT_RULESET.scores(text, spans=[(start, len(text))])
+        assert scores["PAYMENT_INTENT"] == 0
+        assert scores["HARDSHIP_LANGUAGE"] == 2
+
+    def test_first_escalation_honours_spans(self):
+        text = "agent: i'm not going to sue you. caller: payment please"
+        start = text.index("payment")
+        assert DEFAULT_RULESET.first_escalation(text) is not None
+        assert DEFAULT_RULESET.first_escalation(text, spans=[(start, len(text))]) is None
@@ -0,0 +1,99 @@
+"""
+Unit tests for transcriptPack.
+"""
+
+import os
+
+import pytest
+from engines.transcriptPack import TranscriptPack, build_pack, INDEX_SUFFIX
+from engines.transcriptReader import read_transcript
+
+
+@pytest.fixture
+def source(tmp_path):
+    directory = tmp_path / "transcripts"
+    directory.mkdir()
+    (directory / "b_call.txt").write_bytes("Caller: I can’t pay — sorry\r\n".encode("utf-8"))
+    (directory / "a_call.txt").write_bytes(b"Agent: Hello\nCaller: Hi")
+    (directory / "empty.txt").write_bytes(b"")
+    (directory / "notes.md").write_bytes(b"not a transcript")
+    return directory
+
+
+@pytest.fixture
+def pack(source, tmp_path):
+    build_pack(str(source), str(tmp_path / "corpus.pack"))
+    with TranscriptPack(str(tmp_path / "corpus.pack")) as pack:
+        yield pack
+
+
+class TestBuildPack:
+    """Tests for packing a directory."""
+
+    def test_returns_count(self, source, tmp_path):
+        assert build_pack(str(source), str(tmp_path / "corpus.pack")) == 3
+
+    def test_writes_data_and_index(self, source, tmp_path):
+        build_pack(str(source), str(tmp_path / "corpus.pack"))
+        assert sorted(os.listdir(tmp_path)) == ["corpus.pack", "corpus.pack" + INDEX_SUFFIX, "transcripts"]
+
+    def test_pattern(self, source, tmp_path):
+        assert build_pack(str(source), str(tmp_path / "corpus.pack"), pattern="*.md") == 1
+
+    def test_empty_directory(self, tmp_path):
+        (tmp_path / "none").mkdir()
+        build_pack(str(tmp_path / "none"), str(tmp_path / "corpus.pack"))
+        with TranscriptPack(str(tmp_path / "corpus.pack")) as pack:
+            assert len(pack) == 0
+            assert pack.names() == []
+
+
+class TestTranscriptPack:
+    """Tests for reading a pack."""
+
+    def test_names_sorted(self, pack):
+        assert pack.names() == ["a_call.txt", "b_call.txt", "empty.txt"]
+
+    def test_text_matches_read_transcript(self, pack, source):
+        for i, name in enumerate(pack.names()):
+            assert pack.text(i) == read_transcript(str(source / name))
+
+    def test_sizes_and_mtimes(self, pack, source):
+        for i, name in enumerate(pack.names()):
+            st = os.stat(source / name)
+            assert pack.size(i) == st.st_size
+            assert pack.mtime_ns(i) == st.st_mtime_ns
+
+    def test_index_of(self, pack):
+        assert pack.index_of("b_call.txt") == 1
+        with pytest.raises(KeyError):
+            pack.index_of("missing.txt")
+
+    def test_missing_pack_raises(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            TranscriptPack(str(tmp_path / "missing.pack"))
+
+    def test_bad_index_raises(self, tmp_path):
+        (tmp_path / "bad.pack").write_bytes(b"")
+        (tmp_path / ("bad.pack" + INDEX_SUFFIX)).write_bytes(b"garbage" * 10)
+        with pytest.raises(ValueError):
+            TranscriptPack(str(tmp_path / "bad.pack"))
+
+    def test_truncated_data_raises(self, source, tmp_path):
+        path = tmp_path / "corpus.pack"
+        build_pack(str(source), str(path))
+        path.write_bytes(path.read_bytes()[:-1])
+        with pytest.raises(ValueError):
+            TranscriptPack(str(path))
+
+    def test_rebuild_changes_stamp(self, source, tmp_path):
+        path = str(tmp_path / "corpus.pack")
+        build_pack(str(source), path)
+        with TranscriptPack(path) as first:
+            (source / "c_call.txt").write_bytes(b"Caller: again")
+            build_pack(str(source), path)
+            with TranscriptPack(path) as second:
+                assert second.get_stamp() != first.get_stamp()
+                assert len(second) == 4
+            # The open pack keeps reading the build it mapped
+            assert first.text(1) == read_transcript(str(source / "b_call.txt"))
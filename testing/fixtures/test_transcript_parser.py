@@ -4,7 +4,9 @@ Unit tests for transcriptParser.
 
 import datetime
 import pytest
-from engines.transcriptParser import transcriptParser
+from Data_Classes.speakerTurns import AGENT, CUSTOMER, OTHER
+from engines.transcriptParser import (transcriptParser, build_token_index, build_span_token_index,
+                                     build_speaker_turns, speaker_role, normalize_text)
 
 
 def parse(raw_text: str):
@@ -70,6 +72,32 @@ class TestTextNormalization:
         transcript = parse("   hello   ")
         assert transcript.get_normalized_text() == "hello"
 
+    def test_curly_apostrophes_folded(self):
+        assert parse("I don\u2019t owe this, it\u2018s wrong").get_normalized_text() == "i don't owe this, it's wrong"
+
+    def test_dashes_and_quotes_folded(self):
+        raw = "Fee \u2014 \u201cwaived\u201d \u2013 LN\u201212345 \u2212$5"
+        assert parse(raw).get_normalized_text() == 'fee - "waived" - ln-12345 -$5'
+
+    def test_unicode_whitespace_collapsed(self):
+        assert parse("hello\u00a0\u2003world\u3000!").get_normalized_text() == "hello world !"
+
+    def test_folded_tokens_split_on_ascii_punctuation(self):
+        index = parse("Caller: I can\u2019t pay\u2014sorry").get_token_index()
+        assert "can" in index and "t" in index and "sorry" in index
+
+    def test_folding_keeps_offsets_aligned(self):
+        raw = "Agent:  it\u2019s  $200\u2014due"
+        transcript = parse(raw)
+        text = transcript.get_normalized_text()
+        start = text.index("$200")
+        raw_start, raw_end = transcript.get_offset_map().span_to_raw(start, start + 4)
+        assert raw[raw_start:raw_end] == "$200"
+
+    def test_module_function_matches_parser(self):
+        raw = "  Caller:\tDon\u2019t   CALL me\u2014ever "
+        assert normalize_text(raw) == parse(raw).get_normalized_text()
+
 
 # === Speaker Extraction ===
 
@@ -111,6 +139,48 @@ class TestSpeakerExtraction:
         assert "O'Brien" in transcript.get_speakers()
 
 
+# === Token Index ===
+
+
+class TestTokenIndex:
+    """Tests for the word token index built on first use."""
+
+    def test_token_index_built_on_first_use(self):
+        transcript = parse("Agent: Hello there")
+        assert transcript._token_index is None
+        assert transcript.get_token_index() == {"agent": 0, "hello": 7, "there": 13}
+
+    def test_first_occurrence_offset_kept(self):
+        assert build_token_index("pay now, pay later")["pay"] == 0
+
+    def test_punctuation_splits_tokens(self):
+        index = build_token_index("manager's balance.")
+        assert set(index) == {"manager", "s", "balance"}
+
+    def test_offsets_point_at_tokens(self):
+        text = "caller: i can't—really—pay (balance) ok"
+        for token, start in build_token_index(text).items():
+            assert text[start:start + len(token)] == token
+
+    def test_empty_text_empty_index(self):
+        assert build_token_index("") == {}
+
+    def test_span_index_offsets_point_into_whole_text(self):
+        text = "agent: pay now. caller: i can't pay. agent: later"
+        spans = [(16, 36)]
+        index = build_span_token_index(text, spans)
+        assert set(index) == {"caller", "i", "can", "t", "pay"}
+        assert index["pay"] == text.index("pay", 16)
+        for token, start in index.items():
+            assert text[start:start + len(token)] == token
+
+    def test_span_index_does_not_join_across_spans(self):
+        text = "refund my paymentlater please"
+        index = build_span_token_index(text, [(0, 17), (17, 22)])
+        assert "payment" in index and "later" in index
+        assert "paymentlater" not in index
+
+
 # === Raw Text Preservation ===
 
 
@@ -143,3 +213,146 @@ class TestTimestamp:
     def test_timestamp_is_current(self):
         transcript = parse("Hello")
         assert_timestamp_recent(transcript.get_timestamp())
+
+
+# === Offset Map ===
+
+
+class TestOffsetMap:
+    """Tests for mapping normalized offsets back to the raw text."""
+
+    RAW = "Agent:   Hello\n\nCaller:\tMy loan is LN-2017-88432.  Thanks"
+
+    def test_every_token_maps_back(self):
+        transcript = parse(self.RAW)
+        normalized = transcript.get_normalized_text()
+        offset_map = transcript.get_offset_map()
+        pos = 0
+        for token in normalized.split(" "):
+            start, end = offset_map.span_to_raw(pos, pos + len(token))
+            assert self.RAW[start:end].lower() == token
+            assert offset_map.span_to_normalized(start, end) == (pos, pos + len(token))
+            pos += len(token) + 1
+
+    def test_span_across_collapsed_whitespace(self):
+        transcript = parse(self.RAW)
+        normalized = transcript.get_normalized_text()
+        start = normalized.index("hello caller:")
+        raw_start, raw_end = transcript.get_offset_map().span_to_raw(start, start + len("hello caller:"))
+        assert self.RAW[raw_start:raw_end] == "Hello\n\nCaller:"
+
+    def test_length_changing_lowercase_stays_in_bounds(self):
+        raw = "İstanbul office, call me"
+        transcript = parse(raw)
+        normalized = transcript.get_normalized_text()
+        offset_map = transcript.get_offset_map()
+        assert offset_map.to_raw(normalized.index("office")) == raw.index("office")
+        assert offset_map.to_raw(len(normalized)) == len(raw)
+
+    def test_built_lazily_and_reset_by_setters(self):
+        transcript = parse(self.RAW)
+        assert transcript._offset_map is None
+        first = transcript.get_offset_map()
+        assert transcript.get_offset_map() is first
+        transcript.set_normalized_text("other")
+        assert transcript._offset_map is None
+
+    def test_single_whitespace_needs_no_breakpoints(self):
+        offset_map = parse("Agent: hi\nCaller: hello\tthere").get_offset_map()
+        assert len(offset_map) == 0
+        assert offset_map.to_raw(10) == 10
+
+    def test_whitespace_only_text(self):
+        offset_map = parse("   ").get_offset_map()
+        assert offset_map.to_normalized(1) == 0
+        assert 0 <= offset_map.to_raw(0) <= 3
+
+
+# === Speaker Turns ===
+
+
+class TestSpeakerTurns:
+    """Tests for the speaker turn table."""
+
+    RAW = ("Intro line without a label\n"
+           "Agent: Hello, how can I help?\n"
+           "Caller: My payment: it went up.\n"
+           "It was $200 more.\n"
+           ": not a label\n"
+           "Agent: I see.")
+
+    def test_turns_in_order_with_interned_ids(self):
+        turns = build_speaker_turns(self.RAW)
+        assert len(turns) == 3
+        assert turns.get_speaker_names() == ["Agent", "Caller"]
+        assert list(turns.get_speaker_ids()) == [0, 1, 0]
+        assert [turns.speaker(i) for i in range(3)] == ["Agent", "Caller", "Agent"]
+
+    def test_turn_text_includes_continuation_lines(self):
+        turns = build_speaker_turns(self.RAW)
+        assert turns.text(self.RAW, 0) == "Hello, how can I help?"
+        assert turns.text(self.RAW, 1) == "My payment: it went up.\nIt was $200 more.\n: not a label"
+        assert turns.text(self.RAW, 2) == "I see."
+
+    def test_spans_of_speaker(self):
+        turns = build_speaker_turns(self.RAW)
+        agent = turns.speaker_id("Agent")
+        assert turns.turns_of(agent) == [0, 2]
+        assert [self.RAW[s:e].strip() for s, e in turns.spans_of([agent])] == ["Hello, how can I help?", "I see."]
+
+    def test_crlf_and_no_labels(self):
+        raw = "Agent: hi\r\nCaller: hey\r\n"
+        turns = build_speaker_turns(raw)
+        assert [turns.text(raw, i) for i in range(len(turns))] == ["hi", "hey"]
+        assert len(build_speaker_turns("no labels here")) == 0
+
+    def test_parser_attaches_turns(self):
+        transcript = parse(self.RAW)
+        assert transcript.get_turns().get_speaker_names() == transcript.get_speakers()
+
+
+# === Speaker Roles ===
+
+
+class TestSpeakerRoles:
+    """Tests for agent / customer classification of speakers."""
+
+    def test_labels_that_name_a_role(self):
+        raw = ("# Transcript: call 12\n"
+               "Agent: Thanks for calling.\n"
+               "Caller: Hi.\n"
+               "Supervisor (Tom): This is Tom.\n"
+               "Husband (background): Tell them about the letter.\n")
+        turns = build_speaker_turns(raw)
+        assert dict(zip(turns.get_speaker_names(), turns.get_roles())) == {
+            "# Transcript": OTHER, "Agent": AGENT, "Caller": CUSTOMER,
+            "Supervisor (Tom)": AGENT, "Husband (background)": CUSTOMER,
+        }
+
+    def test_bare_names_classified_by_speech(self):
+        raw = ("Kevin: Let me pull up your account. Your payment posted on the 3rd.\n"
+               "Raymond: My wife handles the bills, but we got a letter about our loan.\n")
+        turns = build_speaker_turns(raw)
+        assert turns.get_roles() == [AGENT, CUSTOMER]
+
+    def test_speaker_role_without_speech_defaults_to_customer(self):
+        assert speaker_role("Speaker 2") == CUSTOMER
+        assert speaker_role("Speaker 1", "How can I help you with your loan today?") == AGENT
+
+    def test_customer_spans_cover_customer_turns(self):
+        transcript = parse("Agent:   Would you like to make a payment?\n\n"
+                           "Caller: No,  I lost my job.\n"
+                           "Agent: Sorry to hear that.")
+        text = transcript.get_normalized_text()
+        assert [text[s:e].strip() for s, e in transcript.get_customer_spans()] == ["no, i lost my job."]
+
+    def test_no_customer_speech_gives_none(self):
+        assert parse("Agent: Hello?\nAgent: Anyone there?").get_customer_spans() is None
+        assert parse("no labels at all").get_customer_spans() is None
+
+    def test_customer_token_index_covers_customer_turns_only(self):
+        transcript = parse("Agent: Would you like to make a payment?\n"
+                           "Caller: No, I lost my job.\n")
+        index = transcript.get_customer_token_index()
+        assert "job" in index and "payment" not in index
+        assert parse("Agent: Hello?").get_customer_token_index() is None
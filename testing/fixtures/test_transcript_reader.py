@@ -0,0 +1,67 @@
+"""
+Unit tests for transcriptReader.
+"""
+
+import glob
+import os
+
+import pytest
+import engines.transcriptReader as transcript_reader_module
+from engines.transcriptReader import read_transcript, decode_transcript
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+
+@pytest.fixture(params=["read", "mmap"])
+def mode(request, monkeypatch):
+    """Run each test through both the plain read and the memory-mapped path."""
+    if request.param == "mmap":
+        monkeypatch.setattr(transcript_reader_module, "MMAP_THRESHOLD", 1)
+    return request.param
+
+
+def write(tmp_path, data: bytes) -> str:
+    path = tmp_path / "call.txt"
+    path.write_bytes(data)
+    return str(path)
+
+
+class TestReadTranscript:
+    """Tests for reading transcript files."""
+
+    def test_ascii(self, tmp_path, mode):
+        assert read_transcript(write(tmp_path, b"Agent: Hello\nCaller: Hi")) == "Agent: Hello\nCaller: Hi"
+
+    def test_utf8(self, tmp_path, mode):
+        text = "Caller: I don’t owe this — café"
+        assert read_transcript(write(tmp_path, text.encode("utf-8"))) == text
+
+    def test_newlines_translated_like_text_mode(self, tmp_path, mode):
+        path = write(tmp_path, b"Agent: a\r\nCaller: b\rAgent: c\n")
+        with open(path, "r") as f:
+            expected = f.read()
+        assert read_transcript(path) == expected == "Agent: a\nCaller: b\nAgent: c\n"
+
+    def test_empty_file(self, tmp_path, mode):
+        assert read_transcript(write(tmp_path, b"")) == ""
+
+    def test_invalid_utf8_raises(self, tmp_path, mode):
+        with pytest.raises(UnicodeDecodeError):
+            read_transcript(write(tmp_path, b"Caller: caf\xe9"))
+
+    def test_missing_file_raises(self):
+        with pytest.raises(FileNotFoundError):
+            read_transcript("/nonexistent/file.txt")
+
+    def test_matches_text_mode_on_corpus(self, mode):
+        for path in sorted(glob.glob(os.path.join(ROOT_DIR, "transcripts", "*.txt")))[:25]:
+            with open(path, "r", encoding="utf-8") as f:
+                assert read_transcript(path) == f.read()
+
+
+class TestDecodeTranscript:
+    """Tests for decoding an in-memory buffer."""
+
+    def test_accepts_any_buffer(self):
+        data = "Caller: ’ok’".encode("utf-8")
+        assert decode_transcript(data) == decode_transcript(memoryview(data)) == "Caller: ’ok’"
@@ -188,3 +188,26 @@ class TestGenerateCsv:
         result_header = csv.split("\n")[:7]
         expected_header = expected_csv.split("\n")[:7]
         assert result_header == expected_header
+
+
+# === Loan Index ===
+
+
+class TestLoanReport:
+    """Tests for repeat-caller reporting from the loan number index."""
+
+    def test_repeat_callers_match_pairwise_count(self, reporter, batch_results):
+        report = reporter.loan_report(reporter.build_loan_index(batch_results))
+        counts = {}
+        for result in batch_results:
+            for loan in result._entities.get_loan_numbers():
+                counts[loan] = counts.get(loan, 0) + 1
+        assert {loan: len(ids) for loan, ids in report["repeat_callers"].items()} == \
+            {loan: n for loan, n in counts.items() if n >= 2}
+        assert set(report["escalation_history"]) == set(report["repeat_callers"])
+
+    def test_multi_escalated_loans_escalated_twice(self, reporter, batch_results):
+        report = reporter.loan_report(reporter.build_loan_index(batch_results))
+        for loan, ids in report["multi_escalated"].items():
+            assert len(ids) >= 2
+            assert all(batch_results[i]._escalate for i in ids)
@@ -13,7 +13,11 @@ ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
 sys.path.insert(0, ROOT_DIR)
 
 from engines.triageResult import TriagePipeline
+from engines.pipelinePool import PipelinePool
+from engines.loanIndex import LoanIndex
+from engines.transcriptPack import TranscriptPack, build_pack
 from Data_Classes.triageResult import triageResult
+from Data_Classes.escalationDecision import escalationDecision
 
 
 @pytest.fixture(scope="module")
@@ -110,6 +114,34 @@ class TestProcessSingle:
         assert "345678" in result._entities.get_loan_numbers()
 
 
+# === triage_escalation_only ===
+
+
+class TestEscalationOnly:
+    """Tests for the early-exit escalation-only routing mode."""
+
+    def test_returns_escalation_decision(self, pipeline, transcripts_dir):
+        path = os.path.join(transcripts_dir, "test_payment_simple_rambling.txt")
+        decision = pipeline.triage_escalation_only(path)
+        assert isinstance(decision, escalationDecision)
+        assert decision.to_json() == {"escalate": False, "trigger_code": None, "score": 0}
+
+    def test_file_not_found_raises_error(self, pipeline):
+        with pytest.raises(FileNotFoundError):
+            pipeline.triage_escalation_only("/nonexistent/file.txt")
+
+    def test_trigger_is_escalation_code(self, pipeline, transcripts_dir):
+        path = os.path.join(transcripts_dir, "test_legal_threat_angry_escalation.txt")
+        decision = pipeline.triage_escalation_only(path)
+        full_codes = [rc.get_code() for rc in pipeline.process_single(path).get_reason_codes()]
+        assert decision.get_escalate() is True
+        assert decision.get_trigger_code() in full_codes
+
+    def test_matches_full_pipeline_on_corpus(self, pipeline, all_paths, batch_results):
+        decisions = [pipeline.triage_escalation_only(p).get_escalate() for p in all_paths]
+        assert decisions == [r._escalate for r in batch_results]
+
+
 # === process_batch ===
 
 
@@ -164,3 +196,187 @@ class TestResultConsistency:
     def test_entities_not_none(self, batch_results):
         for r in batch_results:
             assert r._entities is not None
+
+
+# === Metrics ===
+
+
+class TestLazyEntities:
+    """Tests for the lazy entity option on the sequential path."""
+
+    def test_lazy_results_serialise_identically(self, transcripts_dir):
+        path = os.path.join(transcripts_dir, "sales_divorce_hardship.txt")
+        eager = TriagePipeline().process_single(path)
+        lazy = TriagePipeline(lazy_entities=True).process_single(path)
+        assert lazy.to_json() == eager.to_json()
+
+
+class TestCustomerOnly:
+    """Tests for scoring only the customer's turns."""
+
+    def test_agent_reassurance_does_not_fire_abuse(self, transcripts_dir):
+        # Agent: "I don't think you're stupid at all"
+        path = os.path.join(transcripts_dir, "synth_long_016.txt")
+        codes = [rc.get_code() for rc in TriagePipeline().process_single(path).get_reason_codes()]
+        full = [rc.get_code() for rc in TriagePipeline(customer_only=False).process_single(path).get_reason_codes()]
+        assert "ABUSIVE_LANGUAGE" not in codes
+        assert "ABUSIVE_LANGUAGE" in full
+
+    def test_pool_honours_option(self, all_paths):
+        paths = all_paths[:8]
+        with TriagePipeline(customer_only=False) as pipeline:
+            pooled = pipeline.process_batch(paths)
+        sequential = TriagePipeline(customer_only=False)
+        assert [r.to_json() for r in pooled] == [sequential.process_single(p).to_json() for p in paths]
+
+
+@pytest.fixture(scope="module")
+def fixture_results(pipeline, expected, transcripts_dir):
+    return [pipeline.process_single(os.path.join(transcripts_dir, item["filename"]))
+            for item in expected["transcripts"]]
+
+
+class TestExpectedResultsFixtures:
+    """Tests that expected_results.json describes the fixtures it names."""
+
+    @pytest.mark.parametrize("field", ["escalate", "risk_level", "reason_codes", "has_amounts", "has_loan_numbers"])
+    def test_per_file_entries(self, expected, fixture_results, field):
+        actual = [{
+            "escalate": result._escalate,
+            "risk_level": result._risk_level,
+            "reason_codes": [rc.get_code() for rc in result.get_reason_codes()],
+            "has_amounts": bool(result._entities.get_amounts()),
+            "has_loan_numbers": bool(result._entities.get_loan_numbers()),
+        }[field] for result in fixture_results]
+        assert actual == [item[field] for item in expected["transcripts"]]
+
+    def test_reason_code_counts(self, expected, fixture_results):
+        counts = {}
+        for result in fixture_results:
+            for rc in result.get_reason_codes():
+                counts[rc.get_code()] = counts.get(rc.get_code(), 0) + 1
+        metrics = expected["batch_metrics"]
+        assert counts == metrics["reason_code_counts"]
+        assert counts[metrics["top_reason_code"]] == metrics["top_reason_code_count"]
+
+
+class TestLoanIndexStreaming:
+    """Tests for building the loan index while a batch runs."""
+
+    @pytest.mark.parametrize("n_files", [3, 20])
+    def test_index_matches_post_hoc_build(self, all_paths, n_files):
+        paths = all_paths[:n_files]
+        index = LoanIndex()
+        with TriagePipeline() as pipeline:
+            results = pipeline.process_batch(paths, loan_index=index)
+        assert index.to_json() == LoanIndex().add_all(results, paths).to_json()
+
+
+class TestTranscriptPack:
+    """Tests for processing a packed corpus instead of individual files."""
+
+    @pytest.mark.parametrize("n_files", [3, 20])
+    def test_pack_matches_files(self, all_paths, n_files, tmp_path):
+        paths = all_paths[:n_files]
+        source = tmp_path / "transcripts"
+        source.mkdir()
+        for p in paths:
+            (source / os.path.basename(p)).write_bytes(open(p, "rb").read())
+        build_pack(str(source), str(tmp_path / "corpus.pack"))
+        file_index, pack_index = LoanIndex(), LoanIndex()
+        with TriagePipeline() as pipeline, TranscriptPack(str(tmp_path / "corpus.pack")) as pack:
+            from_files = pipeline.process_batch(paths, loan_index=file_index)
+            from_pack = pipeline.process_batch(pack, loan_index=pack_index)
+        assert [r.to_json() for r in from_pack] == [r.to_json() for r in from_files]
+        assert pack_index.to_json() == LoanIndex().add_all(from_files, [os.path.basename(p) for p in paths]).to_json()
+
+    def test_pool_workers_reopen_rebuilt_pack(self, transcripts_dir, tmp_path):
+        source = tmp_path / "transcripts"
+        source.mkdir()
+        pack_path = str(tmp_path / "corpus.pack")
+        legal = open(os.path.join(transcripts_dir, "test_legal_threat_angry_escalation.txt"), "rb").read()
+        payment = open(os.path.join(transcripts_dir, "test_payment_simple_rambling.txt"), "rb").read()
+        with PipelinePool(workers=2) as pool:
+            for data in (legal, payment):
+                for i in range(8):
+                    (source / f"call_{i}.txt").write_bytes(data)
+                build_pack(str(source), pack_path)
+                with TranscriptPack(pack_path) as pack:
+                    results = pool.process_batch(pack)
+                    expected = TriagePipeline().process_batch(pack)[0].to_json()
+                assert all(r.to_json() == expected for r in results)
+
+
+class TestMetrics:
+    """Tests for per-stage timings and rule hit counters."""
+
+    def test_sequential_path_records_every_stage(self, transcripts_dir):
+        pipeline = TriagePipeline()
+        path = os.path.join(transcripts_dir, "test_legal_threat_angry_escalation.txt")
+        result = pipeline.process_single(path)
+        snapshot = pipeline.metrics.to_json()
+        assert snapshot["transcripts"] == 1
+        assert all(stage["count"] == 1 for stage in snapshot["stages"].values())
+        assert snapshot["rule_hits"] == {rc.get_code(): 1 for rc in result.get_reason_codes()}
+
+    def test_pool_merges_worker_metrics(self, transcripts_dir):
+        paths = [os.path.join(transcripts_dir, "test_legal_threat_angry_escalation.txt")] * 10
+        with PipelinePool(workers=2) as pool:
+            results = pool.process_batch(paths)
+            assert pool.metrics.get_transcripts() == 10
+            assert sum(pool.metrics.get_histogram("apply_rules")) == 10
+            assert pool.metrics.get_rule_hits() == {rc.get_code(): 10 for rc in results[0].get_reason_codes()}
+
+    def test_pipeline_shares_metrics_with_pool(self, all_paths):
+        with TriagePipeline() as pipeline:
+            pipeline.process_batch(all_paths[:TriagePipeline._PARALLEL_THRESHOLD])
+            assert pipeline.metrics.get_transcripts() == TriagePipeline._PARALLEL_THRESHOLD
+            pipeline.reset_metrics()
+            assert pipeline.metrics.get_transcripts() == 0
+
+    def test_pool_reports_amount_cache_counters(self, transcripts_dir):
+        paths = [os.path.join(transcripts_dir, "sales_divorce_hardship.txt")] * 10
+        with PipelinePool(workers=2) as pool:
+            pool.process_batch(paths)
+            counters = pool.metrics.get_counters()
+            assert counters["amount_cache_hits"] > 0
+
+
+# === Rule Pack Hot Swap ===
+
+
+def write_pack(path, code, keyword):
+    path.write_text(json.dumps({
+        "format_version": 1,
+        "name": "test",
+        "version": code,
+        "threshold": 2,
+        "escalation_rules": {code: {"keywords": [keyword], "single_words": []}},
+        "normal_rules": {},
+    }))
+    return str(path)
+
+
+class TestRulePackHotSwap:
+    """Tests for swapping rule packs on a live warm pool."""
+
+    def test_pool_workers_swap_pack_without_restart(self, transcripts_dir, tmp_path):
+        path = os.path.join(transcripts_dir, "test_payment_simple_rambling.txt")
+        pack = tmp_path / "pack.json"
+        with PipelinePool(workers=2, rule_pack=write_pack(pack, "FIRST_PACK", "payment")) as pool:
+            executor = pool._executor
+            first = pool.process_batch([path] * 4)
+            assert all(r.get_reason_codes()[0].get_code() == "FIRST_PACK" for r in first)
+
+            write_pack(pack, "SECOND_PACK", "payment")
+            pool.reload_rules()
+            second = pool.process_batch([path] * 4)
+            assert all(r.get_reason_codes()[0].get_code() == "SECOND_PACK" for r in second)
+            assert pool._executor is executor
+
+    def test_pipeline_reload_rules_sequential(self, transcripts_dir, tmp_path):
+        path = os.path.join(transcripts_dir, "test_payment_simple_rambling.txt")
+        pipeline = TriagePipeline(rule_pack=write_pack(tmp_path / "a.json", "PACK_A", "payment"))
+        assert pipeline.process_single(path).get_reason_codes()[0].get_code() == "PACK_A"
+        pipeline.reload_rules(write_pack(tmp_path / "b.json", "PACK_B", "payment"))
+        assert pipeline.process_single(path).get_reason_codes()[0].get_code() == "PACK_B"